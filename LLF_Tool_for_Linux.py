@@ -6,7 +6,6 @@ import subprocess
 import threading
 import time
 import re
-import math 
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
@@ -21,6 +20,25 @@ from PyQt5.QtCore import Qt, QTimer, QEvent, QObject, QUrl
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 
 
+# 2.0 paketiyle gelen ayrıcalıklı yardımcı (llf_helper.py) varsa onu kullanıyoruz:
+# oturum başında bir kez pkexec ile başlıyor, her işlem için tekrar parola sorulmuyor.
+# Bulunamazsa eskisi gibi her işlemde pkexec dd çalıştırıyoruz.
+HELPER_DIRS = (os.path.dirname(os.path.abspath(__file__)), "/usr/share/LLF_Tool_for_Linux")
+
+
+def load_helper_client():
+    for directory in HELPER_DIRS:
+        if os.path.exists(os.path.join(directory, "llf_helper.py")):
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+            try:
+                import llf_helper
+                return llf_helper
+            except ImportError:
+                return None
+    return None
+
+
 # --- Custom Event Classes ---
 class ProgressUpdateEvent(QEvent):
     EVENT_TYPE = QEvent.Type(QEvent.User + 1)
@@ -67,6 +85,8 @@ class LLFTool(QWidget):
         self.disk_wipe_thread = None
         self.is_wiping = False
         self.start_time = 0
+        self.helper_module = load_helper_client()
+        self.helper = None
 
         self.load_translations()
         self.init_ui()
@@ -457,20 +477,69 @@ class LLFTool(QWidget):
         self.disk_combo.setEnabled(enabled)
 
 
+    def get_helper(self):
+        # Yardımcıyı ilk işlemde başlatıp oturum boyunca kullanıyoruz
+        if self.helper_module is None:
+            return None
+        if self.helper is None or not self.helper.running:
+            helper = self.helper_module.HelperClient()
+            helper.start()
+            self.helper = helper
+        return self.helper
+
+    def perform_wipe_with_helper(self, helper, disk_path, operation_type):
+        start = time.time()
+
+        def on_event(event, data):
+            if event == "progress":
+                speed = f"{data['rate'] / 1e6:.1f} MB/s"
+                QApplication.instance().postEvent(self, ProgressUpdateEvent(
+                    data["pct"], time.time() - start, speed, data["total"], data["offset"]))
+
+        try:
+            # MBR/MFT silme: motorun hızlı silmesi (ilk 10MB, bölüm tabloları dahil)
+            helper.call("wipe", on_event=on_event, device=disk_path,
+                        quick=operation_type == "mbr_mft_delete")
+            QApplication.instance().postEvent(self, OperationCompleteEvent(True, operation_type))
+        except (self.helper_module.HelperError, ValueError) as e:
+            QApplication.instance().postEvent(self, OperationCompleteEvent(False, operation_type, str(e)))
+
     def perform_wipe(self, disk_path, operation_type):
+        try:
+            helper = self.get_helper()
+        except Exception as e:
+            # Parola diyaloğu kapatıldıysa eski yola düşmek yine parola sorar; işlemi bitiriyoruz
+            if isinstance(e, self.helper_module.HelperAuthError):
+                QApplication.instance().postEvent(self, OperationCompleteEvent(False, operation_type, str(e)))
+                return
+            helper = None
+        if helper is not None:
+            self.perform_wipe_with_helper(helper, disk_path, operation_type)
+            return
+
         try:
             disk_size_bytes = 0 
             dd_bs_in_bytes = 4 * 1024 * 1024 # 4MB in bytes
 
             if operation_type == "full_format":
-                result = subprocess.run(['lsblk', '-bno', 'SIZE', disk_path], capture_output=True, text=True, check=True)
-                disk_size_bytes_str = result.stdout.strip().split('\n')[0]
-                disk_size_bytes = int(disk_size_bytes_str)
-
-                total_blocks = math.ceil(disk_size_bytes / dd_bs_in_bytes)
-                
-                command = ['pkexec', 'dd', 'if=/dev/zero', f'of={disk_path}', 
-                           f'bs={dd_bs_in_bytes}', f'count={total_blocks}', 'status=progress', 'oflag=sync'] 
+                # Boyutla birlikte sektör ve optimal I/O değerlerini de alıyoruz
+                result = subprocess.run(['lsblk', '-bdno', 'SIZE,LOG-SEC,PHY-SEC,OPT-IO', disk_path],
+                                        capture_output=True, text=True, check=True)
+                fields = result.stdout.split()
+                disk_size_bytes = int(fields[0])
+                phy_sec = int(fields[2]) if len(fields) > 2 else 512
+                opt_io = int(fields[3]) if len(fields) > 3 else 0
+
+                # Blok boyu fiziksel sektörün (RAID'de tam şeridin) katı olsun ki yazmalar hizalı gitsin
+                align = opt_io if opt_io and opt_io % phy_sec == 0 else phy_sec
+                dd_bs_in_bytes = max(align, dd_bs_in_bytes - dd_bs_in_bytes % align)
+
+                # count_bytes ile tam disk boyu kadar yazıyoruz; son parça kalan kadar (sektör katı).
+                # Eskiden count=ceil ile diskin sonunu aşıp "No space left" hatasını başarı sayıyorduk,
+                # bu da gerçek yazma hatalarını gizliyordu.
+                command = ['pkexec', 'dd', 'if=/dev/zero', f'of={disk_path}',
+                           f'bs={dd_bs_in_bytes}', f'count={disk_size_bytes}', 'iflag=count_bytes',
+                           'status=progress', 'oflag=sync']
                 
                 process = subprocess.Popen(command, stderr=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
                 
@@ -502,23 +571,7 @@ class LLFTool(QWidget):
                     if stdout_output:
                         full_error_message += f"\nStdout: {stdout_output.strip()}"
                     
-                    # Dd'nin disk dolduğunda döndürdüğü hata mesajlarını kontrol et
-                    # İngilizce ve Türkçe varyasyonları kontrol edelim
-                    disk_full_messages = [
-                        "No space left on device",  # Common English error
-                        "disk doldu",               # Common Turkish error (dd'nin Türkçeleştirilmiş çıktısı)
-                        "Yazma sırasında hata: Cihazda yer kalmadı", # Another possible Turkish error
-                        "Error writing: No space left on device" # Another common English error
-                    ]
-                    
-                    is_disk_full_error = any(msg.lower() in stderr_output.lower() for msg in disk_full_messages)
-
-                    if is_disk_full_error:
-                        # Eğer disk doldu hatası ise, işlemi başarılı say
-                        QApplication.instance().postEvent(self, OperationCompleteEvent(True, operation_type, self.tr_text("Disk doldu. İşlem başarıyla tamamlandı.")))
-                    else:
-                        # Gerçek bir hata ise, hatayı bildir
-                        QApplication.instance().postEvent(self, OperationCompleteEvent(False, operation_type, full_error_message))
+                    QApplication.instance().postEvent(self, OperationCompleteEvent(False, operation_type, full_error_message))
                 else:
                     QApplication.instance().postEvent(self, OperationCompleteEvent(True, operation_type))
 
@@ -599,6 +652,11 @@ class LLFTool(QWidget):
                 QMessageBox.critical(self, self.tr_text("Hata"), message)
 
 
+    def closeEvent(self, event):
+        if self.helper is not None:
+            self.helper.close()
+        super().closeEvent(event)
+
     def format_time(self, seconds):
         if seconds is None:
             return "N/A"
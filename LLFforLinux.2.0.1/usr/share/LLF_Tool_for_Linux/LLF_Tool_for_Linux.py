@@ -4,9 +4,8 @@
 import sys
 import os
 import subprocess
-import re
-import signal
 import json
+import html
 import webbrowser
 
 # Ortam değişkenleri Qt yüklenmeden önce tanımlanmalı
@@ -20,22 +19,43 @@ from PyQt6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QPushButton, QLabel, 
     QHeaderView, QTabWidget, QTextEdit, QProgressBar, 
     QCheckBox, QFrame, QStackedWidget, QDialog, QMessageBox,
-    QAbstractItemView
+    QAbstractItemView, QSpinBox, QLineEdit, QFormLayout, QComboBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer, QObject
 from PyQt6.QtGui import QIcon, QFont, QColor
 
+from llf_engine import CancelToken, human_size
+from llf_api import wipe
+from llf_devices import (
+    describe_problems, group_physical_disks, physical_key, preflight, probe_device, probe_devices,
+    system_usage, transport,
+)
+from llf_hotplug import HotplugMonitor
+from llf_scheduler import JobScheduler, DEFAULT_CONCURRENCY
+from llf_station import StationPolicy, WipeStation
+from llf_tuning import restore_stale
+from llf_daemon import connect_scheduler
+
 class FormatConfirmDialog(QDialog):
-    def __init__(self, device_path, device_model, parent=None):
+    # Toplu işte devices = [(yol, model), ...]; tek cihazda device_path / device_model
+    def __init__(self, device_path, device_model, parent=None, devices=None):
         super().__init__(parent)
         self.setWindowTitle("Confirm Device Format")
         self.setFixedWidth(450)
         layout = QVBoxLayout(self)
 
+        if devices:
+            rows = "".join(f"<li><b>{html.escape(path)}</b> &mdash; {html.escape(model)}</li>"
+                           for path, model in devices)
+            target_text = (f"You are about to perform a Low Level Format on the following "
+                           f"<b>{len(devices)} devices</b>:<ul>{rows}</ul>")
+        else:
+            target_text = (f"You are about to perform a Low Level Format on the following device:<br><br>"
+                           f"<b>Device:</b> {device_path}<br>"
+                           f"<b>Model:</b> {device_model}<br><br>")
+
         warning_text = (
-    f"You are about to perform a Low Level Format on the following device:<br><br>"
-    f"<b>Device:</b> {device_path}<br>"
-    f"<b>Model:</b> {device_model}<br><br>"
+    target_text +
     "Once you start the process, the disk will be filled with zeros from beginning to end, "
     "and all data will be <b>irreversibly erased</b> (data recovery software will not work). "
     "Therefore, it is <b>STRONGLY RECOMMENDED</b> to ensure you have selected the correct disk "
@@ -52,7 +72,8 @@ class FormatConfirmDialog(QDialog):
 
         layout.addSpacing(10)
         # kullanıcıya uyanık olmasını sağlayalım ve riskleri kabul ettirelim. 
-        self.confirm_cb = QCheckBox("I am sure I selected the correct disk and I know what I am doing.\n"
+        self.confirm_cb = QCheckBox(f"I am sure I selected the correct {'disks' if devices else 'disk'} "
+                                    "and I know what I am doing.\n"
                                     "I am responsible for any potential issues.")
         
         layout.addWidget(self.confirm_cb)
@@ -77,93 +98,167 @@ class FormatConfirmDialog(QDialog):
         self.confirm_cb.toggled.connect(lambda checked: self.start_btn.setEnabled(checked))
         self.start_btn.clicked.connect(self.accept)
     
+class StationPolicyDialog(QDialog):
+    def __init__(self, policy, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Station Mode Policy")
+        self.setFixedWidth(420)
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.buses_edit = QLineEdit(", ".join(policy.buses))
+        self.buses_edit.setPlaceholderText("usb, sata, nvme, sas (empty = any)")
+        form.addRow("Buses:", self.buses_edit)
+
+        self.min_spin = QSpinBox()
+        self.min_spin.setRange(0, 100000)
+        self.min_spin.setSuffix(" GB")
+        self.min_spin.setValue(int(policy.min_size / 1e9))
+        form.addRow("Minimum size:", self.min_spin)
+
+        self.max_spin = QSpinBox()
+        self.max_spin.setRange(0, 100000)
+        self.max_spin.setSuffix(" GB")
+        self.max_spin.setSpecialValueText("No limit")
+        self.max_spin.setValue(int((policy.max_size or 0) / 1e9))
+        form.addRow("Maximum size:", self.max_spin)
+
+        self.models_edit = QLineEdit(", ".join(policy.models))
+        self.models_edit.setPlaceholderText("Model allowlist (empty = any)")
+        form.addRow("Models:", self.models_edit)
+
+        self.quick_cb = QCheckBox("Quick wipe instead of full format")
+        self.quick_cb.setChecked(policy.quick_wipe)
+        form.addRow("", self.quick_cb)
+        layout.addLayout(form)
+
+        note = QLabel("System disks and devices that are mounted or in use are never queued.")
+        note.setWordWrap(True)
+        layout.addWidget(note)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        ok_btn = QPushButton("Save")
+        ok_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(cancel_btn)
+        btn_layout.addWidget(ok_btn)
+        layout.addLayout(btn_layout)
+
+    def policy(self):
+        split = lambda text: [t.strip() for t in text.split(",") if t.strip()]
+        return StationPolicy(
+            buses=split(self.buses_edit.text()),
+            min_size=self.min_spin.value() * 1e9,
+            max_size=self.max_spin.value() * 1e9 or None,
+            models=split(self.models_edit.text()),
+            quick_wipe=self.quick_cb.isChecked(),
+        )
+
+# I/O önceliği seçenekleri (ionice sınıfları)
+IO_CLASS_CHOICES = (
+    ("Normal", None),
+    ("Low (best-effort 7)", "best-effort"),
+    ("Idle (only when the disk is free)", "idle"),
+)
+
+
 class FormatWorker(QThread):
     progress_signal = pyqtSignal(dict)
     finished_signal = pyqtSignal(bool, str)
     log_signal = pyqtSignal(str)
 
-    def __init__(self, device_path, quick_wipe=False):
+    def __init__(self, device_path, quick_wipe=False, tune_queue=False, rate_limit=None,
+                 io_class=None, cgroup=False):
         super().__init__()
         self.device_path = device_path
         self.quick_wipe = quick_wipe
-        self._is_running = True
+        self.tune_queue = tune_queue
+        self.rate_limit = rate_limit
+        self.io_class = io_class
+        self.cgroup = cgroup
+        # Durdurma/duraklatma artık motorun her yazmadan önce baktığı token üzerinden
+        self.token = CancelToken()
+        self.wipe_run = None
+        self._reported = False
+
+    def report_finished(self, success, message):
+        # Takılan bir cihazda sonuç iki kez gelebilir (watchdog + motor), sadece ilkini iletelim
+        if self._reported:
+            return
+        self._reported = True
+        self.finished_signal.emit(success, message)
+
+    def handle_engine_hung(self, offset):
+        self.report_finished(False, f"The device stopped responding at offset {offset}. "
+                                    "The job was abandoned.")
 
     def stop(self):
-        self._is_running = False
-        if hasattr(self, 'process'):
-            
-            # Bura biraz hassas. İşlem duracaksa tam durmalı. 
-            try:
-                # Sadece süreci değil, ona bağlı alt süreçleri de durdurur
-                os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
-            except:
-                pass
+        self.token.stop()
 
-    def run(self):       
-        # 1. DOĞRUDAN YAZMA (Direct I/O): İşletim sisteminin 'yazıldı' deyip 
-        # yalan söylemesini engellemek için -d (direct) ekliyoruz.
-        # Bu, hızı düşürür ama gerçek zamanlı takibi sağlar.
-        try:
-            if self.quick_wipe:
-                # İlk 10MB'ye ziro fill yapıyoruz.
-                cmd = ["ddrescue", "--force", "-v", "--synchronous", "--size=10M", "/dev/zero", self.device_path]
-            else:
-                size_cmd = ["blockdev", "--getsize64", self.device_path] 
-                dev_size = subprocess.check_output(size_cmd).decode().strip()
-                cmd = ["ddrescue", "--force", "-v", "--synchronous", f"--size={dev_size}", "/dev/zero", self.device_path]
-        except:
-            # bu işlem de ddrescue ile yapılmalı. dd iyi değil. 
-            cmd = ["ddrescue", "--force", "-v", "--synchronous", "/dev/zero", self.device_path]
+    def pause(self):
+        self.token.pause()
 
-        try:
-            self.process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                text=True, 
-                bufsize=1,
-                universal_newlines=True,
-                preexec_fn=os.setsid # Process grubunu ayırıyoruz (Durdurabilmek için şart)
-            )
-
-            for line in self.process.stdout:
-                if not self._is_running:
-                    try:
-                        os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
-                    except:
-                        pass
-                    self.finished_signal.emit(False, "Process stopped by user.")
-                    return
-                
-                self.log_signal.emit(line.strip())
-                
-                # Regex takibi (Daha kararlı)
-                pos_match = re.search(r"(?:ipos|opos):\s+([\d\.]+\s+\w+)", line)
-                rate_match = re.search(r"(?:average|current) rate:\s+([\d\.]+\s+\w+/s)", line)
-                pct_match = re.search(r"pct\s+(?:rescued|done):\s+([\d\.]+)", line)
-
-                stats = {}
-                if pos_match: stats['pos'] = pos_match.group(1)
-                if rate_match: stats['rate'] = rate_match.group(1)
-                if pct_match: stats['pct'] = float(pct_match.group(1))
-                
-                if stats:
-                    self.progress_signal.emit(stats)
+    def resume(self):
+        self.token.resume()
 
-            self.process.wait()
+    def set_rate_limit(self, rate):
+        # Çalışırken de değiştirilebilir; motor henüz yoksa başlarken kullanılır
+        self.rate_limit = rate
+        if self.wipe_run is not None:
+            self.wipe_run.set_rate_limit(rate)
 
-            # 2. SYNC ÇÖZÜMÜ: ddrescue bitse bile işletim sistemine 
-            # 'tamponu boşalt ve fiziksel yazmayı bitir' emri veriyoruz.
-            self.log_signal.emit("Finalizing: Flushing write buffers (sync)...")
-            subprocess.run(["sync"])
+    def set_io_class(self, io_class):
+        self.io_class = io_class
+        if self.wipe_run is not None:
+            self.wipe_run.set_io_class(io_class)
 
-            if self.process.returncode == 0:
-                self.finished_signal.emit(True, "Format completed successfully.")
-            else:
-                self.finished_signal.emit(False, f"Error Code: {self.process.returncode}")
+    def handle_engine_progress(self, stats):
+        # Arayüz eskiden ddrescue'nun metin çıktısını bekliyordu, aynı anahtarları koruyoruz
+        self.progress_signal.emit({
+            'pos': human_size(stats['offset']),
+            'rate': f"{human_size(stats['rate'])}/s",
+            'pct': round(stats['pct'], 2),
+            'state': stats['state'],
+            'stalled': stats['stalled'],
+            'io_age': stats['io_age'] or 0,
+        })
 
-        except Exception as e:
-            self.finished_signal.emit(False, str(e))
+    def handle_event(self, event):
+        if event["type"] == "progress":
+            self.handle_engine_progress(event)
+        elif event["type"] == "log":
+            self.log_signal.emit(event["message"])
+        elif event["type"] == "result":
+            # Çekirdeğin bu cihaz için bildirdiği hatalar varsa mesaja ekleyelim
+            message = event["message"]
+            if event.get("errors"):
+                message = f"{message}\n\n{event['errors']}"
+            self.report_finished(event["ok"], message)
+
+    def run(self):
+        # Komut satırı ve yardımcı süreçle aynı çekirdek (llf_api). Motor bitişte sadece hedef
+        # cihazı flush ediyor (fsync + BLKFLSBUF); eskiden buradaki global "sync" diğer
+        # disklerin kirli verisini de bekliyordu.
+        self.wipe_run = wipe(
+            self.device_path,
+            mode="quick" if self.quick_wipe else "full",
+            token=self.token,
+            hung_callback=self.handle_engine_hung,
+            tune_queue=self.tune_queue,
+            rate_limit=self.rate_limit,
+            io_class=self.io_class,
+            cgroup=self.cgroup,
+        )
+        self.wipe_run.run(listener=self.handle_event)
+
+class HotplugBridge(QObject):
+    # Monitör kendi thread'inde çalışıyor; olayları sinyal ile ana thread'e taşıyoruz
+    device_event = pyqtSignal(str, str)
+
+    def handle(self, action, name, props):
+        self.device_event.emit(action, name)
 
 class LLFToolSkeleton(QWidget):
     
@@ -181,10 +276,63 @@ class LLFToolSkeleton(QWidget):
         self.app_font = QFont("Liberation Sans", 10)
         self.setFont(self.app_font)
         
-        self.init_ui()
         self.worker = None
+        self.abandoned_workers = []
+        # Önceki oturum çöktüyse ayarlanmış kalan blok kuyruğu değerlerini geri al
+        restore_stale()
+        # Çoklu disk formatı: her disk kendi motoruyla, aynı anda en fazla N iş.
+        # İşler arka plan servisinde çalışıyor; arayüz kapansa da devam ediyorlar.
+        self.scheduler = self.attach_scheduler()
+        # Takılan/çıkarılan diskleri netlink (ya da pyudev) üzerinden dinliyoruz
+        self.device_rows = []
+        self.hotplug = HotplugMonitor()
+        self.hotplug_bridge = HotplugBridge()
+        self.hotplug_bridge.device_event.connect(self.handle_hotplug_event)
+        self.hotplug.add_listener(self.hotplug_bridge.handle)
+        # İstasyon modu: kurala uyan yeni takılan cihazlar otomatik kuyruğa girer
+        self.station = WipeStation(self.scheduler, StationPolicy.load(), self.hotplug)
+
+        # Arayüz, zamanlayıcı ve istasyon nesneleri oluştuktan sonra kurulmalı
+        self.init_ui()
+        self.batch_timer = QTimer(self)
+        self.batch_timer.timeout.connect(self.update_batch_table)
+        self.batch_timer.start(500)
         self.refresh_device_list()
+        self.hotplug.start()
     
+    def attach_scheduler(self):
+        try:
+            return connect_scheduler()
+        except Exception:
+            # Servis başlatılamadı; işler eskisi gibi bu süreçte çalışsın
+            return JobScheduler(DEFAULT_CONCURRENCY)
+
+    def create_rate_limit_spin(self):
+        spin = QSpinBox()
+        spin.setRange(0, 100000)
+        spin.setSingleStep(10)
+        spin.setSuffix(" MB/s")
+        spin.setSpecialValueText("Unlimited")
+        return spin
+
+    def create_io_class_combo(self):
+        combo = QComboBox()
+        for text, io_class in IO_CLASS_CHOICES:
+            combo.addItem(text, io_class)
+        return combo
+
+    def handle_rate_limit_changed(self, value):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.set_rate_limit(value * 1e6 or None)
+
+    def handle_io_class_changed(self, index):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.set_io_class(self.io_class_combo.itemData(index))
+
+    def handle_tune_queue_toggled(self, checked):
+        # Toplu işler de aynı ayarı kullansın (sonradan başlayan işler için geçerli)
+        self.scheduler.set_engine_option("tune_queue", checked)
+
     def handle_continue_button(self):
         selected_row = self.device_table.currentRow()
         if selected_row == -1:
@@ -229,7 +377,7 @@ class LLFToolSkeleton(QWidget):
                 self.details_text.setPlainText(result.stdout)
             else:
                 # USB uyarısını buraya da ekleyelim
-                is_usb = subprocess.check_output(["lsblk", "-no", "TRAN", device_path], text=True).strip().lower() == "usb"
+                is_usb = transport(device_path) == "usb"
                 if is_usb:
                     msg = ("S.M.A.R.T does not work for devices connected via USB. "
                            "Therefore, you cannot view detailed information about the selected device.")
@@ -289,67 +437,114 @@ class LLFToolSkeleton(QWidget):
 
         msg.exec()
     
-    def is_system_device(self, device_path):
+    def is_system_device(self, device_path, usage=None):
+        # lsblk yerine /proc/self/mountinfo, /proc/swaps ve sysfs holders üzerinden bakıyoruz.
+        # Kök, /boot, swap ya da bunları taşıyan LVM/crypt zinciri varsa sistem diskidir.
         try:
-            # lsblk ile cihazın mount pointlerini kontrol et
-            output = subprocess.check_output(["lsblk", "-no", "MOUNTPOINT", device_path], text=True)
-            mount_points = output.strip().split('\n')
-            # Eğer / veya /boot/efi gibi kritik yerlere bağlıysa True döndür
-            for mp in mount_points:
-                if mp == "/" or mp.startswith("/boot"):
-                    return True
-            return False
-        except:
+            return any(p["system"] for p in preflight(device_path, usage))
+        except Exception:
             return False
     
     def refresh_device_list(self):
-        # lsblk komutunu JSON formatında, ihtiyacımız olan sütunlarla çağırıyoruz
-        cmd = ["lsblk", "-J", "-b", "-d", "-o", "NAME,MODEL,REV,SERIAL,SIZE,TRAN"]
+        # lsblk çağırmak yerine /sys/block ve udev veritabanını doğrudan okuyoruz;
+        # multipath (dm-mpath) aygıtlarının alt yolları da probe_devices içinde işaretleniyor
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-            devices = data.get("blockdevices", [])
+            nodes = probe_devices()
+            # Aynı fiziksel diske giden yolları tek satırda topluyoruz
+            self.device_rows = group_physical_disks(nodes)
             
-            self.device_table.setRowCount(len(devices))
-            self.status_label.setText(f"Disks found: {len(devices)}")
+            self.device_table.setRowCount(len(self.device_rows))
+            # mount ve swap bilgisini tüm liste için bir kez okuyoruz
+            usage = system_usage()
             
-            for row, dev in enumerate(devices):
-                # Sütunlar: BUS, MODEL, FIRMWARE, SERIAL NUMBER, LBA (Şimdilik boş), CAPACITY
-                path = f"/dev/{dev.get('name', '')}"
-                bus = dev.get("tran", "N/A").upper()
-                model = dev.get("model", "Unknown")
-                rev = dev.get("rev", "")
-                serial = dev.get("serial", "N/A")
-                size_bytes = int(dev.get("size", 0))
-                size_gb = f"{size_bytes / (1000**3):.1f} GB"
-                
-                self.device_table.setItem(row, 0, QTableWidgetItem(bus))
-                # USB bellekler genellikle "usb" olarak döner, daha okunaklı yapalım
-                display_bus = bus if bus != "N/A" else "UNKNOWN"
-                self.device_table.setItem(row, 0, QTableWidgetItem(display_bus))
-                # Sistem diski mi kontrol et ve ismi ona göre yaz
-                is_sys = self.is_system_device(path)
-                display_model = f"{model} (SYSTEM)" if is_sys else model
-                model_item = QTableWidgetItem(display_model)
-                if is_sys:
-                    model_item.setForeground(QColor("red")) # <-- Dikkat çekmesi açısından rengi kırmızı yaptım. 
-                
-                self.device_table.setItem(row, 1, model_item)
-                self.device_table.setItem(row, 2, QTableWidgetItem(rev))
-                self.device_table.setItem(row, 3, QTableWidgetItem(serial))
-                # Bura cillop oldu burayı böyle bırakalım. 
-                
-                # LBA yerine varsa cihazın tipini (disk/rom) yazabiliriz veya boş bırakabiliriz
-                dev_type = dev.get("type", "disk")
-                self.device_table.setItem(row, 4, QTableWidgetItem(dev_type.upper()))
-                self.device_table.setItem(row, 5, QTableWidgetItem(size_gb))
-    
-                # Cihaz yolunu (path) gizli veri olarak ilk sütuna saklayalım
-                self.device_table.item(row, 0).setData(Qt.ItemDataRole.UserRole, path)
+            for row, dev in enumerate(self.device_rows):
+                self.set_device_row(row, dev, usage)
+            self.status_label.setText(f"Disks found: {len(self.device_rows)}")
                 
         except Exception as e:
             self.status_label.setText(f"Error listing disks: {str(e)}")
 
+    def set_device_row(self, row, dev, usage=None):
+        # Sütunlar: BUS, MODEL, FIRMWARE, SERIAL NUMBER, LBA (Şimdilik boş), CAPACITY
+        path = dev["path"]
+        bus = (dev.get("tran") or "N/A").upper()
+        model = dev.get("model") or "Unknown"
+        rev = dev.get("rev") or ""
+        serial = dev.get("serial") or "N/A"
+        size_bytes = int(dev.get("size") or 0)
+        size_gb = f"{size_bytes / (1000**3):.1f} GB"
+        
+        # USB bellekler genellikle "usb" olarak döner, daha okunaklı yapalım
+        display_bus = bus if bus != "N/A" else "UNKNOWN"
+        self.device_table.setItem(row, 0, QTableWidgetItem(display_bus))
+        # Sistem diski mi kontrol et ve ismi ona göre yaz
+        is_sys = self.is_system_device(path, usage)
+        display_model = f"{model} (SYSTEM)" if is_sys else model
+        model_item = QTableWidgetItem(display_model)
+        if is_sys:
+            model_item.setForeground(QColor("red")) # <-- Dikkat çekmesi açısından rengi kırmızı yaptım. 
+        
+        self.device_table.setItem(row, 1, model_item)
+        self.device_table.setItem(row, 2, QTableWidgetItem(rev))
+        self.device_table.setItem(row, 3, QTableWidgetItem(serial))
+        # Bura cillop oldu burayı böyle bırakalım. 
+        
+        # LBA yerine varsa cihazın tipini (disk/rom) yazabiliriz veya boş bırakabiliriz
+        dev_type = (dev.get("type") or "disk").upper()
+        if dev["multipath"]:
+            dev_type = f"MPATH ({len(dev['paths'])})"
+        elif len(dev["paths"]) > 1:
+            dev_type = f"{dev_type} ({len(dev['paths'])} paths)"
+        type_item = QTableWidgetItem(dev_type)
+        type_item.setToolTip("\n".join(sorted(dev["paths"])))
+        self.device_table.setItem(row, 4, type_item)
+        self.device_table.setItem(row, 5, QTableWidgetItem(size_gb))
+
+        # Cihaz yolunu (path) gizli veri olarak ilk sütuna saklayalım
+        self.device_table.item(row, 0).setData(Qt.ItemDataRole.UserRole, path)
+
+    def handle_hotplug_event(self, action, name):
+        # Tüm listeyi baştan okumadan sadece değişen satırı ekleyip siliyoruz
+        path = f"/dev/{name}"
+        if name.startswith(("dm-", "sr")):
+            return
+        index = next((i for i, dev in enumerate(self.device_rows) if path in dev["paths"]), None)
+
+        if action == "remove":
+            if index is None:
+                return
+            dev = self.device_rows[index]
+            dev["paths"].remove(path)
+            if not dev["paths"]:
+                del self.device_rows[index]
+                self.device_table.removeRow(index)
+            else:
+                if dev["path"] == path:
+                    dev["path"] = dev["multipath"] or sorted(dev["paths"])[0]
+                self.set_device_row(index, dev)
+        else:
+            info = probe_device(name)
+            if index is None:
+                # Aynı fiziksel diskin başka bir yolu zaten listedeyse ona ekleyelim
+                key = physical_key(info)
+                index = next((i for i, dev in enumerate(self.device_rows)
+                              if physical_key(dev) == key), None)
+            if index is None:
+                info["paths"] = [path]
+                self.device_rows.append(info)
+                index = len(self.device_rows) - 1
+                self.device_table.insertRow(index)
+            else:
+                dev = self.device_rows[index]
+                if path not in dev["paths"]:
+                    dev["paths"].append(path)
+                # Kapasite/medya değişmiş olabilir (kart okuyucu, "change" olayı)
+                if dev["path"] == path:
+                    dev["size"] = info["size"]
+                info = dev
+            self.set_device_row(index, info)
+        self.status_label.setText(f"Disks found: {len(self.device_rows)}")
+
     def refresh_smart_data(self, device_path):
         self.smart_table.setRowCount(0)
         
@@ -365,7 +560,7 @@ class LLFToolSkeleton(QWidget):
 
             if not (has_ata or has_nvme):
                 # Veri gelmediyse şimdi USB kontrolü yapalım
-                is_usb = subprocess.check_output(["lsblk", "-no", "TRAN", device_path], text=True).strip().lower() == "usb"
+                is_usb = transport(device_path) == "usb"
                 if is_usb:
                     msg = "S.M.A.R.T. data is often unavailable for USB-connected devices. Your device may not support this over USB."
                 else:
@@ -426,6 +621,10 @@ class LLFToolSkeleton(QWidget):
         self.operation_page = self.create_operation_page()
         self.main_stack.addWidget(self.operation_page)
 
+        # 3. EKRAN: Çoklu disk (batch) iş listesi
+        self.batch_page = self.create_batch_page()
+        self.main_stack.addWidget(self.batch_page)
+
     def create_device_selection_page(self):
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -450,7 +649,8 @@ class LLFToolSkeleton(QWidget):
         # Cihaz Listesi Tablosu
         self.device_table = QTableWidget(5, 6) 
         self.device_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.device_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        # Batch format için birden fazla disk seçilebilsin (Ctrl/Shift ile)
+        self.device_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.device_table.setHorizontalHeaderLabels([
             "BUS", "MODEL", "FIRMWARE", "SERIAL NUMBER", "LBA", "CAPACITY"
         ])
@@ -479,6 +679,25 @@ class LLFToolSkeleton(QWidget):
         bottom_layout.addWidget(self.status_label)
         bottom_layout.addStretch()
         
+        self.batch_quick_cb = QCheckBox("Quick wipe")
+        bottom_layout.addWidget(self.batch_quick_cb)
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.setFixedSize(80, 35)
+        refresh_btn.clicked.connect(self.refresh_device_list)
+        bottom_layout.addWidget(refresh_btn)
+
+        batch_btn = QPushButton("Batch Format")
+        batch_btn.setFixedSize(120, 35)
+        batch_btn.setToolTip("Format all selected devices, several at a time.")
+        batch_btn.clicked.connect(self.handle_batch_button)
+        bottom_layout.addWidget(batch_btn)
+
+        jobs_btn = QPushButton("Jobs")
+        jobs_btn.setFixedSize(80, 35)
+        jobs_btn.clicked.connect(lambda: self.main_stack.setCurrentIndex(2))
+        bottom_layout.addWidget(jobs_btn)
+
         continue_btn = QPushButton("Continue >>>")
         continue_btn.setFixedSize(120, 35)
         continue_btn.clicked.connect(self.handle_continue_button)
@@ -562,6 +781,15 @@ class LLFToolSkeleton(QWidget):
         self.quick_wipe_cb = QCheckBox("Perform quick wipe (just remove partitions and MBR)")
         bottom_grid.addWidget(self.quick_wipe_cb, 0, 2, Qt.AlignmentFlag.AlignRight)
 
+        # Row 1, Column 1: Blok kuyruğu ayarı (zamanlayıcı, nr_requests, max_sectors_kb, read-ahead)
+        self.tune_queue_cb = QCheckBox("Tune block queue during the wipe")
+        self.tune_queue_cb.setToolTip("Temporarily switches the I/O scheduler, request queue size, "
+                                      "maximum request size and read-ahead to throughput-friendly values.\n"
+                                      "The original values are restored when the job ends.")
+        self.tune_queue_cb.setChecked(bool(self.scheduler.engine_options.get("tune_queue")))
+        self.tune_queue_cb.toggled.connect(self.handle_tune_queue_toggled)
+        bottom_grid.addWidget(self.tune_queue_cb, 1, 1, Qt.AlignmentFlag.AlignCenter)
+
         # Row 1, Column 0: Sector (Left)
         self.sector_label = QLabel("Current sector:  0")
         self.sector_label.setFont(QFont("Liberation Sans", 11))
@@ -569,17 +797,36 @@ class LLFToolSkeleton(QWidget):
 
         # Row 1, Column 2: Buttons (Right)
         btn_h_layout = QHBoxLayout()
-        btn_h_layout.setSpacing(48)
+        btn_h_layout.setSpacing(24)
         self.stop_btn = QPushButton("Stop")
         self.stop_btn.setFixedSize(100, 30)
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.setFixedSize(100, 30)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.clicked.connect(self.handle_pause_button)
         self.format_btn = QPushButton("FORMAT THIS DEVICE")
         self.format_btn.clicked.connect(self.handle_format_button)
         self.format_btn.setFixedSize(180, 30)
         self.format_btn.setStyleSheet("font-weight: bold;")
+        btn_h_layout.addWidget(self.pause_btn)
         btn_h_layout.addWidget(self.stop_btn)
         btn_h_layout.addWidget(self.format_btn)
         bottom_grid.addLayout(btn_h_layout, 1, 2, Qt.AlignmentFlag.AlignRight)
 
+        # Row 2: Hız sınırı ve I/O önceliği (iş sürerken de değiştirilebilir)
+        throttle_layout = QHBoxLayout()
+        throttle_layout.addWidget(QLabel("Speed limit (MB/s, 0 = unlimited):"))
+        self.rate_limit_spin = self.create_rate_limit_spin()
+        self.rate_limit_spin.valueChanged.connect(self.handle_rate_limit_changed)
+        throttle_layout.addWidget(self.rate_limit_spin)
+        throttle_layout.addSpacing(16)
+        throttle_layout.addWidget(QLabel("I/O priority:"))
+        self.io_class_combo = self.create_io_class_combo()
+        self.io_class_combo.currentIndexChanged.connect(self.handle_io_class_changed)
+        throttle_layout.addWidget(self.io_class_combo)
+        throttle_layout.addStretch()
+        bottom_grid.addLayout(throttle_layout, 2, 0, 1, 3)
+
         form_layout.addLayout(bottom_grid)
         
         tabs.addTab(format_tab, "LOW-LEVEL FORMAT")
@@ -650,6 +897,14 @@ class LLFToolSkeleton(QWidget):
 
         device_path = self.device_table.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
         device_model = self.device_table.item(selected_row, 1).text()
+
+        # Mount edilmiş, swap olarak kullanılan ya da RAID/LVM/dm-crypt üyesi diske yazmıyoruz
+        problems = preflight(device_path)
+        if problems:
+            QMessageBox.critical(self, "Device In Use",
+                f"The device {device_path} is currently in use:\n\n{describe_problems(problems)}\n\n"
+                "Unmount it or stop the RAID/LVM/dm-crypt volume before formatting.")
+            return
         
         dialog = FormatConfirmDialog(device_path, device_model, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -657,11 +912,20 @@ class LLFToolSkeleton(QWidget):
             self.format_btn.setEnabled(False)
             self.back_btn.setEnabled(False)
             self.quick_wipe_cb.setEnabled(False)
+            self.tune_queue_cb.setEnabled(False)
             self.log_output.clear()
             self.log_output.append(f"<b>Starting LLF process for {device_path}...</b><br>")
 
+            # Takılı kalmış eski bir worker varsa referansını tutalım, Qt onu çalışırken silmesin
+            if self.worker is not None and self.worker.isRunning():
+                self.abandoned_workers.append(self.worker)
+
             # Worker'ı oluştur ve başlat
-            self.worker = FormatWorker(device_path, self.quick_wipe_cb.isChecked())
+            self.worker = FormatWorker(device_path, self.quick_wipe_cb.isChecked(),
+                                       self.tune_queue_cb.isChecked(),
+                                       rate_limit=self.rate_limit_spin.value() * 1e6 or None,
+                                       io_class=self.io_class_combo.currentData(),
+                                       cgroup=self.scheduler.engine_options.get("cgroup", False))
             self.worker.log_signal.connect(lambda msg: self.log_output.append(msg) if "[A" not in msg else None)
             self.worker.progress_signal.connect(self.update_progress_ui)
             self.worker.finished_signal.connect(self.handle_format_finished)
@@ -672,9 +936,275 @@ class LLFToolSkeleton(QWidget):
             except (TypeError, RuntimeError):
                 pass
             self.stop_btn.clicked.connect(self.worker.stop)
+            self.pause_btn.setText("Pause")
+            self.pause_btn.setEnabled(True)
             
             self.worker.start()
 
+    def handle_pause_button(self):
+        if self.worker is None or not self.worker.isRunning():
+            return
+        # Duraklatınca motor bekleyen yazmaları bitirir ve kaldığı offset'te bekler
+        if self.worker.token.paused:
+            self.worker.resume()
+            self.pause_btn.setText("Pause")
+        else:
+            self.worker.pause()
+            self.pause_btn.setText("Resume")
+
+    def create_batch_page(self):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+
+        header = QLabel("BATCH FORMAT JOBS")
+        if getattr(self.scheduler, "remote", False):
+            header.setText(f"BATCH FORMAT JOBS (background service, pid {self.scheduler.pid})")
+            header.setToolTip("Jobs keep running after this window is closed. "
+                              "Open the tool again to reattach.")
+        header.setFont(QFont("Liberation Sans", 10, QFont.Weight.Bold))
+        layout.addWidget(header)
+
+        self.batch_table = QTableWidget(0, 7)
+        self.batch_table.setHorizontalHeaderLabels([
+            "#", "DEVICE", "MODEL", "STATE", "PROGRESS", "SPEED", "ETA"
+        ])
+        self.batch_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.batch_table.horizontalHeader().setStretchLastSection(True)
+        self.batch_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.batch_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.batch_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.batch_table)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Concurrent jobs:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 64)
+        self.concurrency_spin.setValue(self.scheduler.max_concurrent)
+        self.concurrency_spin.valueChanged.connect(self.scheduler.set_max_concurrent)
+        controls.addWidget(self.concurrency_spin)
+        controls.addWidget(QLabel("Per controller/hub (0 = auto):"))
+        self.group_limit_spin = QSpinBox()
+        self.group_limit_spin.setRange(0, 64)
+        self.group_limit_spin.setValue(self.scheduler.default_group_limit or 0)
+        self.group_limit_spin.valueChanged.connect(self.scheduler.set_default_group_limit)
+        controls.addWidget(self.group_limit_spin)
+        controls.addStretch()
+
+        for text, handler in (("Pause", self.scheduler.pause),
+                              ("Resume", self.scheduler.resume),
+                              ("Stop", self.scheduler.stop)):
+            btn = QPushButton(text)
+            btn.setFixedWidth(80)
+            btn.clicked.connect(lambda checked=False, h=handler: self.apply_to_selected_jobs(h))
+            controls.addWidget(btn)
+
+        stop_all_btn = QPushButton("Stop All")
+        stop_all_btn.setFixedWidth(90)
+        stop_all_btn.clicked.connect(self.scheduler.stop_all)
+        controls.addWidget(stop_all_btn)
+
+        clear_btn = QPushButton("Clear Finished")
+        clear_btn.setFixedWidth(110)
+        clear_btn.clicked.connect(self.scheduler.clear_finished)
+        controls.addWidget(clear_btn)
+        layout.addLayout(controls)
+
+        throttle = QHBoxLayout()
+        throttle.addWidget(QLabel("All jobs limit:"))
+        self.global_limit_spin = self.create_rate_limit_spin()
+        self.global_limit_spin.setValue(int((self.scheduler.global_limit.rate or 0) / 1e6))
+        self.global_limit_spin.valueChanged.connect(
+            lambda value: self.scheduler.set_global_rate_limit(value * 1e6 or None))
+        throttle.addWidget(self.global_limit_spin)
+        throttle.addSpacing(16)
+        throttle.addWidget(QLabel("Selected jobs:"))
+        self.job_limit_spin = self.create_rate_limit_spin()
+        throttle.addWidget(self.job_limit_spin)
+        self.job_io_class_combo = self.create_io_class_combo()
+        throttle.addWidget(self.job_io_class_combo)
+        apply_btn = QPushButton("Apply")
+        apply_btn.setFixedWidth(80)
+        apply_btn.clicked.connect(self.handle_apply_job_throttle)
+        throttle.addWidget(apply_btn)
+        throttle.addStretch()
+        self.cgroup_cb = QCheckBox("Enforce in kernel (cgroup io.max)")
+        self.cgroup_cb.setToolTip("Also applies the speed limits with the cgroup v2 io controller. "
+                                  "Takes effect for jobs started after enabling it.")
+        self.cgroup_cb.setChecked(bool(self.scheduler.engine_options.get("cgroup")))
+        self.cgroup_cb.toggled.connect(
+            lambda checked: self.scheduler.set_engine_option("cgroup", checked))
+        throttle.addWidget(self.cgroup_cb)
+        layout.addLayout(throttle)
+
+        self.batch_status_label = QLabel("No jobs.")
+        layout.addWidget(self.batch_status_label)
+
+        station_layout = QHBoxLayout()
+        self.station_cb = QCheckBox("Station mode: automatically format newly inserted devices")
+        self.station_cb.toggled.connect(self.handle_station_toggle)
+        station_layout.addWidget(self.station_cb)
+        station_layout.addStretch()
+        policy_btn = QPushButton("Policy...")
+        policy_btn.setFixedWidth(90)
+        policy_btn.clicked.connect(self.handle_station_policy)
+        station_layout.addWidget(policy_btn)
+        layout.addLayout(station_layout)
+
+        self.station_log = QTextEdit()
+        self.station_log.setReadOnly(True)
+        self.station_log.setFont(QFont("Monospace", 8))
+        self.station_log.setMaximumHeight(90)
+        self.station_log.setPlaceholderText(self.station.policy.describe())
+        layout.addWidget(self.station_log)
+
+        back_layout = QHBoxLayout()
+        back_btn = QPushButton("<<< Back to Device Selection")
+        back_btn.setFixedWidth(220)
+        back_btn.clicked.connect(lambda: self.main_stack.setCurrentIndex(0))
+        back_layout.addWidget(back_btn)
+        back_layout.addStretch()
+        layout.addLayout(back_layout)
+        return page
+
+    def handle_station_toggle(self, checked):
+        if not checked:
+            self.station.stop()
+            return
+        reply = QMessageBox.warning(self, "Station Mode",
+            "In station mode every newly inserted device that matches the policy will be "
+            "<b>formatted automatically without any further confirmation</b>.<br><br>"
+            f"{self.station.policy.describe()}<br><br>Do you want to enable station mode?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.station_cb.blockSignals(True)
+            self.station_cb.setChecked(False)
+            self.station_cb.blockSignals(False)
+            return
+        self.station.start()
+
+    def handle_station_policy(self):
+        dialog = StationPolicyDialog(self.station.policy, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.station.policy = dialog.policy()
+        try:
+            self.station.policy.save()
+        except OSError as e:
+            QMessageBox.warning(self, "Warning", f"The policy could not be saved: {e}")
+        self.station_log.setPlaceholderText(self.station.policy.describe())
+        self.station.log(f"Policy changed. {self.station.policy.describe()}")
+
+    def selected_device_rows(self):
+        return sorted({index.row() for index in self.device_table.selectionModel().selectedRows()})
+
+    def handle_batch_button(self):
+        rows = self.selected_device_rows()
+        if not rows:
+            QMessageBox.warning(self, "Warning", "Please select one or more devices from the list first.")
+            return
+
+        devices = []
+        refused = []
+        usage = system_usage()
+        for row in rows:
+            path = self.device_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            model = self.device_table.item(row, 1).text()
+            problems = preflight(path, usage)
+            if problems:
+                refused.append(f"{path} ({model}):\n{describe_problems(problems)}")
+            else:
+                devices.append((path, model))
+
+        if refused:
+            QMessageBox.warning(self, "Devices In Use",
+                "The following devices are in use and will be skipped:\n\n" + "\n\n".join(refused))
+        if not devices:
+            return
+
+        dialog = FormatConfirmDialog(None, None, self, devices=devices)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        quick = self.batch_quick_cb.isChecked()
+        for path, model in devices:
+            try:
+                self.scheduler.submit(path, quick_wipe=quick, label=model)
+            except ValueError as e:
+                QMessageBox.warning(self, "Warning", str(e))
+        self.update_batch_table()
+        self.main_stack.setCurrentIndex(2)
+
+    def handle_apply_job_throttle(self):
+        rate = self.job_limit_spin.value() * 1e6 or None
+        io_class = self.job_io_class_combo.currentData()
+        self.apply_to_selected_jobs(lambda job_id: (self.scheduler.set_rate_limit(job_id, rate),
+                                                    self.scheduler.set_io_class(job_id, io_class)))
+
+    def apply_to_selected_jobs(self, action):
+        for index in self.batch_table.selectionModel().selectedRows():
+            item = self.batch_table.item(index.row(), 0)
+            if item is not None:
+                action(item.data(Qt.ItemDataRole.UserRole))
+
+    def update_batch_table(self):
+        jobs = self.scheduler.snapshot()
+        if self.batch_table.rowCount() != len(jobs):
+            self.batch_table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            id_item = QTableWidgetItem(str(job["id"]))
+            id_item.setData(Qt.ItemDataRole.UserRole, job["id"])
+            self.batch_table.setItem(row, 0, id_item)
+            device_item = QTableWidgetItem(job["device"])
+            device_item.setToolTip(f"Shared link group: {job['group']}")
+            self.batch_table.setItem(row, 1, device_item)
+            self.batch_table.setItem(row, 2, QTableWidgetItem(job["label"]))
+            state_item = QTableWidgetItem(job["state"].upper())
+            if job["message"]:
+                state_item.setToolTip(job["message"])
+            if job["state"] == "failed" or job["stalled"]:
+                state_item.setForeground(QColor("red"))
+            self.batch_table.setItem(row, 3, state_item)
+
+            bar = self.batch_table.cellWidget(row, 4)
+            if bar is None:
+                bar = QProgressBar()
+                self.batch_table.setCellWidget(row, 4, bar)
+            bar.setValue(int(job["pct"]))
+
+            running = job["state"] in ("running", "stalled")
+            speed_text = f"{human_size(job['rate'])}/s" if running else ""
+            if job["rate_limit"]:
+                speed_text += f" (max {human_size(job['rate_limit'])}/s)"
+            speed_item = QTableWidgetItem(speed_text.strip())
+            if job["io_class"]:
+                speed_item.setToolTip(f"I/O priority: {job['io_class']}")
+            self.batch_table.setItem(row, 5, speed_item)
+            # Bekleyen işler için zamanlayıcının tahmini süresini gösteriyoruz
+            eta = job["eta"] if running else job["predicted"] if job["state"] == "queued" else None
+            eta_text = f"{int(eta) // 3600:02}:{int(eta) % 3600 // 60:02}:{int(eta) % 60:02}" if eta is not None else ""
+            if job["state"] == "queued" and eta_text:
+                eta_text = f"~{eta_text}"
+            self.batch_table.setItem(row, 6, QTableWidgetItem(eta_text))
+
+        active = sum(1 for j in jobs if j["state"] not in ("queued", "done", "failed", "stopped"))
+        queued = sum(1 for j in jobs if j["state"] == "queued")
+        done = sum(1 for j in jobs if j["state"] == "done")
+        # İstasyon olaylarını log alanına aktaralım
+        self.station.report_finished()
+        while self.station.events:
+            self.station_log.append(self.station.events.popleft())
+
+        status = f"Running: {active}   Queued: {queued}   Completed: {done}   Total: {len(jobs)}"
+        if active or queued:
+            makespan = int(self.scheduler.plan())
+            status += f"   Estimated batch time left: {makespan // 3600:02}:{makespan % 3600 // 60:02}:{makespan % 60:02}"
+        if getattr(self.scheduler, "remote", False) and not self.scheduler.connected:
+            status = f"Lost connection to the background service: {self.scheduler.last_error}"
+        elif not jobs:
+            status = "No jobs."
+        self.batch_status_label.setText(status)
+
     def update_progress_ui(self, stats):
         if 'pct' in stats:
             self.progress_bar.setValue(int(stats['pct']))
@@ -683,11 +1213,21 @@ class LLFToolSkeleton(QWidget):
             self.speed_label.setText(stats['rate'])
         if 'pos' in stats:
             self.sector_label.setText(f"Current position: {stats['pos']}")
+        if stats.get('state') == 'paused':
+            self.speed_label.setText("Paused")
+        elif stats.get('state') == 'reconnecting':
+            self.speed_label.setText("Reconnecting...")
+        elif stats.get('stalled'):
+            # Donmuş hız ile yavaş ilerlemeyi ayırt edebilmek için
+            self.speed_label.setText(f"Stalled ({stats['io_age']:.0f} s)")
 
     def handle_format_finished(self, success, message):
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText("Pause")
         self.format_btn.setEnabled(True)
         self.back_btn.setEnabled(True)
         self.quick_wipe_cb.setEnabled(True)
+        self.tune_queue_cb.setEnabled(True)
         
         if success:
             QMessageBox.information(self, "Success", message)
@@ -729,4 +1269,19 @@ if __name__ == "__main__":
     app.setStyle("Fusion")
     window = LLFToolSkeleton()
     window.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+
+    # Çalışan işleri durduralım; çekirdekte takılı kalmış bir yazma kapanışı engellemesin
+    window.station.stop()
+    window.hotplug.stop()
+    if getattr(window.scheduler, "remote", False):
+        # İşler serviste kalıyor, sadece bağlantıyı kapatıyoruz
+        window.scheduler.close()
+    else:
+        window.scheduler.stop_all()
+    workers = window.abandoned_workers + ([window.worker] if window.worker else [])
+    for worker in workers:
+        worker.stop()
+    if any(not worker.wait(2000) for worker in workers):
+        os._exit(exit_code)
+    sys.exit(exit_code)
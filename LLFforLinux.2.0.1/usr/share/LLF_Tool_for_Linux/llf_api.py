@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Başka programların içine gömülebilen Python API'si. Qt gerektirmiyor.
+# Arayüzdeki FormatWorker, yardımcı süreç (1.x) ve komut satırı da bunu kullanıyor.
+#
+#   from llf_api import wipe
+#   for event in wipe("/dev/sdb", mode="full", verify=True):
+#       if event["type"] == "progress":
+#           print(event["phase"], event["pct"], event["rate"], event["eta"])
+#       elif event["type"] == "result":
+#           print(event["ok"], event["message"])
+#
+# Olaylar sözlük; hepsinde "type", "device", "phase" ("wipe" / "verify") ve "time" var:
+#   phase     yeni aşama başladı
+#   progress  motorun ilerleme bilgisi: offset, bytes, total, pct, rate, avg_rate, eta,
+#             state, stalled, medium_errors, link_errors ...
+#   log       {"message": "..."}
+#   result    her zaman en son gelir: ok, state (done/failed/stopped), message, bytes,
+#             flush_time, errors, bad_blocks, verified, mismatch_blocks, mismatches, elapsed
+# Hatalar istisna olarak değil, ok=False olan result olayı olarak geliyor.
+# Döngüden erken çıkılırsa (break / generator kapanırsa) iş durdurulur.
+# Cihaz takılırsa (watchdog işi bırakırsa) result hemen gelir; motorun thread'i çekirdekte
+# kalsa bile döngü biter.
+
+import time
+import queue
+import threading
+
+from llf_engine import (
+    CancelToken, VerifyEngine, WipeCancelled, WipeEngine, pattern_unit,
+)
+
+MODES = ("quick", "full")
+
+
+class WipeRun:
+    # wipe()/verify() dönüşü. Üzerinde dönülebilir; çalışırken durdurma, duraklatma,
+    # hız sınırı ve I/O sınıfı başka bir thread'den değiştirilebilir.
+
+    def __init__(self, device, mode="full", pattern=None, verify=False, wipe=True,
+                 token=None, **engine_options):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode} (expected one of {', '.join(MODES)})")
+        # Geçersiz desen motor başlamadan ValueError versin
+        if pattern_unit(pattern) is None and verify:
+            raise ValueError("Random data cannot be verified.")
+        self.device = device
+        self.mode = mode
+        self.pattern = pattern
+        self.do_wipe = wipe
+        self.do_verify = verify
+        self.token = token or CancelToken()
+        # Çağıranın hung_callback'i bizimkinden sonra çağrılıyor
+        self._hung_callback = engine_options.pop("hung_callback", None)
+        self.engine_options = engine_options
+        self.engine = None
+        self.phase = None
+        self.result = None
+        self._result_lock = threading.Lock()
+        self._started = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._listener = None
+
+    # --- Kontrol ---
+
+    def stop(self):
+        self.token.stop()
+
+    def pause(self):
+        self.token.pause()
+
+    def resume(self):
+        self.token.resume()
+
+    def set_rate_limit(self, rate):
+        # Sonraki aşama (doğrulama) da aynı sınırla başlasın
+        self.engine_options["rate_limit"] = rate
+        if self.engine is not None:
+            self.engine.set_rate_limit(rate)
+
+    def set_io_class(self, io_class):
+        self.engine_options["io_class"] = io_class
+        if self.engine is not None:
+            self.engine.set_io_class(io_class)
+
+    # --- Olaylar ---
+
+    def __iter__(self):
+        return self.events()
+
+    def events(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="llf-api-wipe", daemon=True)
+            self._thread.start()
+        try:
+            while True:
+                event = self._queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # Okuyan taraf vazgeçtiyse işi durdurup motorun cihazı kapatmasını bekliyoruz.
+            # Takılan cihazın thread'i hiç dönmeyebilir, onu beklemiyoruz.
+            if self._thread.is_alive():
+                self.token.stop()
+                while self._thread.is_alive() and not self.hung:
+                    self._thread.join(0.5)
+
+    @property
+    def hung(self):
+        return self.engine is not None and self.engine.hung
+
+    def _put(self, event_type, **fields):
+        deliver = self._listener or self._queue.put
+        deliver(dict(type=event_type, device=self.device, phase=self.phase,
+                     time=time.time(), **fields))
+
+    def _engine(self, engine_class):
+        options = dict(self.engine_options)
+        if engine_class is VerifyEngine:
+            # Doğrulamada kuyruk ayarı gereksiz; okuma için cihazı tekrar ayarlamayalım
+            options.pop("tune_queue", None)
+        return engine_class(
+            self.device,
+            quick_wipe=self.mode == "quick",
+            token=self.token,
+            pattern=self.pattern,
+            progress_callback=lambda stats: self._put("progress", **stats),
+            log_callback=lambda message: self._put("log", message=message),
+            hung_callback=self._on_hung,
+            **options
+        )
+
+    def _on_hung(self, offset):
+        # Watchdog thread'inden: motor çekirdekte takılı, run() dönmeyebilir
+        result = {"ok": False, "state": "failed",
+                  "message": f"The device stopped responding at offset {offset}. "
+                             "The job was abandoned.",
+                  "errors": self.engine.error_summary() if self.engine is not None else ""}
+        self._finish(result)
+        if self._hung_callback is not None:
+            self._hung_callback(offset)
+
+    def _finish(self, result):
+        # Sonuç bir kez gider: takılan cihaz sonradan dönerse motorun sonucu atılıyor
+        with self._result_lock:
+            if self.result is not None:
+                return False
+            result["elapsed"] = round(time.monotonic() - self._started, 3)
+            self.result = result
+        self._put("result", **result)
+        if self._listener is None:
+            self._queue.put(None)
+        return True
+
+    def _start_phase(self, phase, engine_class):
+        self.phase = phase
+        self._put("phase")
+        self.engine = self._engine(engine_class)
+        return self.engine
+
+    def run(self, listener=None):
+        # İşi çağıran thread'de çalıştırır ve sonucu döndürür. listener verilirse olaylar
+        # kuyruk yerine doğrudan ona gider (FormatWorker böyle kullanıyor).
+        self._listener = listener
+        self._started = time.monotonic()
+        result = {"ok": False, "state": "failed", "message": ""}
+        try:
+            if self.do_wipe:
+                engine = self._start_phase("wipe", WipeEngine)
+                result["bytes"] = engine.run()
+                result["flush_time"] = engine.flush_time
+                result["bad_blocks"] = engine.bad_blocks
+                result["errors"] = engine.error_summary()
+                result["message"] = (f"Format completed successfully. "
+                                     f"Final flush took {engine.flush_time:.1f} s.")
+            if self.do_verify:
+                engine = self._start_phase("verify", VerifyEngine)
+                result["verified_bytes"] = engine.run()
+                result["verified"] = engine.mismatch_count == 0
+                result["mismatch_blocks"] = engine.mismatch_count
+                result["mismatches"] = [list(m) for m in engine.mismatches]
+                result["message"] = " ".join(filter(None, [
+                    result["message"],
+                    "Verification passed." if result["verified"] else
+                    f"Verification failed: {engine.mismatch_count} block(s) do not match."]))
+            result["state"] = "done"
+            result["ok"] = result.get("verified", True)
+        except WipeCancelled as e:
+            # Takılan cihaz da WipeCancelled ile biter ama bu bir hata
+            result["state"] = "failed" if self.engine is not None and self.engine.hung else "stopped"
+            result["message"] = str(e)
+        except Exception as e:
+            result["message"] = str(e)
+        if self.engine is not None:
+            result.setdefault("errors", self.engine.error_summary())
+        self._finish(result)
+        return self.result
+
+
+def wipe(device, mode="full", pattern=None, verify=False, **engine_options):
+    # mode: "quick" (ilk 10 MB) ya da "full"; pattern: None/"zero", "ones", "random" ya da bayt dizisi.
+    # engine_options WipeEngine'e geçer: rate_limit, io_class, direct, tune_queue, cgroup, hung_callback ...
+    return WipeRun(device, mode=mode, pattern=pattern, verify=verify, **engine_options)
+
+
+def verify(device, mode="full", pattern=None, **engine_options):
+    # Sadece doğrulama: cihaz baştan sona desenle (varsayılan sıfır) aynı mı
+    return WipeRun(device, mode=mode, pattern=pattern, verify=True, wipe=False, **engine_options)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Tüm I/O yollarının paylaştığı hizalı tampon havuzu.
+# Tamponları bir kez mmap ile ayırıp (mümkünse hugepage ile) işler arasında tekrar kullanıyoruz.
+# Toplu modda 24 iş aynı anda çalışsa bile toplam bellek bütçeyi aşmıyor;
+# bütçe doluysa yeni iş bir tampon boşalana kadar bekliyor.
+
+import mmap
+import ctypes
+import threading
+
+HUGEPAGE_SIZE = 2 * 1024 * 1024
+MAP_HUGETLB = getattr(mmap, "MAP_HUGETLB", 0x40000)
+DEFAULT_BUDGET = 256 * 1024 * 1024   # Küçük cihazlarda RAM'in 1/8'i, hangisi küçükse
+WAIT_STEP = 0.5
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+except OSError:
+    _libc = None
+
+
+def memory_total():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def default_budget():
+    total = memory_total()
+    return min(DEFAULT_BUDGET, total // 8) if total else DEFAULT_BUDGET
+
+
+def _address(buf):
+    # ctypes nesnesi hemen bırakılıyor, yoksa mmap kapatılamaz
+    view = ctypes.c_char.from_buffer(buf)
+    try:
+        return ctypes.addressof(view)
+    finally:
+        del view
+
+
+class PooledBuffer:
+    # mmap nesnesini ve özelliklerini birlikte taşıyoruz
+    def __init__(self, size):
+        self.size = size
+        self.hugetlb = False
+        self.locked = False
+        self.dirty = False
+        self.mmap = self._allocate(size)
+
+    def _allocate(self, size):
+        # Ayrılmış (explicit) hugepage varsa onu, yoksa normal sayfa + THP tavsiyesi
+        if size % HUGEPAGE_SIZE == 0:
+            try:
+                buf = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | MAP_HUGETLB)
+                self.hugetlb = True
+                return buf
+            except OSError:
+                pass
+        buf = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE)
+        if hasattr(mmap, "MADV_HUGEPAGE"):
+            try:
+                buf.madvise(mmap.MADV_HUGEPAGE)
+            except OSError:
+                pass
+        return buf
+
+    def lock(self):
+        # Swap'e gitmesin; RLIMIT_MEMLOCK yetmezse sessizce vazgeçiyoruz
+        if _libc is None or self.locked:
+            return
+        try:
+            self.locked = _libc.mlock(ctypes.c_void_p(_address(self.mmap)),
+                                      ctypes.c_size_t(self.size)) == 0
+        except (AttributeError, TypeError, ValueError):
+            self.locked = False
+
+    def zero(self):
+        self.mmap.seek(0)
+        self.mmap.write(bytes(self.size))
+        self.mmap.seek(0)
+        self.dirty = False
+
+    def close(self):
+        if self.locked and _libc is not None:
+            try:
+                _libc.munlock(ctypes.c_void_p(_address(self.mmap)), ctypes.c_size_t(self.size))
+            except (AttributeError, TypeError, ValueError):
+                pass
+        self.mmap.close()
+
+
+class BufferPool:
+
+    def __init__(self, budget=None, lock_memory=True):
+        self.budget = budget or default_budget()
+        self.lock_memory = lock_memory
+        self._cond = threading.Condition()
+        self._free = []        # Boştaki tamponlar
+        self._in_use = {}      # id(mmap) -> PooledBuffer
+        self.allocated = 0
+
+    def acquire(self, size, cancel=None):
+        # Sıfırlarla dolu, sayfa hizalı bir mmap döndürür. Bütçe doluysa bekler;
+        # cancel verilirse her adımda çağrılır (WipeCancelled fırlatarak beklemeyi keser).
+        size = -(-size // mmap.PAGESIZE) * mmap.PAGESIZE
+        if size > self.budget:
+            raise ValueError(f"Buffer of {size} bytes exceeds the memory budget of {self.budget} bytes.")
+        with self._cond:
+            while True:
+                if cancel is not None:
+                    cancel()
+                buf = self._take_free(size)
+                if buf is None and self._make_room(size):
+                    buf = PooledBuffer(size)
+                    self.allocated += size
+                    if self.lock_memory:
+                        buf.lock()
+                if buf is not None:
+                    self._in_use[id(buf.mmap)] = buf
+                    break
+                self._cond.wait(WAIT_STEP)
+        if buf.dirty:
+            buf.zero()
+        return buf.mmap
+
+    def release(self, mapping, dirty=False):
+        # dirty: tampon okuma/desen için kullanıldıysa bir sonraki alan sıfırlanmış almalı
+        with self._cond:
+            buf = self._in_use.pop(id(mapping), None)
+            if buf is None:
+                return
+            buf.dirty = buf.dirty or dirty
+            self._free.append(buf)
+            self._cond.notify_all()
+
+    def _take_free(self, size):
+        for i, buf in enumerate(self._free):
+            if buf.size == size:
+                return self._free.pop(i)
+        return None
+
+    def _make_room(self, size):
+        # Yer yoksa farklı boydaki boş tamponları bırakarak yer açmayı deniyoruz
+        while self.allocated + size > self.budget and self._free:
+            buf = self._free.pop(0)
+            self.allocated -= buf.size
+            buf.close()
+        return self.allocated + size <= self.budget
+
+    def trim(self):
+        # Boştaki tüm tamponları işletim sistemine geri ver
+        with self._cond:
+            while self._free:
+                buf = self._free.pop()
+                self.allocated -= buf.size
+                buf.close()
+
+    def stats(self):
+        with self._cond:
+            return {"budget": self.budget, "allocated": self.allocated,
+                    "in_use": sum(b.size for b in self._in_use.values()),
+                    "free": len(self._free),
+                    "hugetlb": sum(1 for b in list(self._in_use.values()) + self._free if b.hugetlb),
+                    "locked": sum(1 for b in list(self._in_use.values()) + self._free if b.locked)}
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool():
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = BufferPool()
+        return _default_pool
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Komut satırı arayüzü: ekranı olmayan sunucular ve otomasyon (Ansible vb.) için.
+# Qt hiç yüklenmiyor; arayüzdeki FormatWorker ile aynı motoru (WipeEngine) kullanıyor.
+#
+# Çıktı stdout'a satır başına bir JSON nesnesi:
+#   {"event": "device", "path": "/dev/sdb", ...}                       (list)
+#   {"event": "progress", "device": "/dev/sdb", "op": "format", ...}
+#   {"event": "log", "device": "/dev/sdb", "op": "format", "message": "..."}
+#   {"event": "result", "device": "/dev/sdb", "op": "format", "ok": true, ...}
+# Çıkış kodu: 0 başarılı, 1 hata, 2 kullanım hatası, 3 doğrulama başarısız, 130 durduruldu.
+#
+# Örnek: llf-tool-cli format --yes --verify /dev/sdb /dev/sdc
+
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+
+from llf_devices import (describe_problems, group_physical_disks, preflight, probe_devices,
+                         smart_report, system_usage)
+from llf_engine import CancelToken, PATTERNS
+from llf_tuning import restore_stale
+
+import llf_api
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_VERIFY = 3
+EXIT_STOPPED = 130
+
+IO_CLASSES = ("idle", "best-effort", "realtime")
+
+
+class JsonLinesWriter:
+    # Birden fazla cihaz aynı anda yazıyor; satırlar karışmasın diye kilitli
+
+    def __init__(self, stream=None, interval=1.0):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = {}
+
+    def emit(self, event, **fields):
+        line = json.dumps(dict(event=event, time=round(time.time(), 3), **fields))
+        with self._lock:
+            try:
+                self.stream.write(line + "\n")
+                self.stream.flush()
+            except (OSError, ValueError):
+                # Okuyan taraf kapandıysa (ör. | head) işi yarıda bırakmıyoruz
+                pass
+
+    def progress(self, device, op, stats):
+        # Motor saniyede iki kez bildiriyor; durum değişmedikçe interval'e göre seyreltiyoruz
+        key = (device, op)
+        now = time.monotonic()
+        last_time, last_state = self._last.get(key, (0.0, None))
+        if stats["state"] == last_state and now - last_time < self.interval:
+            return
+        self._last[key] = (now, stats["state"])
+        self.emit("progress", device=device, op=op, **stats)
+
+
+class DeviceRun:
+    # Tek bir cihaz üzerinde istenen işlem (quick / format / verify); llf_api olaylarını
+    # JSON satırlarına çeviriyor
+
+    def __init__(self, device, op, args, out):
+        self.device = device
+        self.op = op
+        self.args = args
+        self.out = out
+        self.token = CancelToken()
+        self.result = None
+        # Cihaz takılırsa motorun thread'i çekirdekte kalabilir; slotu ondan bağımsız bırakıyoruz
+        self.hung = False
+        self.slot = None
+        self._slot_lock = threading.Lock()
+
+    def release_slot(self):
+        with self._slot_lock:
+            slot, self.slot = self.slot, None
+        if slot is not None:
+            slot.release()
+
+    def handle_hung(self, offset):
+        # llf_api başarısız result olayını bundan hemen önce gönderdi (handle)
+        self.hung = True
+        self.release_slot()
+
+    def _create(self):
+        args = self.args
+        options = dict(token=self.token, direct=not args.buffered, hung_callback=self.handle_hung,
+                       rate_limit=args.rate_limit * 1e6 or None, io_class=args.io_class)
+        if self.op == "verify":
+            return llf_api.verify(self.device, mode="quick" if args.quick else "full",
+                                  pattern=args.pattern, **options)
+        return llf_api.wipe(self.device, mode="quick" if self.op == "quick" else "full",
+                            pattern=args.pattern, verify=args.verify,
+                            tune_queue=args.tune_queue, **options)
+
+    def handle(self, event):
+        event_type = event.pop("type")
+        op = "verify" if event.pop("phase") == "verify" else self.op
+        event.pop("time")
+        event.pop("device")
+        if event_type == "progress":
+            self.out.progress(self.device, op, event)
+        elif event_type == "log":
+            self.out.emit("log", device=self.device, op=op, message=event["message"])
+        elif event_type == "result":
+            self.result = dict(event)
+            self.out.emit("result", device=self.device, op=self.op, **event)
+
+    def run(self):
+        try:
+            wipe_run = self._create()
+        except ValueError as e:
+            self.result = {"ok": False, "state": "failed", "message": str(e)}
+            self.out.emit("result", device=self.device, op=self.op, **self.result)
+            return self.result
+        # Olayları doğrudan bu thread'de işliyoruz
+        self.result = wipe_run.run(listener=self.handle)
+        return self.result
+
+
+def run_devices(args, out):
+    runs = [DeviceRun(device, args.command, args, out) for device in args.devices]
+    slots = threading.Semaphore(args.jobs or len(runs))
+
+    def worker(run):
+        slots.acquire()
+        run.slot = slots
+        try:
+            if run.token.stopped:
+                run.out.emit("result", device=run.device, op=run.op, ok=False,
+                             state="stopped", message="Stopped before start.")
+                run.result = {"ok": False, "state": "stopped"}
+                return
+            run.run()
+        finally:
+            run.release_slot()
+
+    # Ctrl+C / SIGTERM: tüm işleri durdur, motorlar cihazı düzgün kapatsın
+    def stop(signum, frame):
+        for run in runs:
+            run.token.stop()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    threads = [threading.Thread(target=worker, args=(run,), name=f"llf-cli-{i}", daemon=True)
+               for i, run in enumerate(runs)]
+    for thread in threads:
+        thread.start()
+    # join() sinyalleri bekletmesin diye kısa aralıklarla bekliyoruz.
+    # Takılan cihazın thread'i hiç bitmeyebilir; sonucu zaten yazıldı, onu beklemiyoruz.
+    while any(thread.is_alive() and not run.hung for thread, run in zip(threads, runs)):
+        for thread in threads:
+            thread.join(0.2)
+
+    results = [run.result or {"ok": False, "state": "failed"} for run in runs]
+    if any(r["state"] == "failed" for r in results):
+        return EXIT_FAILED
+    if any(r["state"] == "done" and not r["ok"] for r in results):
+        return EXIT_VERIFY
+    if any(r["state"] == "stopped" for r in results):
+        return EXIT_STOPPED
+    return EXIT_OK
+
+
+def cmd_list(args, out):
+    # Sistem kullanımı bir kez okunuyor; çok yollu diskler tek satır (TUI ile aynı)
+    usage = system_usage()
+    for info in group_physical_disks(probe_devices()):
+        problems = preflight(info["path"], usage)
+        out.emit("device", in_use=describe_problems(problems) if problems else "", **info)
+    return EXIT_OK
+
+
+def cmd_smart(args, out):
+    code = EXIT_OK
+    for device in args.devices:
+        try:
+            report = smart_report(device)
+        except FileNotFoundError:
+            out.emit("result", device=device, op="smart", ok=False, state="failed",
+                     message="smartctl is not installed.")
+            return EXIT_FAILED
+        except Exception as e:
+            out.emit("result", device=device, op="smart", ok=False, state="failed", message=str(e))
+            code = EXIT_FAILED
+            continue
+        out.emit("smart", device=device, **report)
+        # smartctl'in bit maskesi: 1 komut satırı, 2 cihaz açılamadı
+        ok = not report["returncode"] & 3
+        out.emit("result", device=device, op="smart", ok=ok, state="done" if ok else "failed",
+                 returncode=report["returncode"])
+        if not ok:
+            code = EXIT_FAILED
+    return code
+
+
+def parse_pattern(value):
+    if value in PATTERNS or value == "random":
+        return value
+    try:
+        return bytes.fromhex(value[2:] if value.lower().startswith("0x") else value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid pattern: {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="llf-tool-cli",
+        description="LLF Tool command line interface. Prints JSON Lines on stdout.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list block devices")
+
+    smart = commands.add_parser("smart", help="print SMART data (smartctl -a --json)")
+    smart.add_argument("devices", nargs="+", metavar="DEVICE")
+
+    for name, text in (("quick", "wipe the first 10 MB (partition tables, boot sectors)"),
+                       ("format", "write zeros to the whole device"),
+                       ("verify", "read the device back and check that it matches the pattern (default: zeros)")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("devices", nargs="+", metavar="DEVICE")
+        command.add_argument("--interval", type=float, default=1.0,
+                             help="seconds between progress lines per device (default: 1)")
+        command.add_argument("--jobs", type=int, default=0,
+                             help="devices processed at the same time (default: all)")
+        command.add_argument("--rate-limit", type=float, default=0, metavar="MB/s",
+                             help="speed limit per device (0 = unlimited)")
+        command.add_argument("--io-class", choices=IO_CLASSES, default=None,
+                             help="I/O priority class")
+        command.add_argument("--buffered", action="store_true",
+                             help="use the page cache instead of O_DIRECT")
+        command.add_argument("--pattern", type=parse_pattern, default=None,
+                             help="zero (default), ones, random or hex bytes such as 0xdeadbeef")
+        if name == "verify":
+            command.add_argument("--quick", action="store_true",
+                                 help="only check the first 10 MB")
+        else:
+            command.add_argument("--verify", action="store_true",
+                                 help="read the device back after wiping")
+            command.add_argument("--tune-queue", action="store_true",
+                                 help="tune the block queue during the wipe")
+            command.add_argument("--yes", action="store_true",
+                                 help="confirm that all data on the devices will be destroyed")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = JsonLinesWriter(interval=getattr(args, "interval", 1.0))
+    if args.command == "list":
+        return cmd_list(args, out)
+    if args.command == "smart":
+        return cmd_smart(args, out)
+    if args.command in ("quick", "format") and not args.yes:
+        out.emit("error", message="Refusing to wipe without --yes. All data on "
+                                  f"{', '.join(args.devices)} would be destroyed.")
+        return EXIT_USAGE
+    if len(set(args.devices)) != len(args.devices):
+        out.emit("error", message="The same device is given more than once.")
+        return EXIT_USAGE
+    # Önceki çalışma (ör. öldürülen bir --tune-queue) kuyruk ayarlarını bıraktıysa geri al
+    restore_stale()
+    return run_devices(args, out)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Koordinatörün (llf_coordinator) uçtan uca denetimi. Aynı makinede loopback üzerinde
+# birkaç arka plan servisi (llf_daemon --http) başlatıp loop cihazlara bağlı imaj dosyaları
+# üzerinde gerçek işler çalıştırıyor. Gerçek disklere dokunmuyor; root gerekiyor (losetup).
+#
+#   sudo python3 llf_cluster_check.py
+#
+# Denetlenenler:
+#   1. dağıtım: her istasyonda 1 slot varken üç iş üç ayrı istasyona gidiyor
+#   2. istasyon gidip geri geliyor: iş yeniden kuyruğa alınıp aynı diske tekrar gönderiliyor
+#   3. aynı loop cihazına başka imaj bağlanınca (same_disk) iş tekrar gönderilmiyor
+#
+# Loop cihazlarının seri numarası yok; denetim için imaj dosyasının adı seri no yerine
+# kullanılıyor (LoopAgent). Geri kalan her şey gerçek koordinatör ve servis kodu.
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+
+from llf_coordinator import Agent, Coordinator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MIB = 1024 * 1024
+STEP = 0.5
+TIMEOUT = 60
+SLOW_RATE = 2 * MIB      # İşler denetim boyunca bitmesin diye (bayt/s)
+FILL = b"\xaa"
+
+
+class CheckError(Exception):
+    pass
+
+
+class LoopAgent(Agent):
+
+    def refresh(self):
+        ok = super().refresh()
+        for info in self.devices:
+            if info["name"].startswith("loop"):
+                backing = read_file(f"/sys/block/{info['name']}/loop/backing_file")
+                info["serial"] = os.path.basename(backing) if backing else ""
+        return ok
+
+
+def read_file(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class Station:
+    # Tek bir llf_daemon süreci; öldürülüp aynı portta yeniden başlatılabiliyor
+
+    def __init__(self, name, workdir, token_file):
+        self.name = name
+        self.workdir = workdir
+        self.token_file = token_file
+        self.port = free_port()
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        log = open(os.path.join(self.workdir, f"{self.name}.log"), "a")
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "llf_daemon.py"),
+             "--socket", os.path.join(self.workdir, f"{self.name}.sock"),
+             "--http", f"127.0.0.1:{self.port}", "--token-file", self.token_file, "--jobs", "1"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+
+    def kill(self):
+        # Çökme gibi: işler düzgün durdurulmuyor
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def terminate(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+
+def make_image(path, size, fill=None):
+    with open(path, "wb") as f:
+        if fill is not None:
+            f.write(fill * MIB)
+        f.truncate(size)
+
+
+def losetup(*args):
+    return subprocess.run(["losetup"] + list(args), check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+def wait_until(coordinator, condition, what, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        coordinator.step()
+        if condition():
+            return
+        if time.monotonic() >= deadline:
+            states = ", ".join(f"{item.target}: {item.state} ({item.message})"
+                               for item in coordinator.items)
+            raise CheckError(f"Timed out waiting for {what}. {states}")
+        time.sleep(STEP)
+
+
+def wait_online(agent, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not agent.refresh():
+        if time.monotonic() >= deadline:
+            raise CheckError(f"Station {agent.name} did not come up: {agent.last_error}")
+        agent._next_attempt = 0.0
+        time.sleep(STEP)
+
+
+def set_rate(agents, rate):
+    for agent in agents:
+        agent.call("set_global_rate_limit", rate=rate)
+
+
+def check_dispatch(stations, agents, images):
+    # Her istasyonda tek slot: en çok boş slotu olana gittiği için işler dağılmalı
+    coordinator = Coordinator(agents)
+    for image in images[:3]:
+        coordinator.add(f"serial:{os.path.basename(image)}")
+    wait_until(coordinator, lambda: all(item.state == "dispatched" for item in coordinator.items),
+               "three dispatched jobs")
+    hosts = sorted(item.agent.name for item in coordinator.items)
+    if len(set(hosts)) != 3:
+        raise CheckError(f"Jobs were not spread over the stations: {hosts}")
+    return coordinator
+
+
+def check_reconnect(coordinator, stations):
+    # İşi olan bir istasyonu öldürüp aynı portta yeniden başlatıyoruz
+    item = coordinator.items[1]
+    station = stations[item.agent.name]
+    first_path = item.path
+    station.kill()
+    wait_until(coordinator, lambda: not item.agent.online, f"{station.name} to go offline")
+    if item.state != "dispatched":
+        raise CheckError(f"Job changed state while its station was away: {item.state}")
+    station.start()
+    wait_until(coordinator, lambda: item.attempts == 2 and item.state == "dispatched",
+               f"the job to be sent again after {station.name} restarted")
+    if item.path != first_path:
+        raise CheckError(f"The job was sent again to {item.path}, not {first_path}.")
+    set_rate(coordinator.agents.values(), 0)
+    wait_until(coordinator, coordinator.done, "the batch to finish")
+    failed = [item for item in coordinator.items if item.state != "done"]
+    if failed:
+        raise CheckError(f"{failed[0].target} ended {failed[0].state}: {failed[0].message}")
+
+
+def check_same_disk(stations, agents, workdir, size):
+    # İş sürerken istasyon çöküyor, aynı loop cihazına başka imaj bağlanıyor:
+    # yeniden başlayınca /dev/loopN artık başka "disk", tekrar silinmemeli
+    agent = agents[2]
+    station = stations[agent.name]
+    original = os.path.join(workdir, "same-a.img")
+    other = os.path.join(workdir, "same-b.img")
+    make_image(original, size)
+    make_image(other, size, FILL)
+    loop = losetup("-f", "--show", original)
+    # Yeni loop cihazı DEVICE_INTERVAL beklemeden listede görünsün
+    agent._devices_at = 0.0
+    try:
+        set_rate([agent], SLOW_RATE)
+        coordinator = Coordinator(agents)
+        item = coordinator.add(f"{agent.name}:{loop}")
+        wait_until(coordinator, lambda: item.state == "dispatched", "the job to start")
+        station.kill()
+        losetup("-d", loop)
+        losetup(loop, other)
+        station.start()
+        wait_until(coordinator, lambda: item.finished, "the job to be refused")
+        if item.state != "failed" or "not wiping it again" not in item.message:
+            raise CheckError(f"Expected a refusal, got {item.state}: {item.message}")
+        with open(other, "rb") as f:
+            if f.read(MIB) != FILL * MIB:
+                raise CheckError(f"{other} was written although it is a different disk.")
+    finally:
+        subprocess.run(["losetup", "-d", loop], capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check llf_coordinator against llf_daemon agents on loopback, "
+                    "using loop devices backed by image files.")
+    parser.add_argument("--size", type=int, default=32, help="image size in MiB (default: 32)")
+    parser.add_argument("--keep", action="store_true", help="keep the work directory and logs")
+    args = parser.parse_args()
+    if os.geteuid() != 0:
+        print("llf_cluster_check must run as root (loop devices).", file=sys.stderr)
+        return 1
+    size = args.size * MIB
+    workdir = tempfile.mkdtemp(prefix="llf-cluster-check-")
+    token_file = os.path.join(workdir, "api-token")
+    with open(token_file, "w") as f:
+        f.write("cluster-check\n")
+    os.chmod(token_file, 0o600)
+    stations = {}
+    loops = []
+    code = 0
+    try:
+        images = []
+        for i in range(3):
+            image = os.path.join(workdir, f"disk{i + 1}.img")
+            make_image(image, size)
+            loops.append(losetup("-f", "--show", image))
+            images.append(image)
+        agents = []
+        for i in range(3):
+            station = Station(f"st{i + 1}", workdir, token_file)
+            station.start()
+            stations[station.name] = station
+            agents.append(LoopAgent(station.name, station.url, "cluster-check"))
+        for agent in agents:
+            wait_online(agent)
+        set_rate(agents, SLOW_RATE)
+        try:
+            coordinator = check_dispatch(stations, agents, images)
+            print("PASS dispatch by free slots")
+            check_reconnect(coordinator, stations)
+            print("PASS station restart: job queued again and finished")
+            check_same_disk(stations, agents, workdir, size)
+            print("PASS different disk on the same path is not wiped again")
+        except CheckError as e:
+            print(f"FAIL {e}")
+            code = 1
+    finally:
+        for station in stations.values():
+            station.terminate()
+        for loop in loops:
+            subprocess.run(["losetup", "-d", loop], capture_output=True)
+        if args.keep or code:
+            print(f"Logs: {workdir}")
+        else:
+            for name in os.listdir(workdir):
+                os.unlink(os.path.join(workdir, name))
+            os.rmdir(workdir)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
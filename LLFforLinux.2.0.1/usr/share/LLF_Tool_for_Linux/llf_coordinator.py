@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Birden fazla istasyonu tek yerden yöneten koordinatör. Her istasyonda arka plan servisi
+# (llf_daemon --http) ajan olarak çalışıyor; koordinatör onların JSON-RPC noktalarına
+# bağlanıp cihazları ve işleri birleştiriyor, toplu işi istasyonlara boş slot oldukça dağıtıyor.
+#
+# Ajan adresleri loopback'e bağlı (llf_http); uzak istasyonlar için ssh tüneli:
+#   ssh -N -L 18001:127.0.0.1:8765 root@station1
+#
+# Hedefler:
+#   station1:/dev/sdb   belirli istasyondaki cihaz
+#   serial:WD-12345     seri numarası (ya da wwn:...) hangi istasyonda görünüyorsa orada
+# Aynı disk birden fazla istasyonda görünüyorsa (çift yollu kasa) boş slotu çok olan,
+# eşitse ölçülen iş başı hızı yüksek olan istasyon seçiliyor.
+#
+# Ajan giderse işleri beklemede kalıyor; geri gelince kaldığı yerden izleniyor.
+# Ajan yeniden başladıysa bitmemiş işler yeniden kuyruğa alınıyor, ama sadece ilk gönderimde
+# kaydedilen kimliğe (WWN ya da seri no + model + boyut) sahip disk yine silinir; /dev/sdX
+# yeniden başlatmadan sonra başka bir diske ait olabilir. Servis yeniden başlamadan
+# kaybolan iş (ör. başka istemci clear_finished çağırdı) tekrar silinmiyor, sonucu bilinmiyor.
+#
+# Örnek: llf-tool-coordinator --agent st1=http://127.0.0.1:18001 --agent st2=http://127.0.0.1:18002 \
+#            run --yes st1:/dev/sdb st2:/dev/sdc serial:S3Z9NB0K123456
+# Çıktı llf_cli gibi satır başına bir JSON nesnesi.
+
+import sys
+import json
+import time
+import signal
+import argparse
+import itertools
+import threading
+import urllib.error
+import urllib.request
+
+from llf_cli import (
+    EXIT_FAILED, EXIT_OK, EXIT_STOPPED, EXIT_USAGE, JsonLinesWriter,
+)
+from llf_devices import group_physical_disks
+from llf_http import TOKEN_FILE
+from llf_scheduler import ACTIVE_STATES, FINISHED_STATES
+
+AGENTS_FILE = "/etc/llf-tool/agents.json"
+POLL_INTERVAL = 2.0
+DEVICE_INTERVAL = 30.0       # Cihaz listesi daha seyrek yenileniyor
+RECONNECT_INTERVAL = 5.0
+CALL_TIMEOUT = 15
+STOP_TIMEOUT = 30            # Durdururken ajanlardan onay bekleme süresi
+# Ölçülen hızlar için üstel ortalama katsayısı
+RATE_WEIGHT = 0.3
+
+
+class AgentError(Exception):
+    pass
+
+
+class Agent:
+    # Tek bir istasyonun servisi. Çağrılar HTTP üzerinden JSON-RPC; bağlantı koparsa
+    # RECONNECT_INTERVAL aralıklarla tekrar deneniyor.
+
+    def __init__(self, name, url, token):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.token = token
+        self.online = False
+        self.last_error = "Not connected yet."
+        self.status = {}
+        self.jobs = []
+        self.devices = []
+        # Servis yeniden başlarsa iş numaraları baştan başlıyor; artınca eski işler geçersiz
+        self.generation = 0
+        self.throughput = None     # Çalışan işlerin toplam hızı (bayt/s)
+        self.job_rate = None       # İş başına ortalama hız (bayt/s)
+        self._started = None
+        self._devices_at = 0.0
+        self._next_attempt = 0.0
+        self._ids = itertools.count(1)
+
+    def call(self, method, **params):
+        body = json.dumps({"jsonrpc": "2.0", "id": next(self._ids), "method": method,
+                           "params": params}).encode("utf-8")
+        request = urllib.request.Request(f"{self.url}/rpc", body, {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=CALL_TIMEOUT) as f:
+                reply = json.loads(f.read())
+        except urllib.error.HTTPError as e:
+            raise AgentError(f"{self.name}: HTTP {e.code} {e.reason}")
+        except (OSError, ValueError) as e:
+            raise AgentError(f"{self.name}: {getattr(e, 'reason', None) or e}")
+        if "error" in reply:
+            error = reply["error"]
+            # Kuyrukta zaten olan cihaz gibi kullanıcı hataları ValueError olarak kalsın
+            if (error.get("data") or {}).get("type") == "ValueError":
+                raise ValueError(error["message"])
+            raise AgentError(f"{self.name}: {error['message']}")
+        return reply.get("result")
+
+    def refresh(self):
+        now = time.monotonic()
+        if not self.online and now < self._next_attempt:
+            return False
+        try:
+            status = self.call("status")
+            jobs = self.call("jobs")
+            # Yeniden başlayan istasyonda cihaz adları değişmiş olabilir; listeyi hemen yenile
+            restarted = status["started"] != self._started
+            if not self.online or restarted or now - self._devices_at >= DEVICE_INTERVAL:
+                # Çift yollu SAS diskler tek giriş; "path" multipath aygıtı (yollar "paths"te)
+                self.devices = group_physical_disks(self.call("list"))
+                self._devices_at = now
+        except (AgentError, ValueError) as e:
+            self.online = False
+            self.last_error = str(e)
+            self._next_attempt = now + RECONNECT_INTERVAL
+            return False
+        if status["started"] != self._started:
+            if self._started is not None:
+                self.generation += 1
+            self._started = status["started"]
+        self.status = status
+        self.jobs = jobs
+        self.online = True
+        self.last_error = None
+        self._measure(jobs)
+        return True
+
+    def _measure(self, jobs):
+        running = [job for job in jobs if job["state"] in ACTIVE_STATES and job["avg_rate"]]
+        if not running:
+            return
+        total = sum(job["rate"] for job in running)
+        per_job = sum(job["avg_rate"] for job in running) / len(running)
+        self.throughput = total if self.throughput is None else \
+            self.throughput + RATE_WEIGHT * (total - self.throughput)
+        self.job_rate = per_job if self.job_rate is None else \
+            self.job_rate + RATE_WEIGHT * (per_job - self.job_rate)
+
+    def free_slots(self):
+        # Kuyrukta bekleyenler de slot sayılıyor; duraklatılan iş slotunu bırakıyor
+        if not self.online:
+            return 0
+        busy = sum(1 for job in self.jobs if job["state"] not in FINISHED_STATES + ("paused",))
+        return max(0, self.status.get("max_concurrent", 0) - busy)
+
+    def job(self, job_id):
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def find_device(self, key, value):
+        # /dev/sdX diskin yollarından biri de olabilir; bulunan giriş diskin tamamı
+        for info in self.devices:
+            if info.get(key) == value or key == "path" and value in info["paths"]:
+                return info
+        return None
+
+    def snapshot(self):
+        return {
+            "host": self.name,
+            "url": self.url,
+            "online": self.online,
+            "error": self.last_error,
+            "pid": self.status.get("pid"),
+            "max_concurrent": self.status.get("max_concurrent"),
+            "free_slots": self.free_slots(),
+            "running": sum(1 for job in self.jobs if job["state"] in ACTIVE_STATES),
+            "throughput": self.throughput,
+            "job_rate": self.job_rate,
+        }
+
+
+def disk_identity(info):
+    return {key: info.get(key) for key in ("wwn", "serial", "model", "size", "tran")}
+
+
+def same_disk(identity, info):
+    # WWN varsa o yeter; yoksa seri no, model ve boyut aynı olmalı. WWN'siz USB bellekte
+    # seri no sahte olabiliyor (bkz. llf_devices.physical_key), aynı disk olduğundan emin olamayız.
+    wwn = (identity.get("wwn") or "").strip().lower()
+    if wwn:
+        return wwn == (info.get("wwn") or "").strip().lower()
+    if not identity.get("serial") or (identity.get("tran") or "").lower() == "usb":
+        return False
+    return all(info.get(key) == identity.get(key) for key in ("serial", "model", "size"))
+
+
+class BatchItem:
+    # Toplu işteki bir hedef. state: pending -> dispatched (ajandaki işin durumunu izliyor)
+    # -> done / failed / stopped
+
+    def __init__(self, target, quick=False, label=""):
+        self.target = target
+        self.quick = quick
+        self.label = label
+        self.host = None
+        self.device = None
+        self.match = None          # ("serial", "...") ya da ("wwn", "...")
+        if target.startswith(("serial:", "wwn:")):
+            key, _, value = target.partition(":")
+            if not value:
+                raise ValueError(f"Invalid target: {target}")
+            self.match = (key, value)
+        else:
+            host, sep, device = target.partition(":")
+            if not sep or not device.startswith("/dev/"):
+                raise ValueError(f"Invalid target: {target} (expected HOST:/dev/X, serial:... or wwn:...)")
+            self.host = host
+            self.device = device
+        self.state = "pending"
+        self.message = "Waiting for a free slot."
+        self.agent = None
+        self.path = None
+        self.job = None
+        self.generation = None
+        # İlk gönderimdeki diskin kimliği; tekrar gönderirken aynı disk olmalı
+        self.identity = None
+        self.size = 0
+        self.stats = {}
+        self.attempts = 0
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def requeue(self, message):
+        self.state = "pending"
+        self.message = message
+        self.agent = None
+        self.job = None
+        self.stats = {}
+
+    def snapshot(self):
+        return dict(self.stats, target=self.target, host=self.agent.name if self.agent else self.host,
+                    path=self.path or self.device, job=self.job, state=self.state,
+                    message=self.message, attempts=self.attempts)
+
+
+class Coordinator:
+
+    def __init__(self, agents):
+        self.agents = {agent.name: agent for agent in agents}
+        self.items = []
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def add(self, target, quick=False, label=""):
+        item = BatchItem(target, quick, label)
+        if item.host is not None and item.host not in self.agents:
+            raise ValueError(f"Unknown station: {item.host}")
+        with self._lock:
+            self.items.append(item)
+        return item
+
+    # --- Birleşik görünüm ---
+
+    def refresh(self):
+        # Yanıt vermeyen bir istasyon diğerlerini bekletmesin
+        threads = [threading.Thread(target=agent.refresh, daemon=True) for agent in self.agents.values()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(CALL_TIMEOUT * 3)
+
+    def devices(self):
+        return [dict(info, host=agent.name) for agent in self.agents.values() for info in agent.devices]
+
+    def jobs(self):
+        return [dict(job, host=agent.name) for agent in self.agents.values() for job in agent.jobs]
+
+    def hosts(self):
+        return [agent.snapshot() for agent in self.agents.values()]
+
+    def eta(self):
+        # Kalan bayt / istasyonun ölçülen toplam hızı; en geç bitecek istasyon belirliyor
+        remaining = {}
+        for item in self.items:
+            if item.finished or item.agent is None and item.host is None:
+                continue
+            name = item.agent.name if item.agent else item.host
+            left = item.stats.get("total", item.size) - item.stats.get("offset", 0)
+            remaining[name] = remaining.get(name, 0) + max(0, left)
+        times = []
+        for name, left in remaining.items():
+            rate = self.agents[name].throughput
+            if not rate:
+                return None
+            times.append(left / rate)
+        return max(times) if times else 0.0
+
+    # --- Dağıtım ---
+
+    def _candidates(self, item):
+        # (ajan, cihaz bilgisi) çiftleri; sadece bağlı istasyonlar
+        if item.host is not None:
+            agent = self.agents[item.host]
+            info = agent.find_device("path", item.device) if agent.online else None
+            return [(agent, info)] if info else []
+        key, value = item.match
+        found = []
+        for agent in self.agents.values():
+            info = agent.find_device(key, value) if agent.online else None
+            if info is not None:
+                found.append((agent, info))
+        return found
+
+    def _sync(self):
+        for item in self.items:
+            if item.state != "dispatched":
+                continue
+            agent = item.agent
+            if not agent.online:
+                item.message = f"Station {agent.name} is offline: {agent.last_error}"
+                continue
+            if agent.generation != item.generation:
+                item.requeue(f"Station {agent.name} restarted; queued again.")
+                continue
+            job = agent.job(item.job)
+            if job is None:
+                # Bitmiş olabilir, durdurulmuş olabilir; bilmeden tekrar silmiyoruz
+                item.state = "failed"
+                item.message = (f"Job {item.job} disappeared from {agent.name} "
+                                "(cleared by another client?); its result is unknown.")
+                continue
+            item.stats = {key: job[key] for key in ("pct", "offset", "total", "rate", "avg_rate",
+                                                    "eta", "stalled", "medium_errors", "link_errors")}
+            item.stats["agent_state"] = job["state"]
+            item.message = job["message"]
+            if job["state"] in FINISHED_STATES:
+                item.state = job["state"]
+
+    def _unresolved(self, item):
+        # Hiçbir bağlı istasyonda yok; hepsi bağlıysa beklemenin anlamı yok
+        if item.host is not None:
+            agent = self.agents[item.host]
+            if agent.online:
+                item.state = "failed"
+                item.message = f"{item.device} was not found on {agent.name}."
+            else:
+                item.message = f"Station {agent.name} is offline: {agent.last_error}"
+        elif all(agent.online for agent in self.agents.values()):
+            item.state = "failed"
+            item.message = f"No station has a device with {item.match[0]} {item.match[1]}."
+        else:
+            item.message = "Not found on the connected stations; waiting for the others."
+
+    def _dispatch(self):
+        pending = []
+        for item in self.items:
+            if item.state != "pending":
+                continue
+            candidates = self._candidates(item)
+            if not candidates:
+                self._unresolved(item)
+                continue
+            if item.identity is not None:
+                candidates = [(agent, info) for agent, info in candidates if same_disk(item.identity, info)]
+                if not candidates:
+                    item.state = "failed"
+                    item.message = ("Cannot confirm that the device is still the disk that was "
+                                    "started before; not wiping it again.")
+                    continue
+            item.size = max(info.get("size") or 0 for _, info in candidates)
+            pending.append((item, candidates))
+        # Büyük diskler önce: toplam süreyi en uzun iş belirliyor
+        pending.sort(key=lambda entry: entry[0].size, reverse=True)
+        for item, candidates in pending:
+            free = [(agent, info) for agent, info in candidates if agent.free_slots() > 0]
+            if not free:
+                item.message = "Waiting for a free slot."
+                continue
+            agent, info = max(free, key=lambda entry: (entry[0].free_slots(), entry[0].job_rate or 0.0))
+            try:
+                snapshot = agent.call("submit", device=info["path"], quick=item.quick,
+                                      label=item.label or item.target, size=info.get("size") or 0)
+            except ValueError as e:
+                item.state = "failed"
+                item.message = str(e)
+                continue
+            except AgentError as e:
+                item.message = str(e)
+                continue
+            item.state = "dispatched"
+            item.agent = agent
+            item.path = info["path"]
+            item.job = snapshot["id"]
+            item.generation = agent.generation
+            if item.identity is None:
+                item.identity = disk_identity(info)
+            item.message = snapshot["message"]
+            item.attempts += 1
+            # Bir sonraki yenilemeye kadar boş slot sayısı doğru kalsın
+            agent.jobs.append(snapshot)
+
+    def step(self):
+        self.refresh()
+        with self._lock:
+            self._sync()
+            if not self._stopping:
+                self._dispatch()
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            for item in self.items:
+                if item.state == "pending":
+                    item.state = "stopped"
+                    item.message = "Stopped before start."
+                elif item.state == "dispatched":
+                    try:
+                        item.agent.call("stop", job=item.job)
+                    except (AgentError, ValueError) as e:
+                        item.message = str(e)
+
+    def done(self):
+        return all(item.finished for item in self.items)
+
+
+def load_agents(args):
+    entries = []
+    if args.agents:
+        with open(args.agents, "r") as f:
+            entries.extend(json.load(f))
+    for spec in args.agent:
+        name, sep, url = spec.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid agent: {spec} (expected NAME=URL)")
+        entries.append({"name": name, "url": url})
+    if not entries:
+        try:
+            with open(AGENTS_FILE, "r") as f:
+                entries.extend(json.load(f))
+        except FileNotFoundError:
+            raise ValueError(f"No agents given (use --agent NAME=URL or {AGENTS_FILE}).")
+    shared = None
+    agents = []
+    for entry in entries:
+        token = entry.get("token")
+        if token is None:
+            token_file = entry.get("token_file") or args.token_file
+            if token_file == args.token_file and shared is not None:
+                token = shared
+            else:
+                with open(token_file, "r") as f:
+                    token = f.read().strip()
+                if token_file == args.token_file:
+                    shared = token
+        agents.append(Agent(entry["name"], entry["url"], token))
+    if len({agent.name for agent in agents}) != len(agents):
+        raise ValueError("Station names must be unique.")
+    return agents
+
+
+def cmd_hosts(coordinator, args, out):
+    coordinator.refresh()
+    for host in coordinator.hosts():
+        out.emit("host", **host)
+    return EXIT_OK if all(agent.online for agent in coordinator.agents.values()) else EXIT_FAILED
+
+
+def cmd_devices(coordinator, args, out):
+    coordinator.refresh()
+    for info in coordinator.devices():
+        out.emit("device", **info)
+    return EXIT_OK
+
+
+def cmd_jobs(coordinator, args, out):
+    coordinator.refresh()
+    for job in coordinator.jobs():
+        out.emit("job", **job)
+    return EXIT_OK
+
+
+def cmd_run(coordinator, args, out):
+    op = "quick" if args.quick else "format"
+    for target in args.targets:
+        coordinator.add(target, quick=args.quick, label=args.label)
+
+    stop_requested = threading.Event()
+
+    def stop(signum, frame):
+        stop_requested.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    online = {}
+    reported = set()
+    last_batch = 0.0
+    stop_deadline = None
+    while True:
+        if stop_requested.is_set() and stop_deadline is None:
+            coordinator.stop()
+            stop_deadline = time.monotonic() + STOP_TIMEOUT
+        coordinator.step()
+        for agent in coordinator.agents.values():
+            if online.get(agent.name) != agent.online:
+                online[agent.name] = agent.online
+                out.emit("host", **agent.snapshot())
+        for item in coordinator.items:
+            snapshot = item.snapshot()
+            if item.finished:
+                if item not in reported:
+                    reported.add(item)
+                    out.emit("result", op=op, ok=item.state == "done", **snapshot)
+            elif item.state == "dispatched":
+                out.progress(item.target, op, snapshot)
+        now = time.monotonic()
+        if now - last_batch >= args.interval:
+            last_batch = now
+            states = [item.state for item in coordinator.items]
+            out.emit("batch", pending=states.count("pending"), dispatched=states.count("dispatched"),
+                     finished=sum(1 for item in coordinator.items if item.finished),
+                     total=len(states), eta=coordinator.eta())
+        if coordinator.done():
+            break
+        if stop_deadline is not None and now >= stop_deadline:
+            # Ulaşılamayan istasyonlardaki işlerin durduğundan emin değiliz
+            for item in coordinator.items:
+                if not item.finished:
+                    item.state = "stopped"
+                    item.message = "Stop requested; the station did not confirm in time."
+                    out.emit("result", op=op, ok=False, **item.snapshot())
+            break
+        time.sleep(POLL_INTERVAL)
+
+    states = [item.state for item in coordinator.items]
+    if "failed" in states:
+        return EXIT_FAILED
+    if "stopped" in states:
+        return EXIT_STOPPED
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="llf-tool-coordinator",
+        description="Drive several LLF Tool stations (llf_daemon --http) as one. "
+                    "Prints JSON Lines on stdout.")
+    parser.add_argument("--agent", action="append", default=[], metavar="NAME=URL",
+                        help="station agent, e.g. st1=http://127.0.0.1:8765 (repeatable)")
+    parser.add_argument("--agents", default=None, metavar="FILE",
+                        help=f"JSON list of {{name, url, token | token_file}} (default: {AGENTS_FILE})")
+    parser.add_argument("--token-file", default=TOKEN_FILE,
+                        help="API token for agents without their own token")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("hosts", help="show the stations and their free slots")
+    commands.add_parser("devices", help="list the block devices of all stations")
+    commands.add_parser("jobs", help="list the jobs of all stations")
+    run = commands.add_parser("run", help="wipe a batch of devices across the stations")
+    run.add_argument("targets", nargs="+", metavar="TARGET",
+                     help="HOST:/dev/sdX, serial:SERIAL or wwn:WWN")
+    run.add_argument("--quick", action="store_true", help="only wipe the first 10 MB")
+    run.add_argument("--label", default="", help="job label shown on the stations")
+    run.add_argument("--interval", type=float, default=5.0,
+                     help="seconds between batch summary lines (default: 5)")
+    run.add_argument("--yes", action="store_true",
+                     help="confirm that all data on the devices will be destroyed")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = JsonLinesWriter(interval=getattr(args, "interval", 1.0))
+    try:
+        coordinator = Coordinator(load_agents(args))
+    except (OSError, ValueError, KeyError) as e:
+        out.emit("error", message=f"Could not load the agents: {e}")
+        return EXIT_USAGE
+    if args.command == "hosts":
+        return cmd_hosts(coordinator, args, out)
+    if args.command == "devices":
+        return cmd_devices(coordinator, args, out)
+    if args.command == "jobs":
+        return cmd_jobs(coordinator, args, out)
+    if not args.yes:
+        out.emit("error", message="Refusing to wipe without --yes. All data on "
+                                  f"{', '.join(args.targets)} would be destroyed.")
+        return EXIT_USAGE
+    if len(set(args.targets)) != len(args.targets):
+        out.emit("error", message="The same target is given more than once.")
+        return EXIT_USAGE
+    try:
+        return cmd_run(coordinator, args, out)
+    except ValueError as e:
+        out.emit("error", message=str(e))
+        return EXIT_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
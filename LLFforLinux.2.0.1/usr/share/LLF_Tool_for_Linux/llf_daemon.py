@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Toplu silme işlerini arayüzden bağımsız çalıştıran arka plan servisi.
+# İşler bu süreçteki JobScheduler'da çalışıyor; masaüstü oturumu çökse ya da kullanıcı
+# çıkış yapsa bile devam ediyorlar. Bir ya da birden fazla arayüz unix soketi üzerinden
+# bağlanıp işleri izliyor ve yönetiyor. Protokol llf_helper ile aynı (satır başına JSON).
+#
+# Servis kendi oturumunda (setsid) başlatılıyor; arayüz kapanınca sinyal almıyor.
+# Bağlı istemci ve bekleyen iş kalmayınca IDLE_EXIT saniye sonra kendiliğinden kapanıyor.
+# --http verilirse aynı metotlar yerel bir HTTP/JSON-RPC noktasından da açılıyor (llf_http).
+
+import os
+import sys
+import time
+import errno
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+
+from llf_helper import HelperClient, HelperError, HelperServer, peer_uid
+from llf_http import ApiServer, ControlApi, TOKEN_FILE, load_token, parse_address
+from llf_scheduler import JobScheduler, DEFAULT_CONCURRENCY
+from llf_throttle import TokenBucket
+from llf_tuning import restore_stale
+
+DAEMON_SOCKET = "/run/llf-tool/daemon.sock"
+DAEMON_LOG = "/var/log/llf-tool-daemon.log"
+IDLE_EXIT = 600          # İstemci ve iş yokken bu kadar saniye sonra çık
+START_TIMEOUT = 15       # Servisi başlatıp soketin açılmasını bekleme süresi
+CALL_TIMEOUT = 30
+RECONNECT_INTERVAL = 5.0
+# İstemcilerin değiştirebileceği motor ayarları
+ENGINE_OPTIONS = ("tune_queue", "cgroup", "direct")
+
+
+# --- Sunucu ---
+
+class DaemonSession(HelperServer):
+    # Tek bir istemci bağlantısı. ping/list/probe/preflight/smart llf_helper'dan geliyor;
+    # işler oturuma değil servise ait, bağlantı kopunca durmuyorlar.
+
+    do_wipe = None
+
+    def __init__(self, conn, daemon):
+        super().__init__(conn, 0)
+        self.daemon = daemon
+        self.scheduler = daemon.scheduler
+
+    def _job(self, job):
+        found = self.scheduler.get(job)
+        if found is None:
+            raise HelperError(f"No job {job}.")
+        return found
+
+    def do_status(self, request_id):
+        return self.daemon.status()
+
+    def do_submit(self, request_id, device, quick=False, label="", size=0, rate_limit=None,
+                  io_class=None):
+        job = self.scheduler.submit(self._check_device(device), quick_wipe=bool(quick),
+                                    label=label, size=size, rate_limit=rate_limit,
+                                    io_class=io_class)
+        return job.snapshot()
+
+    def do_jobs(self, request_id):
+        return self.scheduler.snapshot()
+
+    def do_get(self, request_id, job):
+        found = self.scheduler.get(job)
+        return found.snapshot() if found is not None else None
+
+    def do_log(self, request_id, job):
+        return list(self._job(job).log)
+
+    def do_plan(self, request_id):
+        return self.scheduler.plan()
+
+    def do_groups(self, request_id):
+        return self.scheduler.groups()
+
+    def do_stop(self, request_id, job):
+        self.scheduler.stop(self._job(job).id)
+        return True
+
+    def do_pause(self, request_id, job):
+        self.scheduler.pause(self._job(job).id)
+        return True
+
+    def do_resume(self, request_id, job):
+        self.scheduler.resume(self._job(job).id)
+        return True
+
+    def do_stop_all(self, request_id):
+        self.scheduler.stop_all()
+        return True
+
+    def do_clear_finished(self, request_id):
+        self.scheduler.clear_finished()
+        return True
+
+    def do_set_max_concurrent(self, request_id, value):
+        self.scheduler.set_max_concurrent(value)
+        return self.scheduler.max_concurrent
+
+    def do_set_default_group_limit(self, request_id, value):
+        self.scheduler.set_default_group_limit(value)
+        return self.scheduler.default_group_limit
+
+    def do_set_global_rate_limit(self, request_id, rate):
+        self.scheduler.set_global_rate_limit(rate)
+        return True
+
+    def do_set_rate_limit(self, request_id, job, rate):
+        self.scheduler.set_rate_limit(self._job(job).id, rate)
+        return True
+
+    def do_set_io_class(self, request_id, job, io_class):
+        self.scheduler.set_io_class(self._job(job).id, io_class)
+        return True
+
+    def do_set_engine_option(self, request_id, key, value):
+        if key not in ENGINE_OPTIONS:
+            raise HelperError(f"Unknown engine option: {key}")
+        self.scheduler.set_engine_option(key, value)
+        return True
+
+    def do_shutdown(self, request_id, stop_jobs=False):
+        if self.scheduler.busy() and not stop_jobs:
+            raise HelperError("Jobs are still running; stop them first.")
+        self.daemon.shutdown()
+        self._running = False
+        return True
+
+
+class WipeDaemon:
+
+    def __init__(self, address=DAEMON_SOCKET, max_concurrent=DEFAULT_CONCURRENCY,
+                 idle_exit=IDLE_EXIT):
+        self.address = address
+        self.idle_exit = idle_exit
+        self.scheduler = JobScheduler(max_concurrent)
+        self.sessions = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._last_activity = time.monotonic()
+        self.started = time.time()
+
+    def status(self):
+        scheduler = self.scheduler
+        with self._lock:
+            clients = len(self.sessions)
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "clients": clients,
+            "max_concurrent": scheduler.max_concurrent,
+            "default_group_limit": scheduler.default_group_limit,
+            "global_rate_limit": scheduler.global_limit.rate,
+            "engine_options": dict(scheduler.engine_options),
+        }
+
+    def shutdown(self):
+        self._stopping.set()
+
+    def _bind(self):
+        directory = os.path.dirname(self.address)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Eski bir servisten kalan soket dosyası: dinleyen yoksa siliyoruz
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+            raise HelperError(f"Another wipe service is already listening on {self.address}.")
+        except OSError as e:
+            if e.errno in (errno.ECONNREFUSED, errno.ENOENT):
+                try:
+                    os.unlink(self.address)
+                except FileNotFoundError:
+                    pass
+        finally:
+            probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.address)
+        finally:
+            os.umask(old_umask)
+        server.listen(8)
+        server.settimeout(1.0)
+        return server
+
+    def _idle(self):
+        with self._lock:
+            if self.sessions:
+                self._last_activity = time.monotonic()
+                return False
+        if self.scheduler.busy():
+            self._last_activity = time.monotonic()
+            return False
+        return self.idle_exit and time.monotonic() - self._last_activity >= self.idle_exit
+
+    def _serve_session(self, conn):
+        session = DaemonSession(conn, self)
+        with self._lock:
+            self.sessions.add(session)
+        try:
+            session.serve()
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self.sessions.discard(session)
+            self._last_activity = time.monotonic()
+            conn.close()
+
+    def serve(self):
+        server = self._bind()
+        try:
+            while not self._stopping.is_set() and not self._idle():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                # Soket 0600 ama yine de sadece root ve servisin sahibini kabul ediyoruz
+                if peer_uid(conn) not in (0, os.geteuid()):
+                    conn.close()
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=self._serve_session, args=(conn,),
+                                 name="llf-daemon-session", daemon=True).start()
+        finally:
+            server.close()
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+            self._stop_jobs()
+
+    def _stop_jobs(self):
+        # Kapanırken çalışan işleri durdurup motorların cihazı kapatmasını bekliyoruz
+        self.scheduler.stop_all()
+        for job in self.scheduler.jobs():
+            if job.thread is not None and not job.detached:
+                job.thread.join(10)
+
+
+# --- İstemci (arayüz tarafı) ---
+
+class DaemonClient(HelperClient):
+    name = "wipe service"
+
+
+class RemoteJob:
+    # scheduler.submit()/get() dönüşü; istasyon ve arayüz WipeJob gibi kullanıyor
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.id = snapshot["id"]
+        self.device_path = snapshot["device"]
+        self.label = snapshot["label"]
+        self.state = snapshot["state"]
+        self.message = snapshot["message"]
+
+
+class RemoteScheduler:
+    # JobScheduler ile aynı arayüz; çağrılar servise gidiyor. Qt slotlarından çağrıldığı
+    # için kontrol çağrıları hata fırlatmıyor, son hatayı last_error'da tutuyor.
+    remote = True
+
+    def __init__(self, client, address=DAEMON_SOCKET):
+        self.client = client
+        self.address = address
+        self.last_error = None
+        self._last_snapshot = []
+        self._last_attempt = 0.0
+        self._load_status(client.call("status", timeout=CALL_TIMEOUT))
+
+    def _load_status(self, status):
+        self.pid = status["pid"]
+        self.max_concurrent = status["max_concurrent"]
+        self.default_group_limit = status["default_group_limit"]
+        self.engine_options = dict(status["engine_options"])
+        # Arayüz sınırı global_limit.rate üzerinden okuyor; yerel kopya
+        self.global_limit = TokenBucket(status["global_rate_limit"])
+
+    @property
+    def connected(self):
+        return self.client.running
+
+    def _reconnect(self):
+        # Servis yeniden başlatıldıysa ya da bağlantı koptuysa arada bir tekrar bağlan
+        now = time.monotonic()
+        if now - self._last_attempt < RECONNECT_INTERVAL:
+            return False
+        self._last_attempt = now
+        try:
+            self.client.connect(self.address, timeout=0)
+            self._load_status(self.client.call("status", timeout=CALL_TIMEOUT))
+            self.last_error = None
+            return True
+        except (HelperError, OSError) as e:
+            self.last_error = str(e)
+            return False
+
+    def _call(self, method, default=None, **params):
+        if not self.client.running and not self._reconnect():
+            return default
+        try:
+            return self.client.call(method, timeout=CALL_TIMEOUT, **params)
+        except (HelperError, ValueError) as e:
+            self.last_error = str(e)
+            return default
+
+    def submit(self, device_path, quick_wipe=False, label="", size=0, rate_limit=None,
+               io_class=None):
+        if not self.client.running and not self._reconnect():
+            raise ValueError(f"Not connected to the wipe service: {self.last_error}")
+        try:
+            snapshot = self.client.call("submit", timeout=CALL_TIMEOUT, device=device_path,
+                                        quick=quick_wipe, label=label, size=size,
+                                        rate_limit=rate_limit, io_class=io_class)
+        except HelperError as e:
+            raise ValueError(str(e))
+        return RemoteJob(snapshot)
+
+    def get(self, job_id):
+        snapshot = self._call("get", job=job_id)
+        return RemoteJob(snapshot) if snapshot else None
+
+    def log(self, job_id):
+        return self._call("log", [], job=job_id)
+
+    def stop(self, job_id):
+        self._call("stop", job=job_id)
+
+    def pause(self, job_id):
+        self._call("pause", job=job_id)
+
+    def resume(self, job_id):
+        self._call("resume", job=job_id)
+
+    def stop_all(self):
+        self._call("stop_all")
+
+    def clear_finished(self):
+        self._call("clear_finished")
+
+    def set_rate_limit(self, job_id, rate):
+        self._call("set_rate_limit", job=job_id, rate=rate)
+
+    def set_io_class(self, job_id, io_class):
+        self._call("set_io_class", job=job_id, io_class=io_class)
+
+    def set_global_rate_limit(self, rate):
+        self.global_limit.set_rate(rate)
+        self._call("set_global_rate_limit", rate=rate)
+
+    def set_engine_option(self, key, value):
+        self.engine_options[key] = value
+        self._call("set_engine_option", key=key, value=value)
+
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, int(value))
+        self._call("set_max_concurrent", value=self.max_concurrent)
+
+    def set_default_group_limit(self, value):
+        self.default_group_limit = int(value) or None
+        self._call("set_default_group_limit", value=int(value))
+
+    def groups(self):
+        return self._call("groups", [])
+
+    def snapshot(self):
+        # Bağlantı koptuysa tablo boşalmasın, son bilinen durumu gösteriyoruz
+        jobs = self._call("jobs")
+        if jobs is not None:
+            self._last_snapshot = jobs
+        return self._last_snapshot
+
+    def plan(self):
+        return self._call("plan", 0.0) or 0.0
+
+    def busy(self):
+        return any(job["state"] not in ("done", "failed", "stopped") for job in self.snapshot())
+
+    def close(self):
+        # Sadece bağlantıyı kapatıyoruz; işler serviste devam ediyor
+        self.client.close()
+
+
+def start_daemon(address=DAEMON_SOCKET, python=None):
+    # Kendi oturumunda başlatıyoruz: arayüzün terminali/oturumu kapanınca SIGHUP almasın
+    try:
+        log = open(DAEMON_LOG, "a")
+    except OSError:
+        log = subprocess.DEVNULL
+    try:
+        return subprocess.Popen([python or sys.executable, os.path.abspath(__file__),
+                                 "--socket", address],
+                                stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                                start_new_session=True, close_fds=True)
+    finally:
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+
+def connect_scheduler(address=DAEMON_SOCKET, start=True, timeout=START_TIMEOUT):
+    # Çalışan servise bağlanır; yoksa (start=True ise) başlatıp bağlanır
+    client = DaemonClient()
+    try:
+        client.connect(address, timeout=0)
+    except HelperError:
+        if not start:
+            raise
+        client.process = start_daemon(address)
+        try:
+            client.connect(address, timeout=timeout)
+        finally:
+            # Servis bizden bağımsız yaşıyor; close() onu beklemesin
+            client.process = None
+    return RemoteScheduler(client, address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLF Tool background wipe service")
+    parser.add_argument("--socket", default=DAEMON_SOCKET)
+    parser.add_argument("--jobs", type=int, default=DEFAULT_CONCURRENCY,
+                        help="concurrent jobs")
+    parser.add_argument("--idle-exit", type=int, default=IDLE_EXIT,
+                        help="seconds to stay up with no clients and no jobs (0 = forever)")
+    parser.add_argument("--http", metavar="[HOST:]PORT", default=None,
+                        help="also serve the JSON-RPC control API on a loopback address")
+    parser.add_argument("--token-file", default=TOKEN_FILE,
+                        help="API token for --http (created if missing)")
+    args = parser.parse_args()
+    if os.geteuid() != 0:
+        print("llf_daemon must run as root.", file=sys.stderr)
+        return 1
+    daemon = WipeDaemon(args.socket, args.jobs, args.idle_exit)
+    api_server = None
+    if args.http:
+        try:
+            address = parse_address(args.http)
+            # HTTP istemcileri oturum açık tutmuyor; servis boşta diye kapanmasın
+            daemon.idle_exit = 0
+            api_server = ApiServer(address, load_token(args.token_file),
+                                   ControlApi(DaemonSession(None, daemon)))
+        except (OSError, ValueError) as e:
+            print(f"Could not start the control API on {args.http}: {e}", file=sys.stderr)
+            return 1
+        api_server.start()
+    # Oturum kapanınca gelen SIGHUP'u yok say; SIGTERM/SIGINT işleri düzgün durdurur
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.shutdown())
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.shutdown())
+    # Önceki servis çöktüyse ayarlı kalan blok kuyruklarını geri al
+    restore_stale()
+    try:
+        daemon.serve()
+    except HelperError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        if api_server is not None:
+            api_server.shutdown()
+            api_server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
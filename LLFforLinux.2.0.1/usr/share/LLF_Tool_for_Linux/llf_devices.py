@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Blok cihazları hakkında sysfs ve /dev/disk üzerinden bilgi toplayan yardımcılar.
+# Qt kullanmıyoruz, motor da arayüz de buradan faydalanıyor.
+
+import os
+import re
+import json
+import stat
+import fcntl
+import struct
+import subprocess
+
+SYS_BLOCK = "/sys/block"
+BY_ID_DIR = "/dev/disk/by-id"
+
+
+class DeviceBusyError(Exception):
+    pass
+
+
+def read_sysfs(path, default=""):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def block_name(device_path):
+    # /dev/sdb, /dev/disk/by-id/... gibi yolları çekirdekteki isme (sdb) çeviriyoruz
+    return os.path.basename(os.path.realpath(device_path))
+
+
+def device_identity(device_path):
+    # Cihazı /dev/sdX adından bağımsız tanımlayan kimlikler.
+    # USB köprüsü resetlenince cihaz başka bir sdX olarak gelebiliyor; seri no / WWN değişmiyor.
+    name = block_name(device_path)
+    identity = set()
+    try:
+        for entry in os.listdir(BY_ID_DIR):
+            if "-part" in entry:
+                continue
+            if block_name(os.path.join(BY_ID_DIR, entry)) == name:
+                identity.add(entry)
+    except OSError:
+        pass
+
+    wwid = read_sysfs(os.path.join(SYS_BLOCK, name, "device", "wwid"))
+    if wwid:
+        identity.add(f"wwid:{wwid}")
+    serial = read_sysfs(os.path.join(SYS_BLOCK, name, "device", "serial"))
+    if serial:
+        identity.add(f"serial:{serial}")
+    return frozenset(identity)
+
+
+# Blok cihaz ioctl'leri (linux/fs.h)
+BLKSSZGET = 0x1268
+BLKPBSZGET = 0x127B
+BLKGETSIZE64 = 0x80081272
+BLKFLSBUF = 0x1261
+
+
+def ioctl_size64(fd):
+    return struct.unpack("Q", fcntl.ioctl(fd, BLKGETSIZE64, b"\0" * 8))[0]
+
+
+def ioctl_sector_size(fd):
+    return struct.unpack("i", fcntl.ioctl(fd, BLKSSZGET, b"\0" * 4))[0]
+
+
+def ioctl_physical_sector_size(fd):
+    return struct.unpack("I", fcntl.ioctl(fd, BLKPBSZGET, b"\0" * 4))[0]
+
+
+def flush_device(fd):
+    # Sadece hedef cihazı diske indir: fsync + tampon önbelleğini bırakan BLKFLSBUF.
+    # Global "sync" gibi başka disklerin kirli verisini beklemiyoruz.
+    os.fsync(fd)
+    try:
+        if stat.S_ISBLK(os.fstat(fd).st_mode):
+            fcntl.ioctl(fd, BLKFLSBUF, 0)
+    except OSError:
+        # Yetki yoksa (EPERM) ya da sürücü desteklemiyorsa fsync yeterli
+        pass
+
+
+def fd_size(fd):
+    # blockdev --getsize64 yerine doğrudan ioctl; normal dosyada lseek
+    try:
+        if stat.S_ISBLK(os.fstat(fd).st_mode):
+            return ioctl_size64(fd)
+    except OSError:
+        pass
+    return os.lseek(fd, 0, os.SEEK_END)
+
+
+def device_size(device_path):
+    # Blok cihazda sysfs'teki sektör sayısı (her zaman 512 bayt birim), dosyada dosya boyu
+    name = block_name(device_path)
+    sectors = read_sysfs(os.path.join("/sys/class/block", name, "size"))
+    if sectors.isdigit() and os.path.exists(f"/dev/{name}"):
+        return int(sectors) * 512
+    try:
+        return os.path.getsize(device_path)
+    except OSError:
+        return 0
+
+
+def is_rotational(device_path):
+    return read_sysfs(os.path.join(SYS_BLOCK, block_name(device_path), "queue", "rotational")) == "1"
+
+
+def transport(device_path):
+    # lsblk'nin TRAN sütununa benzer değer: usb, sata, nvme, sas...
+    return device_topology(device_path)["tran"]
+
+
+def udev_properties(name):
+    # lsblk de model/seri no/WWN bilgisini udev veritabanından okuyor; biz de aynısını yapıyoruz
+    props = {}
+    number = dev_number(name)
+    if not number:
+        return props
+    try:
+        with open(f"/run/udev/data/b{number}", "r") as f:
+            for line in f:
+                if line.startswith("E:"):
+                    key, _, value = line[2:].rstrip("\n").partition("=")
+                    props[key] = value
+    except OSError:
+        pass
+    return props
+
+
+def _vpd_serial(base):
+    # SCSI VPD 0x80 sayfası: 4. bayttan itibaren seri numarası
+    try:
+        with open(os.path.join(base, "device", "vpd_pg80"), "rb") as f:
+            data = f.read()
+        return data[4:4 + data[3]].decode("ascii", "replace").strip() if len(data) > 4 else ""
+    except OSError:
+        return ""
+
+
+QUEUE_LIMITS = ("logical_block_size", "physical_block_size", "minimum_io_size",
+                "optimal_io_size", "max_hw_sectors_kb", "max_sectors_kb")
+
+
+def queue_limits(name):
+    limits = {}
+    for key in QUEUE_LIMITS:
+        value = read_sysfs(os.path.join(SYS_BLOCK, name, "queue", key))
+        limits[key] = int(value) if value.isdigit() else 0
+    return limits
+
+
+def io_geometry(fd, device_path):
+    # Yazmaların hizalanacağı değerler (bayt). sysfs okunamazsa ioctl'e düşüyoruz;
+    # normal dosyada dosya sisteminin blok boyutu yeterli.
+    try:
+        is_block = stat.S_ISBLK(os.fstat(fd).st_mode)
+    except OSError:
+        is_block = False
+    if not is_block:
+        try:
+            blksize = os.fstat(fd).st_blksize or 512
+        except OSError:
+            blksize = 512
+        return {"logical": 512, "physical": blksize, "minimum_io": blksize, "optimal_io": 0,
+                "max_io": 0, "alignment_offset": 0}
+
+    name = block_name(device_path)
+    limits = queue_limits(name)
+    logical = limits["logical_block_size"]
+    physical = limits["physical_block_size"]
+    try:
+        logical = logical or ioctl_sector_size(fd)
+        physical = physical or ioctl_physical_sector_size(fd)
+    except OSError:
+        pass
+    logical = logical or 512
+    physical = max(physical, logical)
+    alignment = read_sysfs(os.path.join(SYS_BLOCK, name, "alignment_offset"))
+    return {
+        "logical": logical,
+        "physical": physical,
+        "minimum_io": max(limits["minimum_io_size"], physical),
+        "optimal_io": limits["optimal_io_size"],
+        # Çekirdeğin tek istekte göndereceği en büyük boy; bunun üstü zaten bölünüyor
+        "max_io": min(limits["max_sectors_kb"] or limits["max_hw_sectors_kb"],
+                      limits["max_hw_sectors_kb"] or limits["max_sectors_kb"]) * 1024,
+        "alignment_offset": int(alignment) if alignment.isdigit() else 0,
+    }
+
+
+def plan_block_size(geometry, requested):
+    # Hizalama birimi: fiziksel sektör / minimum I/O; RAID LUN'larında tam şerit (optimal I/O).
+    # Blok boyu bu birimin katı, mümkünse çekirdeğin azami istek boyunun da katı olsun ki
+    # bölünen isteklerin hepsi dolu gitsin.
+    unit = geometry["minimum_io"]
+    optimal = geometry["optimal_io"]
+    if optimal and optimal % unit == 0:
+        unit = optimal
+    block = max(unit, requested - requested % unit)
+    max_io = geometry["max_io"]
+    if max_io and max_io % unit == 0 and block > max_io:
+        block -= block % max_io
+    return unit, block
+
+
+def probe_device(name):
+    # Tek bir cihaz için sysfs ve udev veritabanından okunabilen bilgiler (alt süreç yok)
+    base = os.path.join(SYS_BLOCK, name)
+    path = f"/dev/{name}"
+    udev = udev_properties(name)
+    topology = device_topology(path)
+    model = udev.get("ID_MODEL_FROM_DATABASE") or read_sysfs(os.path.join(base, "device", "model")) \
+        or udev.get("ID_MODEL", "").replace("_", " ")
+    rev = read_sysfs(os.path.join(base, "device", "rev")) \
+        or read_sysfs(os.path.join(base, "device", "firmware_rev")) or udev.get("ID_REVISION", "")
+    serial = udev.get("ID_SERIAL_SHORT") or read_sysfs(os.path.join(base, "device", "serial")) \
+        or _vpd_serial(base)
+    wwn = udev.get("ID_WWN_WITH_EXTENSION") or udev.get("ID_WWN") \
+        or read_sysfs(os.path.join(base, "wwid")) or read_sysfs(os.path.join(base, "device", "wwid"))
+    info = {
+        "name": name,
+        "path": path,
+        "model": model or name,
+        "vendor": read_sysfs(os.path.join(base, "device", "vendor")),
+        "rev": rev,
+        "serial": serial,
+        "wwn": wwn,
+        "size": device_size(path),
+        "removable": read_sysfs(os.path.join(base, "removable")) == "1",
+        "rotational": read_sysfs(os.path.join(base, "queue", "rotational")) == "1",
+        "tran": topology["tran"],
+        "group": topology["group"],
+        "type": "disk",
+        "multipath": None,
+    }
+    info.update(queue_limits(name))
+    return info
+
+
+def probe_devices():
+    # Tüm cihaz tablosu tek geçişte: /sys/block altındaki diskler ve multipath aygıtları
+    try:
+        names = sorted(os.listdir(SYS_BLOCK))
+    except OSError:
+        return []
+    devices = []
+    mpaths = {}
+    for name in names:
+        if name.startswith("dm-"):
+            # Sadece multipath aygıtları; LVM/crypt hacimleri disk değil
+            if read_sysfs(os.path.join(SYS_BLOCK, name, "dm", "uuid")).startswith("mpath-"):
+                mapper = read_sysfs(os.path.join(SYS_BLOCK, name, "dm", "name"))
+                try:
+                    for slave in os.listdir(os.path.join(SYS_BLOCK, name, "slaves")):
+                        mpaths[slave] = f"/dev/mapper/{mapper}" if mapper else f"/dev/{name}"
+                except OSError:
+                    pass
+            continue
+        if name.startswith(("ram", "zram")):
+            continue
+        info = probe_device(name)
+        # lsblk gibi boş (medyasız / bağlanmamış loop) cihazları göstermiyoruz
+        if info["size"] == 0:
+            continue
+        devices.append(info)
+    for info in devices:
+        info["multipath"] = mpaths.get(info["name"])
+    return devices
+
+
+def strong_identity(identity):
+    # Gerçek WWN'ler (naa./eui. ve by-id'deki wwn-/nvme-eui.). t10. wwid ve seri no
+    # üretici/model/seriden türetiliyor; ucuz belleklerde aynı modelin hepsinde aynı olabiliyor.
+    return frozenset(i for i in identity
+                     if i.startswith(("wwid:naa.", "wwid:eui.", "wwn-", "nvme-eui.")))
+
+
+def identity_matches(identity, candidate, usb=False):
+    # WWN varsa o eşleşmeli; yoksa kimlik kümesinin tamamı aynı olmalı.
+    # USB'de sadece seri noya dayanan eşleşmeyi kabul etmiyoruz (bkz. physical_key).
+    strong = strong_identity(identity)
+    if strong:
+        return bool(strong & candidate)
+    if usb:
+        return False
+    return bool(identity) and candidate == identity
+
+
+def find_device_by_identity(identity, usb=False, usb_port=None):
+    # usb_port verilirse (WWN'siz USB bellek) kimlik birebir aynı olmalı ve cihaz aynı portta olmalı
+    if not identity:
+        return None
+    try:
+        names = sorted(os.listdir(SYS_BLOCK))
+    except OSError:
+        return None
+    for name in names:
+        path = f"/dev/{name}"
+        if not os.path.exists(path):
+            continue
+        candidate = device_identity(path)
+        if usb_port:
+            if candidate == identity and device_topology(path).get("usb_port") == usb_port:
+                return path
+        elif identity_matches(identity, candidate, usb):
+            return path
+    return None
+
+
+# --- Güvenlik ön kontrolü (preflight) ---
+# lsblk çağırmadan /proc ve /sys üzerinden diskin ve bölümlerinin kullanımda olup
+# olmadığına bakıyoruz: mount, swap, LVM, md RAID, dm-crypt, multipath...
+
+SYS_CLASS_BLOCK = "/sys/class/block"
+
+
+def partitions(name):
+    try:
+        entries = os.listdir(os.path.join(SYS_BLOCK, name))
+    except OSError:
+        return []
+    return sorted(e for e in entries
+                  if os.path.exists(os.path.join(SYS_BLOCK, name, e, "partition")))
+
+
+def dev_number(name):
+    return read_sysfs(os.path.join(SYS_CLASS_BLOCK, name, "dev"))
+
+
+def holders(name):
+    try:
+        return sorted(os.listdir(os.path.join(SYS_CLASS_BLOCK, name, "holders")))
+    except OSError:
+        return []
+
+
+def holder_kind(name):
+    if name.startswith("md"):
+        return "md RAID member"
+    if name.startswith("dm-"):
+        uuid = read_sysfs(os.path.join(SYS_CLASS_BLOCK, name, "dm", "uuid"))
+        if uuid.startswith("LVM-"):
+            return "LVM physical volume"
+        if uuid.startswith("CRYPT-"):
+            return "dm-crypt volume"
+        if uuid.startswith("mpath-"):
+            return "multipath path"
+        return "device-mapper target"
+    return f"held by {name}"
+
+
+def _unescape_mount(path):
+    # mountinfo boşlukları \040 gibi sekizlik kaçışla yazıyor
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), path)
+
+
+def system_usage():
+    # Tüm cihaz listesi için bir kez okunur, preflight'a verilir
+    mounts = []
+    try:
+        with open("/proc/self/mountinfo", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                sep = fields.index("-")
+                mounts.append({
+                    "dev": fields[2],
+                    "mountpoint": _unescape_mount(fields[4]),
+                    "source": _unescape_mount(fields[sep + 2]),
+                })
+    except (OSError, ValueError):
+        pass
+
+    swaps = []
+    try:
+        with open("/proc/swaps", "r") as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if fields and fields[1] == "partition":
+                    swaps.append(_unescape_mount(fields[0]))
+    except OSError:
+        pass
+    return {"mounts": mounts, "swaps": swaps}
+
+
+def _is_system_mount(mountpoint):
+    return mountpoint in ("/", "/usr", "/var", "/home") or mountpoint.startswith("/boot")
+
+
+def preflight(device_path, usage=None):
+    # Diski kullanan her şeyi listeler. Boş liste = yazmak güvenli.
+    usage = usage or system_usage()
+    name = block_name(device_path)
+    problems = []
+
+    # Diskin kendisi, bölümleri ve bunların üstüne kurulu (holder) aygıtlar
+    nodes = set()
+    pending = [name] + partitions(name)
+    while pending:
+        node = pending.pop()
+        if node in nodes:
+            continue
+        nodes.add(node)
+        for holder in holders(node):
+            problems.append({"kind": "holder", "node": node, "detail": holder_kind(holder),
+                             "holder": holder, "system": False})
+            pending.append(holder)
+
+    numbers = {dev_number(n): n for n in nodes}
+    numbers.pop("", None)
+    for mount in usage["mounts"]:
+        node = numbers.get(mount["dev"])
+        if node is None and mount["source"].startswith("/dev/"):
+            source = block_name(mount["source"])
+            node = source if source in nodes else None
+        if node is None:
+            continue
+        problems.append({"kind": "mount", "node": node, "detail": f"mounted on {mount['mountpoint']}",
+                         "system": _is_system_mount(mount["mountpoint"])})
+
+    for swap in usage["swaps"]:
+        node = block_name(swap)
+        if node in nodes:
+            problems.append({"kind": "swap", "node": node, "detail": "active swap", "system": True})
+
+    # Sistem diskini tutan bir LVM/crypt zinciri varsa diskin kendisi de sistem diskidir
+    if any(p["system"] for p in problems):
+        for p in problems:
+            if p["kind"] == "holder":
+                p["system"] = True
+    return problems
+
+
+def describe_problems(problems):
+    return "\n".join(f"{p['node']}: {p['detail']}" for p in problems)
+
+
+def open_exclusive(device_path, flags=os.O_WRONLY):
+    # Blok cihazlarda O_EXCL, cihaz mount edilmiş ya da bir RAID/LVM/dm tarafından
+    # tutuluyorsa EBUSY ile başarısız olur. Yazmaya başlamadan önce cihazı böyle sahipleniyoruz.
+    return os.open(device_path, flags | os.O_EXCL)
+
+
+# --- Çok yollu (multipath) diskleri tekilleştirme ---
+# Çift portlu SAS raflarında tek bir fiziksel disk iki /dev/sdX ve bir dm-multipath
+# aygıtı olarak görünüyor. Aynı diske iki iş başlatmamak için WWN/seri no ile grupluyoruz.
+
+def physical_key(dev):
+    wwn = (dev.get("wwn") or "").strip().lower()
+    if wwn:
+        return f"wwn:{wwn}"
+    serial = (dev.get("serial") or "").strip()
+    # Ucuz USB belleklerin çoğu aynı sahte seri numarasını döndürüyor, onları gruplamayalım
+    if serial and (dev.get("tran") or "").lower() != "usb":
+        return f"serial:{serial}:{dev.get('size')}"
+    return f"name:{dev['name']}"
+
+
+def group_physical_disks(devices):
+    # Her cihazda name, wwn, serial, tran ve (varsa) multipath anahtarları bekleniyor.
+    # Dönen listede her fiziksel disk bir kez yer alır; "path" yazılacak tercih edilen yoldur.
+    groups = {}
+    for dev in devices:
+        key = physical_key(dev)
+        group = groups.get(key)
+        if group is None:
+            group = dict(dev)
+            group["paths"] = []
+            group["multipath"] = None
+            groups[key] = group
+        group["paths"].append(f"/dev/{dev['name']}")
+        if dev.get("multipath"):
+            group["multipath"] = dev["multipath"]
+
+    result = []
+    for group in groups.values():
+        # multipath aygıtı varsa oradan yazıyoruz; yoksa ilk yol
+        group["path"] = group["multipath"] or sorted(group["paths"])[0]
+        result.append(group)
+    return result
+
+
+# --- Bağlantı topolojisi ---
+# Aynı USB hub'ına, SATA port çoğaltıcısına ya da HBA'ya bağlı diskler o bağlantının
+# bant genişliğini paylaşıyor. Zamanlayıcı bu grupları kullanarak eşzamanlı işleri sınırlıyor.
+
+PCI_RE = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-7]$")
+USB_PORT_RE = re.compile(r"^(\d+)-([\d.]+)$")
+USB_ROOT_RE = re.compile(r"^usb(\d+)$")
+
+
+def usb_speed_mbps(port):
+    # /sys/bus/usb/devices/<port>/speed: 12, 480, 5000, 10000 (Mbit/s)
+    value = read_sysfs(f"/sys/bus/usb/devices/{port}/speed")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def usb_version(port):
+    # /sys/bus/usb/devices/<port>/version: cihazın desteklediği USB sürümü (" 3.20" gibi)
+    value = read_sysfs(f"/sys/bus/usb/devices/{port}/version")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def device_topology(device_path):
+    name = block_name(device_path)
+    real = os.path.realpath(os.path.join(SYS_BLOCK, name))
+    parts = real.split("/")
+    controller = None
+    usb_ports = []
+    usb_root = None
+    ata_port = None
+    scsi_host = None
+    for part in parts:
+        if PCI_RE.match(part):
+            controller = part
+        elif USB_ROOT_RE.match(part):
+            usb_root = part
+        elif USB_PORT_RE.match(part):
+            usb_ports.append(part)
+        elif re.match(r"^ata\d+$", part):
+            ata_port = part
+        elif re.match(r"^host\d+$", part):
+            scsi_host = part
+
+    topology = {"bus": "other", "tran": "", "controller": controller, "group": None,
+                "link_mbps": None, "device_mbps": None}
+    if not real.startswith("/sys/devices/"):
+        topology["group"] = f"other:{device_path}"
+    elif usb_ports:
+        # Cihazın kendi portunun bir üstü, paylaşılan hub'dır (2-1.3 -> 2-1, 2-1 -> usb2)
+        device_port = usb_ports[-1]
+        upstream = usb_ports[-2] if len(usb_ports) > 1 else usb_root
+        topology.update(bus="usb", tran="usb", group=f"usb:{controller}:{upstream}",
+                        usb_port=device_port,
+                        link_mbps=usb_speed_mbps(upstream) if upstream else None,
+                        device_mbps=usb_speed_mbps(device_port))
+    elif ata_port:
+        # Port çoğaltıcı varsa birden fazla disk aynı ataN altında görünür
+        topology.update(bus="ata", tran="sata", group=f"ata:{controller}:{ata_port}")
+    elif "nvme" in parts:
+        topology.update(bus="nvme", tran="nvme", group=f"nvme:{controller}:{name}")
+    elif scsi_host:
+        tran = "sas" if any(p.startswith("end_device-") for p in parts) else \
+            "iscsi" if any(p.startswith("session") for p in parts) else "scsi"
+        topology.update(bus="scsi", tran=tran, group=f"scsi:{controller}:{scsi_host}")
+    elif "virtual" in parts:
+        topology.update(bus="virtual", group=f"virtual:{name}")
+    else:
+        topology["group"] = f"pci:{controller}"
+    return topology
+
+
+def smart_report(device_path, timeout=120):
+    # smartctl -a --json çıktısı; smartctl kurulu değilse FileNotFoundError
+    result = subprocess.run(["smartctl", "-a", "--json", device_path],
+                            capture_output=True, text=True, timeout=timeout)
+    try:
+        data = json.loads(result.stdout) if result.stdout else {}
+    except ValueError:
+        data = {}
+    return {"returncode": result.returncode, "data": data, "stderr": result.stderr}
@@ -0,0 +1,892 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# LLF Tool yazma motoru.
+# Qt'ye hiç bağımlı değil; FormatWorker bunu kendi thread'i içinde çalıştırıyor.
+# ddrescue yerine diske doğrudan kendimiz yazıyoruz ki her blok arasında
+# durdurma / duraklatma isteğine bakabilelim.
+
+import os
+import stat
+import time
+import errno
+import fcntl
+import ctypes
+import threading
+
+from llf_devices import (
+    DeviceBusyError, block_name, describe_problems, dev_number, device_identity, device_topology,
+    fd_size, find_device_by_identity, flush_device, io_geometry, open_exclusive, plan_block_size,
+    preflight, strong_identity, transport,
+)
+from llf_buffers import default_pool
+from llf_kmsg import KmsgMonitor, SECTOR_SIZE
+from llf_throttle import TokenBucket, process_cgroup, set_io_priority
+from llf_tuning import QueueTuner, usb_link_warning
+
+BLOCK_SIZE = 4 * 1024 * 1024          # Tek seferde yazılan blok (4 MiB)
+QUICK_WIPE_SIZE = 10 * 1024 * 1024    # Quick wipe: ilk 10MB (MBR, GPT, bölüm tabloları)
+PROGRESS_INTERVAL = 0.5               # Arayüze en fazla saniyede iki kez veri gönderelim
+CHECKPOINT_BYTES = 256 * 1024 * 1024  # Bu kadar yazınca fdatasync ile kalıcı offset'i ilerletiyoruz
+REATTACH_TIMEOUT = 300                # Kopan cihazın geri gelmesini en fazla 5 dk bekleyelim
+MAX_REATTACH = 10
+LOST_GRACE = 5                        # EIO sonrası düğümün kaybolmasını bu kadar saniye bekle
+STALL_WARN_AFTER = 30                 # Bu kadar saniye dönmeyen yazma "stalled" sayılır
+STALL_ABORT_AFTER = 300               # Bu süreyi aşınca işi iptal etmeyi deniyoruz (0 = asla)
+WRITEBACK_WINDOW = 32 * 1024 * 1024   # Önbellekli modda cihaz başına en fazla ~2 pencere kirli veri
+
+# sync_file_range(2) bayrakları
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _sync_file_range = _libc.sync_file_range
+    _sync_file_range.argtypes = (ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint)
+    _sync_file_range.restype = ctypes.c_int
+except (OSError, AttributeError):
+    _sync_file_range = None
+
+# Silme desenleri. Varsayılan sıfır; bayt dizisi de verilebilir (uzunluğu 512'yi bölmeli),
+# "random" her blok için yeni rastgele veri demek (doğrulanamaz).
+PATTERNS = {"zero": b"\0", "ones": b"\xff"}
+
+# Cihaz kopunca / resetlenince gelen hatalar
+DEVICE_LOST_ERRNOS = (errno.EIO, errno.ENODEV, errno.ENXIO, errno.ENOENT, errno.ESHUTDOWN)
+
+
+class WipeCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    # Motor ile arayüz arasındaki kontrol nesnesi. stop() kalıcıdır,
+    # pause()/resume() istendiği kadar çağrılabilir.
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._run_event = threading.Event()
+        self._run_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        # Duraklatılmış bir işi de uyandıralım ki hemen çıkabilsin
+        self._run_event.set()
+
+    def pause(self):
+        if not self._stop_event.is_set():
+            self._run_event.clear()
+
+    def resume(self):
+        self._run_event.set()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    @property
+    def paused(self):
+        return not self._run_event.is_set()
+
+    def check(self):
+        if self._stop_event.is_set():
+            raise WipeCancelled("Process stopped by user.")
+
+    def wait_resumed(self, timeout=None):
+        return self._run_event.wait(timeout)
+
+
+class IOWatchdog:
+    # Ölmekte olan bir disk yazmayı dakikalarca çekirdekte bekletebiliyor.
+    # Motorun kendi thread'i o sırada kilitli olduğundan takibi ayrı bir thread yapıyor.
+
+    def __init__(self, engine, warn_after=STALL_WARN_AFTER, abort_after=STALL_ABORT_AFTER,
+                 interval=1.0):
+        self.engine = engine
+        self.warn_after = warn_after
+        self.abort_after = abort_after
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="llf-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Takılı bir işi asla join ile beklemiyoruz
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            age = self.engine.io_age()
+            if age is None or age < self.warn_after:
+                continue
+            if not self.engine.stalled:
+                self.engine.mark_stalled(age)
+            else:
+                # Arayüz donmuş gibi görünmesin diye beklerken de ilerleme gönderiyoruz
+                self.engine.stall_heartbeat(age)
+            if self.abort_after and age >= self.abort_after and not self.engine.token.stopped:
+                self.engine.log(f"I/O has been stuck for {age:.0f} s, cancelling the job.")
+                self.engine.hung = True
+                self.engine.token.stop()
+                # Motor thread'i çekirdekte takılı kalabilir ve run() hiç dönmeyebilir.
+                # Son durumu buradan bildiriyoruz: geri çağırma verilmemiş olsa da ilerleme
+                # dinleyen herkes işin bittiğini (failed) görsün.
+                self.engine.state = "failed"
+                self.engine._emit_progress(force=True)
+                if self.engine.hung_callback:
+                    self.engine.hung_callback(self.engine.offset)
+                return
+
+
+def pattern_unit(pattern):
+    # None = "zero"; "random" için None döner
+    if pattern is None:
+        return PATTERNS["zero"]
+    if isinstance(pattern, str):
+        if pattern == "random":
+            return None
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern: {pattern}")
+        return PATTERNS[pattern]
+    unit = bytes(pattern)
+    if not unit or 512 % len(unit):
+        raise ValueError("Pattern length must divide 512 bytes (1, 2, 4, ... 512).")
+    return unit
+
+
+def describe_pattern(pattern):
+    unit = pattern_unit(pattern)
+    if unit is None:
+        return "random data"
+    if unit == PATTERNS["zero"]:
+        return "zeros"
+    return f"pattern 0x{unit.hex()}"
+
+
+def human_size(num_bytes):
+    # ddrescue çıktısına benzesin diye 1000'lik birimler kullanıyoruz
+    value = float(num_bytes)
+    for unit in ("B", "kB", "MB", "GB", "TB"):
+        if abs(value) < 1000 or unit == "TB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.2f} {unit}"
+        value /= 1000.0
+
+
+class WipeEngine:
+    # Alt sınıflar (VerifyEngine) cihazı okumak için açıyor
+    open_flags = os.O_WRONLY
+    action = "writing"
+
+    def __init__(self, device_path, quick_wipe=False, token=None,
+                 progress_callback=None, log_callback=None,
+                 block_size=BLOCK_SIZE, start_offset=0,
+                 reattach_timeout=REATTACH_TIMEOUT,
+                 stall_warn=STALL_WARN_AFTER, stall_abort=STALL_ABORT_AFTER,
+                 hung_callback=None, buffer_pool=None, direct=True,
+                 writeback_window=WRITEBACK_WINDOW, tune_queue=False,
+                 rate_limit=None, shared_limits=(), io_class=None, cgroup=False,
+                 pattern=None):
+        self.device_path = device_path
+        self.quick_wipe = quick_wipe
+        self.token = token or CancelToken()
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.block_size = block_size
+        # run() içinde cihazın kuyruk limitlerine göre dolduruluyor
+        self.geometry = None
+        self.align_unit = 512
+        self.offset = start_offset
+        self.start_offset = start_offset
+        # İlk (kısaltılmış) yazmadan sonraki tam blokların başladığı yer; _plan_io hesaplıyor
+        self._block_base = None
+        # fdatasync ile diske indiğinden emin olduğumuz son offset
+        self.durable_offset = start_offset
+        self.reattach_timeout = reattach_timeout
+        self.reattach_count = 0
+        self.identity = frozenset()
+        self._rdev = None
+        self._usb = False
+        # WWN'siz USB bellek için: takılı olduğu port ve diskin tam boyutu
+        self._usb_port = None
+        self._disk_size = None
+        self.stall_warn = stall_warn
+        self.stall_abort = stall_abort
+        self.stalled = False
+        self.hung = False
+        self.hung_callback = hung_callback
+        self._io_started = None
+        self._inflight = None
+        self._emit_lock = threading.Lock()
+        # Çekirdek mesajlarından çıkan hatalı bölgeler: {start, end, kind, message}
+        self.bad_blocks = []
+        self.kernel_counts = {"medium": 0, "link": 0, "io": 0}
+        self._kmsg = None
+        self.total = 0
+        self.state = "idle"
+        self._fd = None
+        self.buffer_pool = buffer_pool or default_pool()
+        # direct=False ya da O_DIRECT desteklenmezse önbellekli moddayız
+        self.direct = direct
+        self.writeback_window = writeback_window
+        self.flush_time = None
+        # İş süresince blok kuyruğu ayarları (isteğe bağlı, bitince geri yükleniyor)
+        self.tune_queue = tune_queue
+        self._tuner = None
+        # Hız sınırı: kendi kovamız + (toplu modda) tüm işlerin paylaştığı kova
+        self.limit = TokenBucket(rate_limit)
+        self.shared_limits = list(shared_limits)
+        self.io_class = io_class
+        self.use_cgroup = cgroup
+        self._cgroup = None
+        self.tid = None
+        # Yazılan veri: sıfır, sabit desen ya da her blokta yeni rastgele veri
+        self.pattern = pattern
+        self.pattern_unit = pattern_unit(pattern)
+        # Önbellek pencereleri bu çalıştırmanın (ya da yeniden bağlanmanın) başladığı yerden sayılıyor
+        self._wb_base = start_offset
+        self._wb_offset = start_offset
+        self._buffer = None
+        self._view = None
+        self._start_time = 0.0
+        self._start_offset = start_offset
+        self._paused_time = 0.0
+        self._last_emit = 0.0
+        self._last_rate_time = 0.0
+        self._last_rate_offset = start_offset
+        self.current_rate = 0.0
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def _open(self, path=None):
+        path = path or self.device_path
+        flags = self.open_flags
+        try:
+            if self.direct and hasattr(os, "O_DIRECT"):
+                # Önbelleği atlayalım; bazı dosya sistemleri (tmpfs vb.) desteklemez
+                try:
+                    return open_exclusive(path, flags | os.O_DIRECT)
+                except OSError as e:
+                    if e.errno == errno.EBUSY:
+                        raise
+                self.log("O_DIRECT is not supported here, using buffered writes.")
+            self.direct = False
+            return open_exclusive(path, flags)
+        except OSError as e:
+            if e.errno == errno.EBUSY:
+                raise DeviceBusyError(f"{path} is in use (mounted, swap, RAID/LVM/dm-crypt member "
+                                      "or opened exclusively by another program).")
+            raise
+
+    def _preflight(self):
+        try:
+            if not stat.S_ISBLK(os.stat(self.device_path).st_mode):
+                return
+        except OSError:
+            return
+        problems = preflight(self.device_path)
+        if problems:
+            raise DeviceBusyError(f"{self.device_path} is in use:\n{describe_problems(problems)}")
+
+    def _device_size(self, fd):
+        # Blok cihazda BLKGETSIZE64, dosyada lseek
+        return fd_size(fd)
+
+    def _plan_io(self):
+        # Sektör boyu, fiziksel blok ve optimal I/O'ya göre blok boyunu ve hizalamayı belirliyoruz.
+        # 4Kn / 512e disklerde ve RAID LUN'larında hizasız yazma ciddi hız kaybettiriyor.
+        self.geometry = io_geometry(self._fd, self.device_path)
+        self.align_unit, self.block_size = plan_block_size(self.geometry, self.block_size)
+        if self.total % self.geometry["logical"]:
+            # Blok cihazda olmaz; dosyada son parça O_DIRECT ile yazılamaz
+            self.log(f"Size of {self.device_path} is not a multiple of "
+                     f"{self.geometry['logical']} bytes; the tail will be written without O_DIRECT.")
+        self.log(f"{'Direct' if self.direct else 'Buffered'} I/O, geometry: logical {self.geometry['logical']} B, physical "
+                 f"{self.geometry['physical']} B, optimal {self.geometry['optimal_io']} B, "
+                 f"alignment offset {self.geometry['alignment_offset']} B; "
+                 f"{self.action} in {human_size(self.block_size)} blocks.")
+        misalign = (self.start_offset - self.geometry["alignment_offset"]) % self.align_unit
+        self._block_base = self.start_offset + (self.align_unit - misalign if misalign else 0)
+
+    def _next_length(self):
+        # Normalde tam blok. Başlangıç hizasızsa (alignment_offset ya da yarıda kalmış iş)
+        # ilk yazmayı kısaltıp sonrakileri hizaya oturtuyoruz. Son parça cihazın kalanı kadar.
+        length = min(self.block_size, self.total - self.offset)
+        misalign = (self.offset - self.geometry["alignment_offset"]) % self.align_unit
+        if misalign:
+            length = min(length, self.align_unit - misalign)
+        if length % self.geometry["logical"]:
+            self._drop_direct()
+        return length
+
+    def _drop_direct(self):
+        flags = fcntl.fcntl(self._fd, fcntl.F_GETFL)
+        if flags & getattr(os, "O_DIRECT", 0):
+            fcntl.fcntl(self._fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+            self.direct = False
+
+    def _writeback(self, final=False):
+        # Önbellekli modda kirli sayfaları sınırlıyoruz: imlecin arkasındaki pencerenin
+        # yazımını başlatıyor, bir önceki pencereyi bekleyip önbellekten atıyoruz.
+        # Böylece kaç disk silinirse silinsin RAM kullanımı sabit kalıyor.
+        if self.direct:
+            return
+        window = self.writeback_window
+        while self.offset - self._wb_offset >= window:
+            start = self._wb_offset
+            if _sync_file_range is not None:
+                self._sync_range(start, window, SYNC_FILE_RANGE_WRITE)
+                # Başlangıçtan öncesi önceki çalıştırmada (ya da eski fd'de) yazıldı, bizim penceremiz değil
+                if start - window >= self._wb_base:
+                    previous = start - window
+                    self._sync_range(previous, window, SYNC_FILE_RANGE_WAIT_BEFORE |
+                                     SYNC_FILE_RANGE_WRITE | SYNC_FILE_RANGE_WAIT_AFTER)
+                    self._drop_cache(previous, window)
+            else:
+                self._io(os.fdatasync, self._fd)
+                self._drop_cache(self._wb_base, start + window - self._wb_base)
+            self._wb_offset += window
+        if final:
+            # Son fdatasync'ten sonra çağrılıyor; kalan her şey artık temiz
+            self._drop_cache(0, 0)
+
+    def _reset_writeback(self):
+        self._wb_base = self.offset
+        self._wb_offset = self.offset
+
+    def _sync_range(self, offset, length, flags):
+        if self._io(_sync_file_range, self._fd, offset, length, flags) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def _drop_cache(self, offset, length):
+        try:
+            os.posix_fadvise(self._fd, offset, length, os.POSIX_FADV_DONTNEED)
+        except (OSError, AttributeError):
+            pass
+
+    def _elapsed(self):
+        return max(time.monotonic() - self._start_time - self._paused_time, 1e-6)
+
+    def io_age(self):
+        started = self._io_started
+        return None if started is None else time.monotonic() - started
+
+    def _io(self, func, *args):
+        # Her I/O çağrısının başlangıç zamanını watchdog görsün diye saklıyoruz
+        self._io_started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            age = time.monotonic() - self._io_started
+            self._io_started = None
+            if self.stalled:
+                self.stalled = False
+                self.log(f"I/O completed after {age:.1f} s, continuing.")
+                if self.state == "stalled":
+                    self.state = "running"
+
+    def mark_stalled(self, age):
+        self.stalled = True
+        if self.state == "running":
+            self.state = "stalled"
+        self.log(f"I/O at offset {self.offset} has not completed for {age:.0f} s. "
+                 "The device may be failing.")
+        self._emit_progress(force=True)
+
+    def stall_heartbeat(self, age):
+        self._emit_progress()
+
+    def _block_range(self, byte_offset):
+        # Sektörü içeren yazma bloğu. Sınırlar _next_length ile aynı: başlangıçtan hizaya kadar
+        # kısa bir ilk yazma, sonra _block_base + n * block_size. Plan yoksa ya da sektör bu
+        # çalışmanın dışındaysa sadece sektörün kendisini bildiriyoruz.
+        base = self._block_base
+        if base is None or byte_offset < self.start_offset:
+            return byte_offset, byte_offset + SECTOR_SIZE
+        if byte_offset < base:
+            start, end = self.start_offset, base
+        else:
+            start = base + (byte_offset - base) // self.block_size * self.block_size
+            end = start + self.block_size
+        return start, min(end, self.total) if self.total else end
+
+    def record_kernel_event(self, event):
+        # kmsg thread'inden çağrılır. Sektörü, o an yazdığımız blok aralığına eşliyoruz.
+        kind = event["kind"]
+        self.kernel_counts[kind] = self.kernel_counts.get(kind, 0) + 1
+        start = end = None
+        if event.get("sector") is not None:
+            start, end = self._block_range(event["sector"] * SECTOR_SIZE)
+        elif kind != "link" and self._inflight is not None:
+            start, end = self._inflight[0], self._inflight[0] + self._inflight[1]
+
+        if start is not None:
+            if not any(b["start"] == start and b["kind"] == kind for b in self.bad_blocks):
+                self.bad_blocks.append({"start": start, "end": end, "kind": kind,
+                                        "message": event["message"]})
+            self.log(f"Kernel ({kind}): bytes {start}-{end}: {event['message']}")
+        else:
+            self.log(f"Kernel ({kind}): {event['message']}")
+        self._emit_progress(force=True)
+
+    def error_summary(self):
+        medium = self.kernel_counts["medium"]
+        link = self.kernel_counts["link"]
+        other = self.kernel_counts["io"]
+        if not (medium or link or other):
+            return ""
+        parts = [f"Kernel reported {medium} medium error(s), {link} link/reset event(s) "
+                 f"and {other} other I/O error(s) in {len(self.bad_blocks)} range(s)."]
+        if medium and medium >= link:
+            parts.append("This points to a failing medium.")
+        elif link:
+            parts.append("This points to a cable, bridge or port problem rather than the medium.")
+        return " ".join(parts)
+
+    def _start_kmsg(self):
+        try:
+            if not stat.S_ISBLK(os.stat(self.device_path).st_mode):
+                return
+        except OSError:
+            return
+        self._kmsg = KmsgMonitor(block_name(self.device_path), self.record_kernel_event)
+        if not self._kmsg.start():
+            self._kmsg = None
+
+    def _emit_progress(self, force=False):
+        with self._emit_lock:
+            self._emit_progress_locked(force)
+
+    def _emit_progress_locked(self, force):
+        now = time.monotonic()
+        if not force and now - self._last_emit < PROGRESS_INTERVAL:
+            return
+        span = now - self._last_rate_time
+        if span > 0:
+            self.current_rate = (self.offset - self._last_rate_offset) / span
+        self._last_rate_time = now
+        self._last_rate_offset = self.offset
+        self._last_emit = now
+
+        written = self.offset - self._start_offset
+        avg_rate = written / self._elapsed()
+        remaining = max(self.total - self.offset, 0)
+        stats = {
+            "state": self.state,
+            "offset": self.offset,
+            "total": self.total,
+            "bytes": written,
+            "rate": self.current_rate,
+            "avg_rate": avg_rate,
+            "eta": remaining / avg_rate if avg_rate > 0 else None,
+            "pct": (self.offset * 100.0 / self.total) if self.total else 0.0,
+            "stalled": self.stalled,
+            "io_age": self.io_age(),
+            "medium_errors": self.kernel_counts["medium"],
+            "link_errors": self.kernel_counts["link"],
+            "rate_limit": self.limit.rate,
+            "io_class": self.io_class,
+        }
+        if self.progress_callback:
+            self.progress_callback(stats)
+
+    def _checkpoint(self):
+        self._io(os.fdatasync, self._fd)
+        self.durable_offset = self.offset
+
+    def _finalize(self):
+        # Bitişte sadece bu cihazı flush ediyoruz ve ne kadar sürdüğünü raporluyoruz
+        self.log(f"Finalizing: flushing {self.device_path}...")
+        self._emit_progress(force=True)
+        started = time.monotonic()
+        self._io(flush_device, self._fd)
+        self.flush_time = time.monotonic() - started
+        self.durable_offset = self.offset
+        self._writeback(final=True)
+        self.log(f"Flush completed in {self.flush_time:.1f} s.")
+
+    def _throttle(self, length):
+        # Bekleme I/O sayılmıyor, watchdog'u tetiklemesin diye _io dışında
+        for bucket in [self.limit] + self.shared_limits:
+            bucket.consume(length, cancel=self.token.check)
+
+    def set_rate_limit(self, rate):
+        # Arayüzden çalışırken çağrılabilir; bayt/s, None = sınırsız
+        self.limit.set_rate(rate)
+        if self._cgroup is not None:
+            self._cgroup.set_limit(dev_number(block_name(self.device_path)), rate)
+        self.log(f"Rate limit: {human_size(rate) + '/s' if rate else 'unlimited'}.")
+
+    def set_io_class(self, io_class):
+        # "idle", "best-effort" (düşük), "realtime" ya da None (varsayılana dön)
+        self.io_class = io_class
+        if self.tid is None:
+            return True
+        ok = set_io_priority(io_class, self.tid)
+        if not ok:
+            self.log(f"Could not set I/O priority class {io_class}.")
+        return ok
+
+    def _apply_priority(self):
+        self.tid = threading.get_native_id()
+        if self.io_class:
+            self.set_io_class(self.io_class)
+        if self.use_cgroup and stat.S_ISBLK(os.fstat(self._fd).st_mode):
+            cgroup = process_cgroup()
+            if cgroup.enter():
+                self._cgroup = cgroup
+                if self.limit.rate:
+                    cgroup.set_limit(dev_number(block_name(self.device_path)), self.limit.rate)
+            else:
+                self.log("cgroup v2 io controller is not available, using the internal limiter only.")
+
+    def _release_cgroup(self):
+        if self._cgroup is not None:
+            self._cgroup.set_limit(dev_number(block_name(self.device_path)), None)
+            self._cgroup = None
+
+    def _apply_tuning(self):
+        if not self.tune_queue:
+            return
+        self._tuner = QueueTuner(self.device_path, log=self.log)
+        self._tuner.apply()
+
+    def _restore_tuning(self):
+        if self._tuner is not None:
+            self._tuner.restore()
+            self._tuner = None
+
+    def _hold_while_paused(self):
+        # Duraklatma: bekleyen yazmaları diske indirip offset'i koruyoruz
+        if not self.token.paused:
+            return
+        self._checkpoint()
+        self.state = "paused"
+        self.log(f"Paused at offset {self.offset} ({human_size(self.offset)}).")
+        self._emit_progress(force=True)
+        pause_start = time.monotonic()
+        while self.token.paused and not self.token.stopped:
+            self.token.wait_resumed(0.5)
+        self._paused_time += time.monotonic() - pause_start
+        self._last_rate_time = time.monotonic()
+        self._last_rate_offset = self.offset
+        self.token.check()
+        self.state = "running"
+        self.log(f"Resumed at offset {self.offset}.")
+        self._emit_progress(force=True)
+
+    def _device_lost(self):
+        # Sıradan bir medya hatasında (EIO) cihaz yerinde duruyor; onu kapatıp açmak 256 MiB
+        # geri sarıp tekrar yazmak demek. Sadece düğüm kaybolduysa ya da başka bir cihaza
+        # ait olduysa (st_rdev değişti) kopmuş sayıyoruz. USB reseti düğümü biraz geç siliyor.
+        if self._rdev is None:
+            return False
+        deadline = time.monotonic() + LOST_GRACE
+        while True:
+            try:
+                if os.stat(self.device_path).st_rdev != self._rdev:
+                    return True
+            except OSError:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+
+    def _try_reattach(self, error):
+        # USB köprüsü resetlendiğinde cihaz kaybolup başka bir isimle geri gelebiliyor.
+        # Aynı WWN'e (yoksa birebir aynı kimliğe) sahip cihazı bekleyip son kalıcı offset'ten devam ediyoruz.
+        if getattr(error, "errno", None) not in DEVICE_LOST_ERRNOS:
+            return False
+        if not self.identity or self.reattach_count >= MAX_REATTACH:
+            return False
+        # Seri nosu sahte olabilen bellek: sadece aynı USB portuna aynı kimlik ve
+        # birebir aynı boyutla geri gelirse aynı disk sayıyoruz
+        usb_port = None
+        if self._usb and not strong_identity(self.identity):
+            usb_port = self._usb_port
+            if not usb_port or not self._disk_size:
+                if self._device_lost():
+                    self.log(f"{self.device_path} disappeared. Reattach unavailable: no WWN "
+                             "and the USB port is unknown.")
+                return False
+        if not self._device_lost():
+            return False
+        self.reattach_count += 1
+        old_path = self.device_path
+        self.log(f"I/O error on {old_path} at offset {self.offset}: {error}. "
+                 "Waiting for the device to reappear...")
+        if usb_port:
+            self.log(f"The device has no WWN; only the same device on USB port {usb_port} "
+                     "with the exact same size will be accepted.")
+        self.state = "reconnecting"
+        self._emit_progress(force=True)
+        self._close_fd()
+
+        rejected = set()
+        deadline = time.monotonic() + self.reattach_timeout
+        while time.monotonic() < deadline:
+            self.token.check()
+            path = find_device_by_identity(self.identity, self._usb, usb_port)
+            problems = preflight(path) if path else None
+            if problems:
+                if path not in rejected:
+                    rejected.add(path)
+                    self.log(f"{path} has the same identity but is in use, ignoring it:\n"
+                             f"{describe_problems(problems)}")
+                path = None
+            if path:
+                try:
+                    fd = self._open(path)
+                except OSError:
+                    fd = None
+                if fd is not None:
+                    size = self._device_size(fd)
+                    if size == self._disk_size if usb_port else size >= self.total:
+                        self._fd = fd
+                        self.device_path = path
+                        break
+                    os.close(fd)
+                    self.log(f"{path} has the same identity but a different size, ignoring it.")
+            time.sleep(1)
+        else:
+            return False
+
+        self._rdev = os.fstat(self._fd).st_rdev
+        if self._kmsg is not None:
+            self._kmsg.set_device(block_name(self.device_path))
+        # Yeni isimle gelen cihazın kuyruğu varsayılan ayarlarda; eskisinin kaydını bırakıp tekrar ayarla
+        if self._tuner is not None:
+            self._restore_tuning()
+            self._apply_tuning()
+        self.log(f"Device is back as {self.device_path}, resuming from offset {self.durable_offset}.")
+        self.offset = self.durable_offset
+        self._reset_writeback()
+        self._last_rate_offset = self.offset
+        self.state = "running"
+        self._emit_progress(force=True)
+        return True
+
+    def run(self):
+        # Mount/swap/RAID/LVM kontrolü, ardından O_EXCL ile cihazı sahipleniyoruz
+        self._preflight()
+        self.identity = device_identity(self.device_path)
+        self._fd = self._open()
+        # Bundan sonra ne patlarsa patlasın fd kapanmalı, watchdog durmalı: hepsi try içinde
+        watchdog = IOWatchdog(self, self.stall_warn, self.stall_abort)
+        try:
+            info = os.fstat(self._fd)
+            if stat.S_ISBLK(info.st_mode):
+                self._rdev = info.st_rdev
+                self._usb = transport(self.device_path) == "usb"
+                if self._usb:
+                    self._usb_port = device_topology(self.device_path).get("usb_port")
+                    self._disk_size = self._device_size(self._fd)
+            watchdog.start()
+            self._start_kmsg()
+            warning = usb_link_warning(self.device_path)
+            if warning:
+                self.log(f"Warning: {warning}")
+            self._apply_tuning()
+            self._apply_priority()
+            self.total = self._device_size(self._fd)
+            if self.quick_wipe:
+                self.total = min(self.total, QUICK_WIPE_SIZE)
+            self._plan_io()
+            # Havuzdan gelen tampon sayfa hizalı ve sıfırlarla dolu (O_DIRECT için şart)
+            self._buffer = self.buffer_pool.acquire(self.block_size, cancel=self.token.check)
+            self._view = memoryview(self._buffer)
+            self._fill_buffer()
+            self._reset_writeback()
+
+            self._start_time = time.monotonic()
+            self._last_rate_time = self._start_time
+            self.state = "running"
+            self.log(f"Writing {describe_pattern(self.pattern)} to {self.device_path} "
+                     f"({human_size(self.total)}).")
+
+            while self.offset < self.total:
+                # Her yazma öncesi durdurma/duraklatma kontrolü
+                self.token.check()
+                self._hold_while_paused()
+
+                length = self._next_length()
+                self._throttle(length)
+                if self.pattern_unit is None:
+                    self._view[:length] = os.urandom(length)
+                self._inflight = (self.offset, length)
+                try:
+                    written = self._io(os.pwrite, self._fd, self._view[:length], self.offset)
+                    if written <= 0:
+                        raise OSError(f"Short write at offset {self.offset}")
+                    self.offset += written
+                    self._writeback()
+                    if self.offset - self.durable_offset >= CHECKPOINT_BYTES:
+                        self._checkpoint()
+                except OSError as e:
+                    if not self._try_reattach(e):
+                        raise
+                    continue
+                self._emit_progress()
+
+            self.token.check()
+            self.state = "finishing"
+            self._finalize()
+            self.state = "done"
+            self._emit_progress(force=True)
+            return self.offset
+        except WipeCancelled:
+            if self.hung:
+                self.state = "failed"
+                raise WipeCancelled(f"Device stopped responding at offset {self.offset}.")
+            self.state = "stopped"
+            self._emit_progress(force=True)
+            raise
+        except Exception:
+            self.state = "failed"
+            raise
+        finally:
+            watchdog.stop()
+            if self._kmsg is not None:
+                self._kmsg.stop()
+            self._inflight = None
+            self._restore_tuning()
+            self._release_cgroup()
+            self._close()
+
+    def _fill_buffer(self):
+        # Havuzdan gelen tampon zaten sıfır; rastgele veri her blokta ayrıca dolduruluyor
+        unit = self.pattern_unit
+        if unit is None or unit == PATTERNS["zero"]:
+            return
+        self._buffer[:] = unit * (len(self._buffer) // len(unit))
+
+    def _buffer_dirty(self):
+        # Okuma ya da desen yazma için kullanılan tampon havuza geri sıfırlanıp verilmeli
+        return self.open_flags != os.O_WRONLY or self.pattern_unit != PATTERNS["zero"]
+
+    def _close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._buffer is not None:
+            self.buffer_pool.release(self._buffer, dirty=self._buffer_dirty())
+            self._buffer = None
+        self._close_fd()
+
+    def _close_fd(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+MAX_MISMATCHES = 100
+
+
+class VerifyEngine(WipeEngine):
+    # Silinen cihazı geri okuyup yazılan desenden (varsayılan sıfır) farklı blok kalıp kalmadığına bakıyor.
+    # Açma, hizalama, tampon havuzu, watchdog, duraklatma ve hız sınırı WipeEngine'den geliyor.
+    open_flags = os.O_RDONLY
+    action = "reading"
+
+    def __init__(self, device_path, **kwargs):
+        super().__init__(device_path, **kwargs)
+        if self.pattern_unit is None:
+            raise ValueError("Random data cannot be verified.")
+        # Desenden farklı bölgeler: (offset, uzunluk); ilk MAX_MISMATCHES tanesi
+        self.mismatches = []
+        self.mismatch_count = 0
+
+    def _record_mismatch(self, offset, chunk, expected):
+        # İki bloğu büyük tamsayı olarak XOR'layıp ilk ve son farklı baytı buluyoruz
+        self.mismatch_count += 1
+        diff = int.from_bytes(chunk, "big") ^ int.from_bytes(expected, "big")
+        size = len(chunk)
+        start = offset + size - (diff.bit_length() + 7) // 8
+        end = offset + size - ((diff & -diff).bit_length() - 1) // 8
+        # Art arda gelen bloklar tek bölge olarak raporlansın
+        if self.mismatches and sum(self.mismatches[-1]) == start:
+            self.mismatches[-1] = (self.mismatches[-1][0], end - self.mismatches[-1][0])
+        elif len(self.mismatches) < MAX_MISMATCHES:
+            self.mismatches.append((start, end - start))
+        if self.mismatch_count == 1:
+            self.log(f"Unexpected data found at offset {start}.")
+
+    def _checkpoint(self):
+        # Okumada diske indirilecek bir şey yok (duraklatma bunu çağırıyor)
+        self.durable_offset = self.offset
+
+    def run(self):
+        self._preflight()
+        self._fd = self._open()
+        watchdog = IOWatchdog(self, self.stall_warn, self.stall_abort)
+        try:
+            watchdog.start()
+            # Okuma hataları da çekirdek günlüğünde (medium error, link reset) görünüyor
+            self._start_kmsg()
+            self._apply_priority()
+            self.total = self._device_size(self._fd)
+            if self.quick_wipe:
+                self.total = min(self.total, QUICK_WIPE_SIZE)
+            self._plan_io()
+            self._buffer = self.buffer_pool.acquire(self.block_size, cancel=self.token.check)
+            self._view = memoryview(self._buffer)
+            expected = memoryview(self.pattern_unit * (self.block_size // len(self.pattern_unit)))
+
+            self._start_time = time.monotonic()
+            self._last_rate_time = self._start_time
+            self.state = "running"
+            self.log(f"Verifying {self.device_path} ({human_size(self.total)}).")
+
+            while self.offset < self.total:
+                self.token.check()
+                self._hold_while_paused()
+
+                length = self._next_length()
+                self._throttle(length)
+                self._inflight = (self.offset, length)
+                chunk = self._view[:length]
+                read = self._io(os.preadv, self._fd, [chunk], self.offset)
+                if read <= 0:
+                    raise OSError(f"Short read at offset {self.offset}")
+                if chunk[:read] != expected[:read]:
+                    self._record_mismatch(self.offset, chunk[:read], expected[:read])
+                if not self.direct:
+                    self._drop_cache(self.offset, read)
+                self.offset += read
+                self._emit_progress()
+
+            self.state = "done"
+            self._emit_progress(force=True)
+            if self.mismatch_count:
+                self.log(f"Verification failed: {self.mismatch_count} block(s) do not match "
+                         f"the expected {describe_pattern(self.pattern)}.")
+            else:
+                self.log(f"Verification passed: {human_size(self.total)} read back as "
+                         f"{describe_pattern(self.pattern)}.")
+            return self.offset
+        except WipeCancelled:
+            if self.hung:
+                self.state = "failed"
+                raise WipeCancelled(f"Device stopped responding at offset {self.offset}.")
+            self.state = "stopped"
+            self._emit_progress(force=True)
+            raise
+        except Exception:
+            self.state = "failed"
+            raise
+        finally:
+            watchdog.stop()
+            if self._kmsg is not None:
+                self._kmsg.stop()
+            self._inflight = None
+            self._release_cgroup()
+            self._close()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Ayrıcalıklı yardımcı süreç. Arayüz root olmadan çalışıyor; bu yardımcıyı oturum başında
+# bir kez pkexec ile başlatıyor ve silme, cihaz bilgisi ve SMART isteklerini yerel bir
+# unix soketi üzerinden gönderiyor. Her işlem için ayrı parola sorulmuyor.
+#
+# Protokol: satır başına bir JSON nesnesi.
+#   istek:  {"id": 1, "method": "wipe", "params": {"device": "/dev/sdb"}}
+#   olay:   {"id": 1, "event": "progress", "data": {...}}
+#   yanıt:  {"id": 1, "result": ...}  ya da  {"id": 1, "error": "..."}
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import struct
+import secrets
+import argparse
+import threading
+import subprocess
+
+from llf_devices import preflight, probe_device, probe_devices, smart_report
+from llf_api import wipe
+from llf_engine import CancelToken
+from llf_tuning import restore_stale
+
+ACCEPT_TIMEOUT = 120    # İstemci bu sürede bağlanmazsa yardımcı kapanır
+CONNECT_TIMEOUT = 300   # İstemci tarafı: parola diyaloğu dahil bekleme süresi
+PROTOCOL_VERSION = 1
+
+
+class HelperError(Exception):
+    pass
+
+
+class HelperAuthError(HelperError):
+    # Kullanıcı parola diyaloğunu kapattı ya da yetkisi yok
+    pass
+
+
+def _send(sock, lock, message):
+    data = (json.dumps(message) + "\n").encode("utf-8")
+    with lock:
+        sock.sendall(data)
+
+
+def _socket_address(name):
+    # "@isim" soyut (abstract) ad alanı: dosya sisteminde iz bırakmıyor
+    return "\0" + name[1:] if name.startswith("@") else name
+
+
+# --- Sunucu (root) ---
+
+class HelperServer:
+
+    def __init__(self, conn, allowed_uid):
+        self.conn = conn
+        self.allowed_uid = allowed_uid
+        self._send_lock = threading.Lock()
+        self._jobs = {}
+        self._threads = []
+        self._running = True
+
+    def send(self, message):
+        try:
+            _send(self.conn, self._send_lock, message)
+        except OSError:
+            self._running = False
+
+    def serve(self):
+        reader = self.conn.makefile("r", encoding="utf-8")
+        for line in reader:
+            if not self._running:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            method = request.get("method")
+            # Uzun süren istekler (silme, SMART) kendi thread'inde; diğerleri hemen yanıtlanır
+            if method == "wipe":
+                # Token'ı hemen kaydediyoruz ki arkadan gelen "stop" işi bulabilsin
+                self._jobs[request.get("id")] = CancelToken()
+            if method in ("wipe", "smart"):
+                thread = threading.Thread(target=self.handle, args=(request,), daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            else:
+                self.handle(request)
+            if method == "quit":
+                break
+        # İstemci gitti: çalışan işleri durdurup çıkıyoruz
+        for token in list(self._jobs.values()):
+            token.stop()
+        # Motorlar kuyruk ayarlarını geri yükleyip cihazı kapatabilsin
+        for thread in self._threads:
+            thread.join(10)
+
+    def handle(self, request):
+        request_id = request.get("id")
+        params = request.get("params") or {}
+        handler = getattr(self, f"do_{request.get('method')}", None)
+        try:
+            if handler is None:
+                raise HelperError(f"Unknown method: {request.get('method')}")
+            result = handler(request_id, **params)
+            self.send({"id": request_id, "result": result})
+        except Exception as e:
+            self.send({"id": request_id, "error": str(e), "type": type(e).__name__})
+
+    def _check_device(self, device):
+        # Sadece /dev altındaki blok cihazlar kabul ediliyor
+        if not isinstance(device, str) or not device.startswith("/dev/"):
+            raise HelperError(f"Invalid device: {device}")
+        try:
+            if not stat.S_ISBLK(os.stat(device).st_mode):
+                raise HelperError(f"{device} is not a block device.")
+        except OSError as e:
+            raise HelperError(f"{device}: {e.strerror}")
+        return device
+
+    def do_ping(self, request_id):
+        return {"version": PROTOCOL_VERSION, "pid": os.getpid(), "uid": os.geteuid()}
+
+    def do_quit(self, request_id):
+        self._running = False
+        return True
+
+    def do_list(self, request_id):
+        return probe_devices()
+
+    def do_probe(self, request_id, name):
+        return probe_device(os.path.basename(name))
+
+    def do_preflight(self, request_id, device):
+        return preflight(self._check_device(device))
+
+    def do_smart(self, request_id, device):
+        device = self._check_device(device)
+        try:
+            return smart_report(device)
+        except FileNotFoundError:
+            raise HelperError("smartctl is not installed.")
+
+    def do_wipe(self, request_id, device, quick=False, verify=False, pattern=None):
+        token = self._jobs.setdefault(request_id, CancelToken())
+
+        def forward(event):
+            if event["type"] == "progress":
+                self.send({"id": request_id, "event": "progress", "data": event})
+            elif event["type"] == "log":
+                self.send({"id": request_id, "event": "log", "data": event["message"]})
+
+        try:
+            wipe_run = wipe(self._check_device(device), mode="quick" if quick else "full",
+                            pattern=pattern, verify=bool(verify), token=token)
+            result = wipe_run.run(listener=forward)
+        finally:
+            self._jobs.pop(request_id, None)
+        if not result["ok"]:
+            raise HelperError(result["message"])
+        return result
+
+    def _job(self, job):
+        token = self._jobs.get(job)
+        if token is None:
+            raise HelperError(f"No running job {job}.")
+        return token
+
+    def do_stop(self, request_id, job):
+        self._job(job).stop()
+        return True
+
+    def do_pause(self, request_id, job):
+        self._job(job).pause()
+        return True
+
+    def do_resume(self, request_id, job):
+        self._job(job).resume()
+        return True
+
+
+def peer_uid(conn):
+    data = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", data)[1]
+
+
+def run_server(address, allowed_uid):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(_socket_address(address))
+    server.listen(1)
+    server.settimeout(ACCEPT_TIMEOUT)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return 1
+            # Soyut sokete herkes bağlanabilir; sadece bizi başlatan kullanıcıyı kabul ediyoruz
+            if peer_uid(conn) not in (allowed_uid, 0):
+                conn.close()
+                continue
+            break
+    finally:
+        server.close()
+    conn.settimeout(None)
+    try:
+        HelperServer(conn, allowed_uid).serve()
+    finally:
+        conn.close()
+    return 0
+
+
+# --- İstemci (arayüz tarafı) ---
+
+class HelperClient:
+    # Hata mesajlarında görünen ad; llf_daemon istemcisi de bu sınıfı kullanıyor
+    name = "privileged helper"
+
+    def __init__(self, helper_path=None, launcher=("pkexec",), python=None):
+        self.helper_path = helper_path or os.path.abspath(__file__)
+        self.launcher = list(launcher)
+        self.python = python or sys.executable
+        self.process = None
+        self.sock = None
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._next_id = 0
+        self._reader = None
+
+    @property
+    def running(self):
+        return self.sock is not None
+
+    def start(self, timeout=CONNECT_TIMEOUT):
+        if self.running:
+            return
+        address = f"@llf-helper-{os.getpid()}-{secrets.token_hex(8)}"
+        command = self.launcher + [self.python, self.helper_path, "--socket", address,
+                                   "--uid", str(os.getuid())]
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL)
+        self.connect(address, timeout)
+
+    def connect(self, address, timeout=CONNECT_TIMEOUT):
+        # Sunucu soketi açana kadar tekrar deniyoruz; başlattığımız süreç ölürse vazgeçiyoruz
+        deadline = time.monotonic() + timeout
+        while True:
+            code = self.process.poll() if self.process is not None else None
+            if code is not None:
+                # pkexec: 126 = parola diyaloğu kapatıldı, 127 = yetki yok
+                if code in (126, 127):
+                    raise HelperAuthError("Authorization was cancelled or denied.")
+                raise HelperError(f"The {self.name} exited with code {code}.")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(_socket_address(address))
+            except OSError as e:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    if self.process is not None:
+                        self.process.kill()
+                        raise HelperError(f"Timed out waiting for the {self.name}.")
+                    raise HelperError(f"Could not connect to the {self.name}: {e.strerror or e}")
+                time.sleep(0.2)
+                continue
+            self.sock = sock
+            break
+        self._reader = threading.Thread(target=self._read_loop, name="llf-helper-client",
+                                        daemon=True)
+        self._reader.start()
+        return self.call("ping")
+
+    def _read_loop(self):
+        try:
+            for line in self.sock.makefile("r", encoding="utf-8"):
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                with self._pending_lock:
+                    entry = self._pending.get(message.get("id"))
+                if entry is None:
+                    continue
+                if "event" in message:
+                    if entry["on_event"] is not None:
+                        try:
+                            entry["on_event"](message["event"], message.get("data"))
+                        except Exception:
+                            pass
+                    continue
+                entry["reply"] = message
+                entry["done"].set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            # Bağlantı koptu: bekleyen herkese hata döndür
+            self.sock = None
+            with self._pending_lock:
+                for entry in self._pending.values():
+                    entry.setdefault("reply", {"error": f"Connection to the {self.name} was lost."})
+                    entry["done"].set()
+
+    def submit(self, method, on_event=None, **params):
+        # İsteği gönderir, (istek kimliği, bekleme nesnesi) döndürür
+        sock = self.sock
+        if sock is None:
+            raise HelperError(f"The {self.name} is not running.")
+        with self._pending_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            entry = {"done": threading.Event(), "on_event": on_event}
+            self._pending[request_id] = entry
+        try:
+            _send(sock, self._send_lock, {"id": request_id, "method": method, "params": params})
+        except OSError as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise HelperError(f"Could not talk to the {self.name}: {e}")
+        return request_id, entry
+
+    def wait(self, request_id, entry, timeout=None):
+        if not entry["done"].wait(timeout):
+            raise HelperError(f"Request {request_id} timed out.")
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+        reply = entry["reply"]
+        if "error" in reply:
+            # Kuyrukta zaten olan cihaz gibi kullanıcı hataları ValueError olarak kalsın
+            if reply.get("type") == "ValueError":
+                raise ValueError(reply["error"])
+            raise HelperError(reply["error"])
+        return reply.get("result")
+
+    def call(self, method, on_event=None, timeout=None, **params):
+        request_id, entry = self.submit(method, on_event, **params)
+        return self.wait(request_id, entry, timeout)
+
+    def close(self):
+        # Okuma thread'i bağlantı kapanınca self.sock'u sıfırlıyor, yerel kopyayla çalışıyoruz
+        sock = self.sock
+        if sock is not None:
+            try:
+                self.call("quit", timeout=5)
+            except HelperError:
+                pass
+            try:
+                sock.close()
+            except OSError:
+                pass
+            self.sock = None
+        if self.process is not None:
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                pass
+            self.process = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLF Tool privileged helper")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--uid", type=int, default=None)
+    args = parser.parse_args()
+    if os.geteuid() != 0:
+        print("llf_helper must run as root (use pkexec).", file=sys.stderr)
+        return 1
+    # pkexec çağıranın kimliğini PKEXEC_UID ile veriyor; komut satırından gelene güvenmiyoruz
+    uid = os.environ.get("PKEXEC_UID")
+    allowed = int(uid) if uid and uid.isdigit() else (args.uid if args.uid is not None else 0)
+    # Önceki oturum çöktüyse ayarlı kalan blok kuyruklarını geri al
+    restore_stale()
+    return run_server(args.socket, allowed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
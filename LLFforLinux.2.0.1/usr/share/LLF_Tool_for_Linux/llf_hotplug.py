@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Takılan / çıkarılan diskleri çekirdeğin uevent netlink soketinden dinliyoruz.
+# pyudev kuruluysa onu kullanıyoruz (udev işini bitirdikten sonra haber verir),
+# değilse ham netlink soketi, o da olmazsa /sys/block'u saniyede bir yokluyoruz.
+
+import os
+import socket
+import threading
+
+from llf_devices import SYS_BLOCK
+
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1
+POLL_INTERVAL = 1.0
+
+
+def parse_uevent(data):
+    # "add@/devices/...\0ACTION=add\0SUBSYSTEM=block\0DEVNAME=sdb\0..." biçimi
+    fields = data.split(b"\0")
+    props = {}
+    for field in fields[1:]:
+        key, sep, value = field.partition(b"=")
+        if sep:
+            props[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+    return props
+
+
+class HotplugMonitor:
+
+    def __init__(self):
+        self._listeners = []
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.backend = None
+
+    def add_listener(self, callback):
+        # callback(action, name, properties); action: add, remove, change
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if pyudev is not None:
+            target, self.backend = self._run_pyudev, "pyudev"
+        else:
+            sock = self._open_netlink()
+            if sock is not None:
+                target, self.backend = (lambda: self._run_netlink(sock)), "netlink"
+            else:
+                target, self.backend = self._run_polling, "polling"
+        self._thread = threading.Thread(target=target, name="llf-hotplug", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _emit(self, action, name, props):
+        for callback in list(self._listeners):
+            try:
+                callback(action, name, props)
+            except Exception:
+                pass
+
+    def _handle(self, props):
+        if props.get("SUBSYSTEM") != "block" or props.get("DEVTYPE") != "disk":
+            return
+        name = props.get("DEVNAME", "")
+        name = os.path.basename(name) if name else os.path.basename(props.get("DEVPATH", ""))
+        action = props.get("ACTION")
+        if name and action in ("add", "remove", "change"):
+            self._emit(action, name, props)
+
+    # --- pyudev ---
+
+    def _run_pyudev(self):
+        context = pyudev.Context()
+        monitor = pyudev.Monitor.from_netlink(context)
+        monitor.filter_by("block", device_type="disk")
+        monitor.start()
+        while not self._stop_event.is_set():
+            device = monitor.poll(timeout=0.5)
+            if device is not None:
+                props = dict(device.properties)
+                props.setdefault("ACTION", device.action)
+                self._handle(props)
+
+    # --- Ham netlink ---
+
+    def _open_netlink(self):
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, KERNEL_GROUP))
+            sock.settimeout(0.5)
+            return sock
+        except (OSError, AttributeError):
+            return None
+
+    def _run_netlink(self, sock):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    # ENOBUFS: çok fazla olay kaçırdık, yine de dinlemeye devam
+                    continue
+                # udev'in kendi yayınları "libudev" başlığıyla gelir, onları atlıyoruz
+                if data.startswith(b"libudev"):
+                    continue
+                self._handle(parse_uevent(data))
+        finally:
+            sock.close()
+
+    # --- Yoklama (son çare) ---
+
+    def _run_polling(self):
+        known = set(self._list_devices())
+        while not self._stop_event.wait(POLL_INTERVAL):
+            current = set(self._list_devices())
+            for name in sorted(current - known):
+                self._emit("add", name, {})
+            for name in sorted(known - current):
+                self._emit("remove", name, {})
+            known = current
+
+    def _list_devices(self):
+        try:
+            return os.listdir(SYS_BLOCK)
+        except OSError:
+            return []
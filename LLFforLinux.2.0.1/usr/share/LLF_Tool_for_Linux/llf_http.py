@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Arka plan servisi (llf_daemon) için isteğe bağlı yerel HTTP kontrol noktası.
+# Ekran otomasyonu olmadan MES gibi sistemlerin iş başlatıp sonuç toplaması için.
+# Sadece loopback adresine bağlanıyor; her istek API anahtarı (Bearer token) istiyor.
+#
+#   POST /rpc      JSON-RPC 2.0 (tekli ya da toplu istek). Metotlar unix soketindekilerle aynı:
+#                  list, probe, preflight, smart, submit, jobs, get, log, plan, groups, stop,
+#                  pause, resume, stop_all, clear_finished, set_* , status
+#   GET /events    İş durumlarını satır başına bir JSON olarak akıtır (application/x-ndjson).
+#                  ?job=ID verilirse o iş bitince akış kapanır; ?interval=saniye
+#
+#   curl -H "Authorization: Bearer $(cat /run/llf-tool/api-token)" \
+#        -d '{"jsonrpc": "2.0", "id": 1, "method": "submit", "params": {"device": "/dev/sdb"}}' \
+#        http://127.0.0.1:8765/rpc
+
+import os
+import re
+import json
+import hmac
+import time
+import socket
+import secrets
+import ipaddress
+import threading
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llf_scheduler import FINISHED_STATES
+
+TOKEN_FILE = "/run/llf-tool/api-token"
+MAX_BODY = 1024 * 1024
+EVENT_INTERVAL = 1.0
+HEARTBEAT = 15.0         # Değişiklik yokken de arada bir satır: kopan istemciyi fark etmek için
+# Oturuma özel ya da HTTP'de anlamı olmayan metotlar
+HIDDEN_METHODS = ("quit", "wipe")
+METHOD_RE = re.compile(r"^[a-z_]+$")
+
+# JSON-RPC 2.0 hata kodları
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+def load_token(path=TOKEN_FILE):
+    # Dosya varsa onu kullan, yoksa yeni anahtar üretip sadece root'un okuyabileceği şekilde yaz
+    try:
+        with open(path, "r") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except OSError:
+        pass
+    token = secrets.token_urlsafe(32)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+def parse_address(text):
+    # "127.0.0.1:8765", "[::1]:8765" ya da sadece port
+    host, _, port = text.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    if host == "localhost":
+        host = "127.0.0.1"
+    if not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"The control API only listens on loopback addresses, not {host}.")
+    return host, int(port)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "LLFTool"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Her isteği servis günlüğüne yazmıyoruz
+        pass
+
+    def _authorized(self):
+        header = self.headers.get("Authorization", "")
+        if hmac.compare_digest(header.encode(), f"Bearer {self.server.token}".encode()):
+            return True
+        self._reply(401, {"error": "Missing or invalid API token."})
+        return False
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/rpc":
+            self._reply(404, {"error": "Not found."})
+            return
+        if not self._authorized():
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._reply(413, {"error": "Request too large."})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._reply(200, rpc_error(None, PARSE_ERROR, "Parse error."))
+            return
+        if isinstance(request, list):
+            # Toplu istek: bildirimler (id'siz) yanıt almıyor
+            replies = [r for r in (self.server.api.call(item) for item in request) if r is not None]
+            self._reply(200, replies if request else rpc_error(None, INVALID_REQUEST, "Empty batch."))
+            return
+        reply = self.server.api.call(request)
+        if reply is None:
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._reply(200, reply)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/events":
+            self._reply(404, {"error": "Not found."})
+            return
+        if not self._authorized():
+            return
+        query = parse_qs(url.query)
+        try:
+            job = int(query["job"][0]) if "job" in query else None
+            interval = max(float(query.get("interval", [EVENT_INTERVAL])[0]), 0.1)
+        except ValueError:
+            self._reply(400, {"error": "Invalid job or interval."})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self.server.api.stream(self.wfile, job, interval)
+        except OSError:
+            # İstemci bağlantıyı kapattı
+            pass
+
+
+def rpc_error(request_id, code, message, data=None):
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "error": error, "id": request_id}
+
+
+class ControlApi:
+    # JSON-RPC isteklerini servisin unix soketi metotlarına (DaemonSession.do_*) yönlendiriyor
+
+    def __init__(self, session):
+        self.session = session
+        self.scheduler = session.scheduler
+
+    def methods(self):
+        return sorted(name[3:] for name in dir(self.session)
+                      if name.startswith("do_") and getattr(self.session, name) is not None
+                      and name[3:] not in HIDDEN_METHODS)
+
+    def call(self, request):
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            return rpc_error(None, INVALID_REQUEST, "Invalid request.")
+        request_id = request.get("id")
+        notification = "id" not in request
+        method = request["method"]
+        params = request.get("params") or {}
+        if method == "methods":
+            return None if notification else {"jsonrpc": "2.0", "result": self.methods(), "id": request_id}
+        handler = None
+        if METHOD_RE.match(method) and method not in HIDDEN_METHODS:
+            handler = getattr(self.session, f"do_{method}", None)
+        if handler is None:
+            return rpc_error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+        if not isinstance(params, dict):
+            return rpc_error(request_id, INVALID_PARAMS, "Params must be an object.")
+        try:
+            result = handler(request_id, **params)
+        except TypeError as e:
+            return rpc_error(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            # HelperError, kuyrukta zaten olan cihaz için ValueError vb.
+            return rpc_error(request_id, SERVER_ERROR, str(e), {"type": type(e).__name__})
+        return None if notification else {"jsonrpc": "2.0", "result": result, "id": request_id}
+
+    def stream(self, wfile, job=None, interval=EVENT_INTERVAL):
+        # Değişen işleri yazıyor; iş verildiyse o iş bitince, yoksa istemci kapatana kadar
+        last = {}
+        last_write = time.monotonic()
+        while True:
+            jobs = self.scheduler.snapshot()
+            if job is not None:
+                jobs = [j for j in jobs if j["id"] == job]
+                if not jobs:
+                    wfile.write((json.dumps({"event": "error", "message": f"No job {job}."}) + "\n").encode())
+                    return
+            lines = []
+            for snapshot in jobs:
+                signature = (snapshot["state"], snapshot["offset"], snapshot["message"])
+                if last.get(snapshot["id"]) != signature:
+                    last[snapshot["id"]] = signature
+                    lines.append(dict(event="job", time=round(time.time(), 3), **snapshot))
+            if not lines and time.monotonic() - last_write >= HEARTBEAT:
+                lines.append({"event": "heartbeat", "time": round(time.time(), 3)})
+            if lines:
+                wfile.write("".join(json.dumps(line) + "\n" for line in lines).encode())
+                wfile.flush()
+                last_write = time.monotonic()
+            if job is not None and jobs[0]["state"] in FINISHED_STATES:
+                return
+            time.sleep(interval)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, token, api):
+        host, port = address
+        if ":" in host:
+            self.address_family = socket.AF_INET6
+        super().__init__((host, port), ApiHandler)
+        self.token = token
+        self.api = api
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="llf-http", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# /dev/kmsg okuyucu. Bir iş çalışırken çekirdeğin hedef cihaz için bastığı
+# I/O hatası, sense key ve USB/SATA reset mesajlarını yakalıyoruz.
+# Böylece "Error Code: N" yerine hatanın ortam mı kablo mu olduğunu görebiliyoruz.
+
+import os
+import re
+import errno
+import select
+import threading
+
+KMSG_PATH = "/dev/kmsg"
+SECTOR_SIZE = 512   # Çekirdek mesajlarındaki sektörler her zaman 512 bayt
+
+IO_ERROR_RE = re.compile(
+    r"(?:(critical medium|critical target|critical nexus|critical space allocation|"
+    r"critical protection|timeout|recoverable transport)\s+error|I/O error),\s+dev\s+(\w+),\s+sector\s+(\d+)"
+    r"(?:\s+op\s+0x[0-9a-f]+:\((\w+)\))?")
+BUFFER_ERROR_RE = re.compile(r"Buffer I/O error on dev (\w+), logical block (\d+)")
+SENSE_RE = re.compile(r"\[(\w+)\](?: tag#\d+)?\s+Sense Key\s*:\s*([\w ]+?)\s*(?:\[|$)")
+ASC_RE = re.compile(r"\[(\w+)\](?: tag#\d+)?\s+Add\. Sense:\s*(.+)$")
+USB_RE = re.compile(r"^usb (\d+-[\d.]+): (reset .*|USB disconnect.*|device descriptor read.*|"
+                    r"device not accepting address.*)$")
+ATA_RE = re.compile(r"^(ata\d+)(?:\.\d+)?: (hard resetting link|SATA link down.*|link is slow.*|"
+                    r"limiting SATA link speed.*|exception .*|failed command: .*)$")
+
+MEDIUM_SENSE = ("Medium Error",)
+LINK_SENSE = ("Hardware Error", "Aborted Command", "Not Ready", "Unit Attention")
+
+
+def device_ports(device_name):
+    # /sys/block/sdb gerçek yolunda cihazın bağlı olduğu USB portu (2-1.3) ve ATA portu (ata3) geçer
+    try:
+        real = os.path.realpath(f"/sys/block/{device_name}")
+    except OSError:
+        return set()
+    ports = set()
+    for part in real.split("/"):
+        if re.match(r"^\d+-[\d.]+$", part) or re.match(r"^ata\d+$", part):
+            ports.add(part)
+    return ports
+
+
+def parse_record(raw):
+    # Kayıt biçimi: "öncelik,sıra,zaman,bayrak;mesaj\n devam satırları"
+    try:
+        text = raw.decode("utf-8", "replace")
+    except AttributeError:
+        text = raw
+    header, _, rest = text.partition(";")
+    message = rest.split("\n", 1)[0]
+    fields = header.split(",")
+    try:
+        timestamp = int(fields[2]) / 1e6
+    except (IndexError, ValueError):
+        timestamp = None
+    return timestamp, message
+
+
+def classify(message, device_name, ports):
+    # Mesaj bizim cihazla ilgiliyse olay sözlüğü döndürür, değilse None
+    match = IO_ERROR_RE.search(message)
+    if match and match.group(2) == device_name:
+        kind = "medium" if (match.group(1) or "").startswith("critical medium") else "io"
+        if match.group(1) and "transport" in match.group(1):
+            kind = "link"
+        sector = int(match.group(3))
+        return {"kind": kind, "sector": sector, "op": match.group(4), "message": message}
+
+    match = BUFFER_ERROR_RE.search(message)
+    if match and match.group(1) == device_name:
+        return {"kind": "io", "sector": None, "op": None, "message": message}
+
+    match = SENSE_RE.search(message)
+    if match and match.group(1) == device_name:
+        sense = match.group(2).strip()
+        if sense in MEDIUM_SENSE:
+            kind = "medium"
+        elif sense in LINK_SENSE:
+            kind = "link"
+        else:
+            kind = "io"
+        return {"kind": kind, "sector": None, "op": None, "message": message, "sense": sense}
+
+    match = ASC_RE.search(message)
+    if match and match.group(1) == device_name:
+        asc = match.group(2).strip()
+        kind = "medium" if re.search(r"Unrecovered|Write error|Medium", asc, re.I) else "io"
+        return {"kind": kind, "sector": None, "op": None, "message": message, "sense": asc}
+
+    for regex in (USB_RE, ATA_RE):
+        match = regex.search(message)
+        if match and match.group(1) in ports:
+            return {"kind": "link", "sector": None, "op": None, "message": message}
+    return None
+
+
+class KmsgMonitor:
+
+    def __init__(self, device_name, callback, kmsg_path=KMSG_PATH):
+        self.device_name = device_name
+        self.callback = callback
+        self.kmsg_path = kmsg_path
+        self.ports = device_ports(device_name)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._fd = None
+
+    def start(self):
+        try:
+            self._fd = os.open(self.kmsg_path, os.O_RDONLY | os.O_NONBLOCK)
+            # Sadece bundan sonraki mesajlar bizi ilgilendiriyor
+            os.lseek(self._fd, 0, os.SEEK_END)
+        except OSError:
+            # Root değilsek ya da kmsg kapalıysa sessizce vazgeçiyoruz
+            self._fd = None
+            return False
+        self._thread = threading.Thread(target=self._run, name="llf-kmsg", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def set_device(self, device_name):
+        # Cihaz yeniden bağlanıp başka isim alınca filtreyi de güncelliyoruz
+        self.device_name = device_name
+        self.ports = device_ports(device_name)
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        try:
+            while not self._stop_event.is_set():
+                if not poller.poll(250):
+                    continue
+                while True:
+                    try:
+                        raw = os.read(self._fd, 8192)
+                    except OSError as e:
+                        if e.errno == errno.EAGAIN:
+                            break
+                        if e.errno == errno.EPIPE:
+                            # Halka tampon üstümüze yazdı, kaçan mesajları atlayıp devam
+                            continue
+                        return
+                    if not raw:
+                        break
+                    timestamp, message = parse_record(raw)
+                    event = classify(message, self.device_name, self.ports)
+                    if event is not None:
+                        event["time"] = timestamp
+                        self.callback(event)
+        finally:
+            os.close(self._fd)
+            self._fd = None
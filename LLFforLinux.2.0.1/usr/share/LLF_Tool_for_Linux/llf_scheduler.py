@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Çoklu disk formatı için iş kuyruğu. Her disk kendi motoruyla kendi thread'inde çalışır,
+# aynı anda kaç işin çalışacağına bu zamanlayıcı karar verir. Qt'ye bağımlı değil;
+# arayüz snapshot() çıktısını belli aralıklarla okuyarak tabloyu güncelliyor.
+
+import time
+import threading
+import itertools
+from collections import deque
+
+from llf_engine import CancelToken, WipeCancelled, WipeEngine, QUICK_WIPE_SIZE
+from llf_devices import device_size, device_topology, is_rotational
+from llf_throttle import TokenBucket
+
+DEFAULT_CONCURRENCY = 4
+# Paylaşılan bağlantıda iş başına hız bu oranın altına düşerse bağlantı doymuş sayılır
+SATURATION_RATIO = 0.75
+# Bağlantı hızının (Mbit/s) pratikte kullanılabilen kısmı (protokol yükü)
+LINK_EFFICIENCY = 0.8
+# Bir işin ortalama hızı bu kadar saniyelik ölçümden sonra tahminlerde kullanılır
+RATE_WARMUP = 5.0
+
+# Hiç ölçüm yokken kullanılan kaba hız profilleri (bayt/s)
+DEFAULT_RATES = {
+    "nvme": 1500e6,
+    "ata_ssd": 400e6,
+    "ata": 150e6,
+    "scsi": 180e6,
+    "usb": 30e6,
+    "other": 100e6,
+}
+
+# Slot tutan durumlar. Duraklatılan iş slotunu bırakır ki acil bir disk başlayabilsin.
+ACTIVE_STATES = ("starting", "running", "stalled", "reconnecting", "finishing")
+FINISHED_STATES = ("done", "failed", "stopped")
+
+
+class WipeJob:
+
+    def __init__(self, job_id, device_path, quick_wipe=False, label="", size=0,
+                 rate_limit=None, io_class=None):
+        self.id = job_id
+        self.device_path = device_path
+        self.quick_wipe = quick_wipe
+        self.label = label or device_path
+        self.size = size or device_size(device_path)
+        if quick_wipe:
+            self.size = min(self.size, QUICK_WIPE_SIZE)
+        # Zamanlayıcının tahmin ettiği hız (bayt/s) ve kalan süre (s)
+        self.expected_rate = None
+        self.predicted = None
+        # İş başına hız sınırı (bayt/s) ve ionice sınıfı; çalışırken değiştirilebilir
+        self.rate_limit = rate_limit
+        self.io_class = io_class
+        self.token = CancelToken()
+        self.state = "queued"
+        self.message = ""
+        self.stats = {}
+        self.log = deque(maxlen=200)
+        self.engine = None
+        self.thread = None
+        self.group = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        # Takılı kalmış (hung) işin thread'i bitmeyebilir; slotu yine de bırakıyoruz
+        self.detached = False
+        # Devam ettirilmek istenen duraklatılmış iş; boş slot olunca _dispatch devam ettiriyor
+        self.resume_pending = False
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES and not self.detached
+
+    def snapshot(self):
+        stats = self.stats
+        return {
+            "id": self.id,
+            "device": self.device_path,
+            "label": self.label,
+            "quick_wipe": self.quick_wipe,
+            "group": self.group,
+            "state": self.state,
+            "message": self.message,
+            "pct": stats.get("pct", 100.0 if self.state == "done" else 0.0),
+            "offset": stats.get("offset", 0),
+            "total": stats.get("total", self.size),
+            "rate": stats.get("rate", 0.0),
+            "avg_rate": stats.get("avg_rate", 0.0),
+            "eta": stats.get("eta"),
+            "stalled": stats.get("stalled", False),
+            "medium_errors": stats.get("medium_errors", 0),
+            "link_errors": stats.get("link_errors", 0),
+            "started": self.started,
+            "finished": self.finished,
+            "predicted": self.predicted,
+            "flush_time": self.engine.flush_time if self.engine else None,
+            "rate_limit": self.rate_limit,
+            "io_class": self.io_class,
+        }
+
+
+class DeviceGroup:
+    # Aynı host controller / upstream port arkasındaki diskler. Grup için eşzamanlı iş
+    # sınırı; elle verilen sınırdan, verilen ya da ölçülen bant genişliğinden hesaplanır.
+
+    def __init__(self, key, topology):
+        self.key = key
+        self.bus = topology.get("bus")
+        self.link_bandwidth = None
+        if topology.get("link_mbps"):
+            self.link_bandwidth = topology["link_mbps"] * 1e6 / 8 * LINK_EFFICIENCY
+        self.configured_limit = None
+        self.configured_bandwidth = None
+        self.measured_bandwidth = None
+        self.peak_job_rate = 0.0
+
+    def observe(self, rates):
+        rates = [r for r in rates if r > 0]
+        if not rates:
+            return
+        self.peak_job_rate = max(self.peak_job_rate, max(rates))
+        aggregate = sum(rates)
+        # İş başına hız belirgin biçimde düştüyse bağlantı doymuştur; o anki toplamı not ediyoruz
+        if len(rates) > 1 and aggregate / len(rates) < self.peak_job_rate * SATURATION_RATIO:
+            self.measured_bandwidth = max(self.measured_bandwidth or 0.0, aggregate)
+
+    def bandwidth(self):
+        return self.configured_bandwidth or self.measured_bandwidth or self.link_bandwidth
+
+    def job_rate(self):
+        # Henüz ölçüm yoksa bus profilinden kaba iş hızı; yoksa ilk toplu işte
+        # aynı USB2 hub'ındaki 24 bellek birden başlıyordu
+        return self.peak_job_rate or DEFAULT_RATES.get(self.bus, DEFAULT_RATES["other"])
+
+    def limit(self, default_limit=None):
+        if self.configured_limit:
+            return self.configured_limit
+        bandwidth = self.bandwidth()
+        if bandwidth:
+            return max(1, int(bandwidth / self.job_rate() + 0.5))
+        return default_limit or None
+
+    def snapshot(self, running, default_limit=None):
+        return {
+            "group": self.key,
+            "bus": self.bus,
+            "running": running,
+            "limit": self.limit(default_limit),
+            "bandwidth": self.bandwidth(),
+            "peak_job_rate": self.peak_job_rate,
+        }
+
+
+class JobScheduler:
+
+    def __init__(self, max_concurrent=DEFAULT_CONCURRENCY, engine_options=None,
+                 group_limits=None, group_bandwidth=None, default_group_limit=None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.engine_options = dict(engine_options or {})
+        # Grup anahtarı -> sabit sınır / bant genişliği (bayt/s). Verilmeyen gruplar ölçülür.
+        self.group_limits = dict(group_limits or {})
+        self.group_bandwidth = dict(group_bandwidth or {})
+        self.default_group_limit = default_group_limit
+        # "lpt": en uzun sürecek iş önce (makespan için), "fifo": ekleme sırası
+        self.order = "lpt"
+        # Model bazında ölçülen ortalama hızlar; yeni işlerin süresini tahmin etmekte kullanılır
+        self._model_rates = {}
+        self._profiles = {}
+        self._groups = {}
+        self._jobs = []
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        # Tüm işlerin toplam yazma hızı için ortak kova
+        self.global_limit = TokenBucket()
+
+    # --- İş ekleme / kontrol ---
+
+    def submit(self, device_path, quick_wipe=False, label="", size=0, rate_limit=None,
+               io_class=None):
+        with self._lock:
+            for job in self._jobs:
+                if job.device_path == device_path and job.state not in FINISHED_STATES:
+                    raise ValueError(f"{device_path} is already in the queue.")
+            job = WipeJob(next(self._ids), device_path, quick_wipe, label, size,
+                          rate_limit, io_class)
+            job.group = self._group_for(device_path).key
+            self._profiles[job.id] = self._profile_for(device_path, job.group)
+            self._jobs.append(job)
+        self._dispatch()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            for job in self._jobs:
+                if job.id == job_id:
+                    return job
+        return None
+
+    def stop(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return
+        with self._lock:
+            if job.state == "queued":
+                job.state = "stopped"
+                job.message = "Removed from queue."
+                job.finished = time.time()
+                return
+        job.token.stop()
+
+    def pause(self, job_id):
+        job = self.get(job_id)
+        if job is not None and job.state in ACTIVE_STATES:
+            job.token.pause()
+        elif job is not None and job.resume_pending:
+            with self._lock:
+                job.resume_pending = False
+                job.message = ""
+
+    def resume(self, job_id):
+        # Duraklatılan iş slotunu bıraktı; slot ve grup sınırı izin verince devam ediyor
+        job = self.get(job_id)
+        if job is None or not job.token.paused:
+            return
+        with self._lock:
+            job.resume_pending = True
+            if job.state == "paused":
+                job.message = "Waiting for a free slot to resume."
+        self._dispatch()
+
+    def set_rate_limit(self, job_id, rate):
+        job = self.get(job_id)
+        if job is None:
+            return
+        job.rate_limit = rate or None
+        if job.engine is not None:
+            job.engine.set_rate_limit(job.rate_limit)
+
+    def set_io_class(self, job_id, io_class):
+        job = self.get(job_id)
+        if job is None:
+            return
+        job.io_class = io_class
+        if job.engine is not None:
+            job.engine.set_io_class(io_class)
+
+    def set_engine_option(self, key, value):
+        # Sonradan başlayan işlerin motor ayarları (tune_queue, cgroup ...)
+        with self._lock:
+            self.engine_options[key] = value
+
+    def set_global_rate_limit(self, rate):
+        # bayt/s; 0 ya da None sınırı kaldırır. Çalışan işlere hemen uygulanır.
+        self.global_limit.set_rate(rate)
+
+    def stop_all(self):
+        for job in self.jobs():
+            self.stop(job.id)
+
+    def clear_finished(self):
+        with self._lock:
+            self._jobs = [j for j in self._jobs if j.state not in FINISHED_STATES]
+
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, int(value))
+        self._dispatch()
+
+    def set_default_group_limit(self, value):
+        # 0 ya da None: grup sınırı sadece bant genişliğinden hesaplansın
+        self.default_group_limit = int(value) or None
+        self._dispatch()
+
+    def set_group_limit(self, group, value):
+        with self._lock:
+            self.group_limits[group] = int(value) or None
+            if group in self._groups:
+                self._groups[group].configured_limit = self.group_limits[group]
+        self._dispatch()
+
+    def set_group_bandwidth(self, group, bytes_per_second):
+        with self._lock:
+            self.group_bandwidth[group] = bytes_per_second or None
+            if group in self._groups:
+                self._groups[group].configured_bandwidth = self.group_bandwidth[group]
+        self._dispatch()
+
+    def groups(self):
+        with self._lock:
+            return [group.snapshot(self._group_running(group.key), self.default_group_limit)
+                    for group in self._groups.values()]
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def snapshot(self):
+        with self._lock:
+            self._update_predictions()
+        return [job.snapshot() for job in self.jobs()]
+
+    def busy(self):
+        return any(job.state not in FINISHED_STATES for job in self.jobs())
+
+    # --- Zamanlama ---
+
+    def _group_for(self, device_path):
+        try:
+            topology = device_topology(device_path)
+        except OSError:
+            topology = {"group": f"other:{device_path}"}
+        key = topology["group"]
+        group = self._groups.get(key)
+        if group is None:
+            group = DeviceGroup(key, topology)
+            group.configured_limit = self.group_limits.get(key)
+            group.configured_bandwidth = self.group_bandwidth.get(key)
+            self._groups[key] = group
+        return group
+
+    def _group_running(self, key):
+        return sum(1 for job in self._jobs if job.active and job.group == key)
+
+    def _group_full(self, key):
+        limit = self._groups[key].limit(self.default_group_limit)
+        return limit is not None and self._group_running(key) >= limit
+
+    def _observe(self, job):
+        # İlerleme geldikçe grubun gerçek hızlarını güncelliyoruz.
+        # Hız sınırı varken ölçülen hız diskin değil sınırın hızıdır, öğrenmiyoruz.
+        if job.rate_limit or self.global_limit.rate:
+            return
+        with self._lock:
+            avg_rate = job.stats.get("avg_rate", 0.0)
+            if avg_rate > 0 and job.started and time.time() - job.started >= RATE_WARMUP:
+                previous = self._model_rates.get(job.label)
+                self._model_rates[job.label] = avg_rate if previous is None else previous * 0.8 + avg_rate * 0.2
+            group = self._groups.get(job.group)
+            if group is None:
+                return
+            rates = [j.stats.get("rate", 0.0) for j in self._jobs
+                     if j.group == job.group and j.state == "running" and not j.detached]
+            group.observe(rates)
+
+    # --- Süre tahmini ---
+
+    def _profile_for(self, device_path, group_key):
+        bus = self._groups[group_key].bus if group_key in self._groups else "other"
+        if bus == "ata" and not is_rotational(device_path):
+            return "ata_ssd"
+        return bus if bus in DEFAULT_RATES else "other"
+
+    def _expected_rate(self, job):
+        # Önce aynı modelden ölçülen hız, sonra grubun en iyi iş hızı, en son kaba profil
+        rate = self._model_rates.get(job.label)
+        if not rate:
+            group = self._groups.get(job.group)
+            rate = group.peak_job_rate if group else 0.0
+        if not rate:
+            rate = DEFAULT_RATES[self._profiles.get(job.id, "other")]
+        return rate
+
+    def _update_predictions(self):
+        for job in self._jobs:
+            if job.state in FINISHED_STATES:
+                job.predicted = 0.0
+                continue
+            if job.state in ACTIVE_STATES and job.stats.get("avg_rate"):
+                job.expected_rate = job.stats["avg_rate"]
+            else:
+                job.expected_rate = self._expected_rate(job)
+                if job.rate_limit:
+                    job.expected_rate = min(job.expected_rate, job.rate_limit)
+            remaining = max(job.size - job.stats.get("offset", 0), 0)
+            job.predicted = remaining / job.expected_rate if job.expected_rate else None
+
+    def plan(self):
+        # Liste zamanlama benzetimi: çalışan işler slotlarını tutar, bekleyenler seçilen
+        # sıraya göre ilk boşalan slota yerleşir. Tahmini toplam bitiş süresini döndürür.
+        with self._lock:
+            self._update_predictions()
+            slots = [job.predicted or 0.0 for job in self._jobs if job.active]
+            slots += [0.0] * max(self.max_concurrent - len(slots), 0)
+            slots.sort()
+            for job in self._ordered_queue():
+                start = slots.pop(0)
+                slots.append(start + (job.predicted or 0.0))
+                slots.sort()
+            return max(slots) if slots else 0.0
+
+    def _ordered_queue(self):
+        queued = [job for job in self._jobs if job.state == "queued"]
+        if self.order == "lpt":
+            # En uzun işler önce: kısa işler sona kalınca slotlar dengeli biçimde biter
+            queued.sort(key=lambda job: job.predicted or 0.0, reverse=True)
+        return queued
+
+    def _running_count(self):
+        return sum(1 for job in self._jobs if job.active)
+
+    def _next_job(self):
+        # Her slot boşalışında tahminleri güncel hızlarla yeniden hesaplıyoruz
+        self._update_predictions()
+        for job in self._ordered_queue():
+            if not self._group_full(job.group):
+                return job
+        return None
+
+    def _next_resume(self):
+        for job in self._jobs:
+            if job.resume_pending and job.state == "paused" and not self._group_full(job.group):
+                return job
+        return None
+
+    def _resume(self, job):
+        job.resume_pending = False
+        job.message = ""
+        if job.state == "paused":
+            # Motor "running" bildirene kadar da slotu tutsun
+            job.state = "starting"
+        job.token.resume()
+
+    def _dispatch(self):
+        with self._lock:
+            for job in self._jobs:
+                if job.resume_pending and job.state in FINISHED_STATES:
+                    job.resume_pending = False
+                elif job.resume_pending and job.state != "paused":
+                    # Henüz duraklamaya geçmemiş, slotunu hâlâ tutuyor
+                    self._resume(job)
+            while self._running_count() < self.max_concurrent:
+                # Duraklatılıp devam bekleyen işler kuyruktakilerden önce
+                job = self._next_resume()
+                if job is not None:
+                    self._resume(job)
+                    continue
+                job = self._next_job()
+                if job is None:
+                    break
+                self._start(job)
+
+    def _start(self, job):
+        job.state = "starting"
+        job.started = time.time()
+        job.thread = threading.Thread(target=self._run_job, args=(job,),
+                                      name=f"llf-job-{job.id}", daemon=True)
+        job.thread.start()
+
+    def _run_job(self, job):
+        def on_progress(stats):
+            job.stats = stats
+            if job.state not in FINISHED_STATES:
+                previous = job.state
+                job.state = stats["state"]
+                # Duraklatılan iş slotunu bıraktı; sıradaki işi başlatalım
+                if job.state == "paused" and previous != "paused":
+                    self._dispatch()
+            if stats["state"] == "running":
+                self._observe(job)
+
+        def on_hung(offset):
+            job.state = "failed"
+            job.message = f"Device stopped responding at offset {offset}."
+            job.finished = time.time()
+            job.detached = True
+            self._dispatch()
+
+        options = dict(self.engine_options)
+        options.update(rate_limit=job.rate_limit, io_class=job.io_class,
+                       shared_limits=(self.global_limit,))
+        job.engine = WipeEngine(
+            job.device_path,
+            quick_wipe=job.quick_wipe,
+            token=job.token,
+            progress_callback=on_progress,
+            log_callback=job.log.append,
+            hung_callback=on_hung,
+            **options
+        )
+        try:
+            job.engine.run()
+            state, message = "done", (f"Format completed successfully. "
+                                      f"Final flush took {job.engine.flush_time:.1f} s.")
+        except WipeCancelled as e:
+            state, message = ("failed" if job.engine.hung else "stopped"), str(e)
+        except Exception as e:
+            state, message = "failed", str(e)
+
+        summary = job.engine.error_summary()
+        if not job.detached:
+            job.state = state
+            job.message = f"{message} {summary}".strip()
+            job.finished = time.time()
+        self._dispatch()
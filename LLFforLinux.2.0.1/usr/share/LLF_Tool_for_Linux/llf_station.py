@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# İstasyon modu: yeni takılan ve kurala (policy) uyan cihazları otomatik olarak
+# iş kuyruğuna ekler. Operatör sadece diski takıp bitenleri çıkarıyor.
+# Sistem diski ya da kullanımda olan hiçbir cihaz asla kuyruğa alınmaz.
+
+import os
+import re
+import json
+import time
+import threading
+from collections import deque
+
+from llf_devices import describe_problems, preflight, probe_device
+
+POLICY_PATH = "/etc/llf-tool/station.json"
+SETTLE_TIME = 1.0   # Cihaz göründükten sonra udev'in işini bitirmesi için bekleme
+
+
+class StationPolicy:
+
+    def __init__(self, buses=("usb",), min_size=0, max_size=None, models=(),
+                 quick_wipe=False):
+        self.buses = [b.lower() for b in buses]
+        self.min_size = int(min_size or 0)
+        self.max_size = int(max_size) if max_size else None
+        # Model izin listesi; boşsa her model kabul edilir. Düz metin ya da regex olabilir.
+        self.models = list(models)
+        self.quick_wipe = bool(quick_wipe)
+
+    def matches(self, info):
+        # (uyuyor_mu, sebep) döndürür
+        if self.buses and (info.get("tran") or "").lower() not in self.buses:
+            return False, f"bus {info.get('tran') or 'unknown'} is not allowed"
+        size = info.get("size") or 0
+        if size <= 0:
+            return False, "no medium / zero size"
+        if size < self.min_size:
+            return False, "smaller than the minimum size"
+        if self.max_size and size > self.max_size:
+            return False, "larger than the maximum size"
+        if self.models:
+            model = f"{info.get('vendor', '')} {info.get('model', '')}".strip()
+            if not any(re.search(pattern, model, re.I) for pattern in self.models):
+                return False, f"model '{model}' is not in the allowlist"
+        return True, ""
+
+    def to_dict(self):
+        return {"buses": self.buses, "min_size": self.min_size, "max_size": self.max_size,
+                "models": self.models, "quick_wipe": self.quick_wipe}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(buses=data.get("buses", ("usb",)), min_size=data.get("min_size", 0),
+                   max_size=data.get("max_size"), models=data.get("models", ()),
+                   quick_wipe=data.get("quick_wipe", False))
+
+    @classmethod
+    def load(cls, path=POLICY_PATH):
+        try:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path=POLICY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def describe(self):
+        text = f"Buses: {', '.join(self.buses) or 'any'}"
+        text += f" | Size: {self.min_size / 1e9:.0f}-{self.max_size / 1e9:.0f} GB" if self.max_size \
+            else f" | Size: >= {self.min_size / 1e9:.0f} GB"
+        if self.models:
+            text += f" | Models: {', '.join(self.models)}"
+        text += " | Operation: " + ("quick wipe" if self.quick_wipe else "full format")
+        return text
+
+
+class WipeStation:
+
+    def __init__(self, scheduler, policy, monitor):
+        self.scheduler = scheduler
+        self.policy = policy
+        # Takılan cihazları HotplugMonitor bildiriyor (netlink/pyudev)
+        self.monitor = monitor
+        self.events = deque(maxlen=500)
+        self.running = False
+        self._jobs = {}          # job id -> cihaz yolu (bitince operatöre haber vermek için)
+        self._lock = threading.Lock()
+
+    def log(self, message):
+        self.events.append(f"{time.strftime('%H:%M:%S')}  {message}")
+
+    def start(self):
+        if self.running:
+            return
+        # Açılışta takılı olan cihazlara dokunmuyoruz; sadece bundan sonra takılanlar
+        self.running = True
+        self.monitor.add_listener(self.handle_hotplug)
+        self.monitor.start()
+        self.log(f"Station mode started. {self.policy.describe()}")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.monitor.remove_listener(self.handle_hotplug)
+        self.log("Station mode stopped.")
+
+    def handle_hotplug(self, action, name, props):
+        if action == "add":
+            # udev'in bölüm tablosunu okuyup otomatik mount kararını vermesi için kısa bekleme
+            timer = threading.Timer(SETTLE_TIME, self.device_added, args=(name,))
+            timer.daemon = True
+            timer.start()
+        elif action == "remove":
+            self.log(f"/dev/{name} removed.")
+
+    def device_added(self, name):
+        if not self.running:
+            return
+        if name.startswith(("loop", "ram", "zram", "dm-", "md", "sr")):
+            return
+        info = probe_device(name)
+        ok, reason = self.policy.matches(info)
+        if not ok:
+            self.log(f"/dev/{name} ({info['model']}) ignored: {reason}.")
+            return
+        problems = preflight(info["path"])
+        if problems:
+            self.log(f"/dev/{name} ({info['model']}) is in use, not queued: "
+                     f"{describe_problems(problems).replace(chr(10), '; ')}")
+            return
+        try:
+            job = self.scheduler.submit(info["path"], quick_wipe=self.policy.quick_wipe,
+                                        label=info["model"], size=info["size"])
+        except ValueError as e:
+            self.log(str(e))
+            return
+        with self._lock:
+            self._jobs[job.id] = info["path"]
+        self.log(f"/dev/{name} ({info['model']}, {info['size'] / 1e9:.1f} GB) queued as job {job.id}.")
+
+    def report_finished(self):
+        # Arayüz ya da servis bunu periyodik olarak çağırır
+        with self._lock:
+            items = list(self._jobs.items())
+        for job_id, path in items:
+            job = self.scheduler.get(job_id)
+            if job is None or job.state not in ("done", "failed", "stopped"):
+                continue
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            if job.state == "done":
+                self.log(f"DONE: {path} ({job.label}). The device can be removed.")
+            else:
+                self.log(f"{job.state.upper()}: {path} ({job.label}): {job.message}")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Başka işler yapan sunucularda silme işini arka planda tutmak için:
+# - Motorun içinde token bucket hız sınırı (iş başına ve tüm işler için ortak)
+# - ioprio_set ile ionice sınıfı (idle / best-effort / realtime)
+# - cgroup v2 io.max ile çekirdek seviyesinde cihaz başına yazma sınırı
+# Hepsi çalışırken değiştirilebilir.
+
+import os
+import time
+import ctypes
+import platform
+import threading
+
+BURST_SECONDS = 0.25          # Kova en fazla bu kadar saniyelik veri biriktirebilir
+MIN_BURST = 4 * 1024 * 1024   # ...ama bir bloktan az değil
+WAIT_STEP = 0.1
+
+# --- Token bucket ---
+
+class TokenBucket:
+    # rate: bayt/s, None ya da 0 = sınırsız. Tüketici önce borçlanır (tokens eksiye düşer),
+    # sonra kova tekrar artıya geçene kadar bekler; böylece hız değişikliği beklerken de uygulanır.
+
+    def __init__(self, rate=None):
+        self._lock = threading.Lock()
+        self.rate = None
+        self.burst = MIN_BURST
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = float(rate) if rate else None
+            self.burst = max(self.rate * BURST_SECONDS, MIN_BURST) if self.rate else MIN_BURST
+            if self.rate is None:
+                # Sınır kalktıysa bekleyenler hemen devam etsin
+                self._tokens = 0.0
+            else:
+                self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def consume(self, amount, cancel=None):
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill()
+            self._tokens -= amount
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if not self.rate or self._tokens >= 0:
+                    return waited
+                delay = min(-self._tokens / self.rate, WAIT_STEP)
+            if cancel is not None:
+                cancel()
+            time.sleep(delay)
+            waited += delay
+
+
+# --- ionice (ioprio_set) ---
+
+IOPRIO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+# Sınıf seçilince kullanılan seviye. "best-effort" burada "düşük öncelik" demek (7);
+# None verilirse varsayılana (best-effort 4) dönüyoruz.
+IOPRIO_LEVELS = {"realtime": 4, "best-effort": 7, "idle": 0}
+DEFAULT_IOPRIO = ("best-effort", 4)
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+# ioprio_set sistem çağrısı numaraları
+SYS_IOPRIO_SET = {
+    "x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "riscv64": 30,
+    "armv7l": 314, "armv6l": 314, "ppc64le": 273, "ppc64": 273, "s390x": 282,
+}
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+except OSError:
+    _libc = None
+
+
+def set_io_priority(io_class, tid=0):
+    # tid=0 çağıran thread demek. Linux'ta ioprio thread başına tutuluyor,
+    # bu yüzden motor kendi thread kimliğini saklıyor ve arayüz onun üzerinden değiştiriyor.
+    number = SYS_IOPRIO_SET.get(platform.machine())
+    if io_class is None:
+        io_class, level = DEFAULT_IOPRIO
+    else:
+        level = IOPRIO_LEVELS.get(io_class, 4)
+    if _libc is None or number is None or io_class not in IOPRIO_CLASSES:
+        return False
+    value = (IOPRIO_CLASSES[io_class] << IOPRIO_CLASS_SHIFT) | max(0, min(7, int(level)))
+    return _libc.syscall(number, IOPRIO_WHO_PROCESS, int(tid), value) == 0
+
+
+# --- cgroup v2 io.max ---
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+CGROUP_NAME = "llf-tool"
+
+
+class CgroupIOLimit:
+    # io.max satırları cihaz başına; bu yüzden tüm süreç tek bir cgroup'a giriyor
+    # ve her iş kendi cihazının satırını yazıyor. Diğer disklerin I/O'su etkilenmiyor.
+
+    def __init__(self, root=CGROUP_ROOT, name=CGROUP_NAME):
+        self.root = root
+        self.path = os.path.join(root, name)
+        self.entered = False
+        self._lock = threading.Lock()
+
+    def available(self):
+        try:
+            with open(os.path.join(self.root, "cgroup.controllers"), "r") as f:
+                return "io" in f.read().split()
+        except OSError:
+            return False
+
+    def enter(self):
+        with self._lock:
+            if self.entered:
+                return True
+            if not self.available():
+                return False
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                with open(os.path.join(self.root, "cgroup.subtree_control"), "w") as f:
+                    f.write("+io")
+                with open(os.path.join(self.path, "cgroup.procs"), "w") as f:
+                    f.write(str(os.getpid()))
+                self.entered = True
+            except OSError:
+                return False
+            return True
+
+    def set_limit(self, dev, write_bps):
+        # dev: "8:16"; write_bps None ise sınır kaldırılır
+        if not self.entered or not dev:
+            return False
+        value = str(int(write_bps)) if write_bps else "max"
+        try:
+            with open(os.path.join(self.path, "io.max"), "w") as f:
+                f.write(f"{dev} wbps={value}")
+            return True
+        except OSError:
+            return False
+
+
+_cgroup = None
+_cgroup_lock = threading.Lock()
+
+
+def process_cgroup():
+    global _cgroup
+    with _cgroup_lock:
+        if _cgroup is None:
+            _cgroup = CgroupIOLimit()
+        return _cgroup
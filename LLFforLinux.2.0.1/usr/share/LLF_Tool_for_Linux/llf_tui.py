@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Terminal arayüzü (curses). X olmayan makineler ve seri konsol için; Qt yüklemiyor.
+# Qt arayüzündeki üç ekran (cihaz listesi, format, SMART) ve toplu iş paneli burada da var.
+# Ekran sabit bir kare hızında yenileniyor; motorun ilerleme olayları sadece son durumu
+# güncelliyor, çizim her zaman ana döngüde yapılıyor.
+#
+# Tuşlar: 1-4 / Tab ekran değiştirir, ok tuşları seçer, q çıkar. Her ekranın alt satırında
+# o ekranın tuşları yazıyor.
+
+import os
+import sys
+import curses
+import threading
+from collections import deque
+
+from llf_api import wipe
+from llf_devices import (
+    describe_problems, group_physical_disks, preflight, probe_devices, smart_report, system_usage,
+)
+from llf_engine import human_size
+from llf_scheduler import JobScheduler, DEFAULT_CONCURRENCY, FINISHED_STATES
+from llf_daemon import connect_scheduler
+from llf_tuning import restore_stale
+
+FRAME_RATE = 4           # saniyede kaç kez çizilsin
+VIEWS = (("devices", "Devices"), ("format", "Format"), ("smart", "SMART"), ("jobs", "Jobs"))
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+def progress_bar(pct, width):
+    width = max(width, 3)
+    filled = int((width - 2) * min(max(pct, 0.0), 100.0) / 100.0)
+    return "[" + "#" * filled + "-" * (width - 2 - filled) + "]"
+
+
+def smart_lines(report):
+    # smartctl JSON çıktısını satırlara çeviriyor (Qt arayüzündeki SMART tablosunun karşılığı)
+    data = report.get("data") or {}
+    lines = []
+    for key, label in (("model_name", "Model"), ("serial_number", "Serial"),
+                       ("firmware_version", "Firmware")):
+        if data.get(key):
+            lines.append(f"{label:<18}{data[key]}")
+    capacity = (data.get("user_capacity") or {}).get("bytes")
+    if capacity:
+        lines.append(f"{'Capacity':<18}{human_size(capacity)}")
+    status = (data.get("smart_status") or {}).get("passed")
+    if status is not None:
+        lines.append(f"{'Health':<18}{'PASSED' if status else 'FAILED'}")
+    temperature = (data.get("temperature") or {}).get("current")
+    if temperature is not None:
+        lines.append(f"{'Temperature':<18}{temperature} C")
+    hours = (data.get("power_on_time") or {}).get("hours")
+    if hours is not None:
+        lines.append(f"{'Power on hours':<18}{hours}")
+    attributes = (data.get("ata_smart_attributes") or {}).get("table", [])
+    if attributes:
+        lines.append("")
+        lines.append(f"{'ID':>3}  {'ATTRIBUTE':<28}{'VALUE':>6}{'WORST':>6}{'THRESH':>7}  RAW")
+        for attr in attributes:
+            lines.append(f"{attr.get('id', ''):>3}  {str(attr.get('name', 'Unknown')):<28}"
+                         f"{str(attr.get('value', 'N/A')):>6}{str(attr.get('worst', '')):>6}"
+                         f"{str(attr.get('thresh', '')):>7}  {(attr.get('raw') or {}).get('string', 'N/A')}")
+    nvme = data.get("nvme_smart_health_information_log") or {}
+    if nvme:
+        lines.append("")
+        for key, value in nvme.items():
+            lines.append(f"{key.replace('_', ' ').title():<36}{value}")
+    if not attributes and not nvme:
+        lines.append("")
+        lines.append("S.M.A.R.T. attributes not found or not supported by this device.")
+        for message in (data.get("smartctl") or {}).get("messages", []):
+            lines.append(message.get("string", ""))
+        if report.get("stderr"):
+            lines.extend(report["stderr"].splitlines())
+    return lines
+
+
+class FormatTask:
+    # Tek cihaz formatı; llf_api olaylarını dinleyip sadece son durumu saklıyor
+
+    def __init__(self, device, quick, verify):
+        self.device = device
+        self.run = wipe(device, mode="quick" if quick else "full", verify=verify)
+        self.phase = None
+        self.progress = {}
+        self.log = deque(maxlen=200)
+        self.result = None
+        self.thread = threading.Thread(target=self.run.run, kwargs={"listener": self.handle},
+                                       name="llf-tui-format", daemon=True)
+
+    def handle(self, event):
+        if event["type"] == "phase":
+            self.phase = event["phase"]
+        elif event["type"] == "progress":
+            self.progress = event
+        elif event["type"] == "log":
+            self.log.append(event["message"])
+        elif event["type"] == "result":
+            self.result = event
+            self.log.append(event["message"])
+
+    @property
+    def running(self):
+        return self.thread.is_alive()
+
+
+class SmartTask:
+
+    def __init__(self, device):
+        self.device = device
+        self.lines = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="llf-tui-smart", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.lines = smart_lines(smart_report(self.device))
+        except FileNotFoundError:
+            self.error = "smartctl is not installed."
+        except Exception as e:
+            self.error = str(e)
+
+
+class TuiApp:
+
+    def __init__(self, screen, scheduler):
+        self.screen = screen
+        self.scheduler = scheduler
+        self.view = "devices"
+        self.devices = []
+        self.device_index = 0
+        self.job_index = 0
+        self.smart_scroll = 0
+        self.quick = False
+        self.verify = False
+        self.format_task = None
+        self.smart_task = None
+        self.message = ""
+        self.running = True
+        # Son çizilen iş listesi; tuşlar seçili işi buradan buluyor
+        self._jobs = []
+
+    # --- Yardımcılar ---
+
+    def put(self, y, x, text, attr=0):
+        # Ekrandan taşan metni kesiyoruz; son hücreye yazmak curses'ta hata veriyor
+        height, width = self.screen.getmaxyx()
+        if y < 0 or y >= height or x >= width:
+            return
+        try:
+            self.screen.addnstr(y, x, text, max(width - x - 1, 0), attr)
+        except curses.error:
+            pass
+
+    def confirm(self, question):
+        height, _ = self.screen.getmaxyx()
+        self.put(height - 1, 0, " " * 200)
+        self.put(height - 1, 0, f"{question} [y/N] ", curses.A_BOLD)
+        self.screen.timeout(-1)
+        try:
+            return self.screen.getch() in (ord("y"), ord("Y"))
+        finally:
+            self.screen.timeout(1000 // FRAME_RATE)
+
+    def selected_device(self):
+        if 0 <= self.device_index < len(self.devices):
+            return self.devices[self.device_index]
+        return None
+
+    def refresh_devices(self):
+        try:
+            usage = system_usage()
+            rows = group_physical_disks(probe_devices())
+            for dev in rows:
+                problems = preflight(dev["path"], usage)
+                dev["system"] = any(p["system"] for p in problems)
+                dev["in_use"] = describe_problems(problems).replace("\n", "; ") if problems else ""
+            self.devices = rows
+            self.device_index = min(self.device_index, max(len(rows) - 1, 0))
+            self.message = f"Disks found: {len(rows)}"
+        except Exception as e:
+            self.message = f"Error listing disks: {e}"
+
+    # --- Çizim ---
+
+    def draw(self):
+        self.screen.erase()
+        height, width = self.screen.getmaxyx()
+        tabs = "  ".join(f"{i + 1}:{label}" if key != self.view else f"[{i + 1}:{label}]"
+                         for i, (key, label) in enumerate(VIEWS))
+        self.put(0, 0, f" LLF Tool  {tabs}", curses.A_REVERSE)
+        self.put(0, len(f" LLF Tool  {tabs}"), " " * width, curses.A_REVERSE)
+        getattr(self, f"draw_{self.view}")(2, height - 4, width)
+        self.put(height - 2, 0, self.message[:width - 1])
+        self.put(height - 1, 0, self.help_text(), curses.A_DIM)
+        self.screen.refresh()
+
+    def help_text(self):
+        return {
+            "devices": "Enter:format  s:SMART  a:add to jobs  r:refresh  q:quit",
+            "format": "k:quick wipe  v:verify  Enter:start  p:pause/resume  x:stop  q:quit",
+            "smart": "Enter:read again  Up/Down:scroll  q:quit",
+            "jobs": "p:pause  r:resume  x:stop  X:stop all  c:clear finished  +/-:concurrency  q:quit",
+        }[self.view]
+
+    def draw_devices(self, top, rows, width):
+        self.put(top, 0, f"{'DEVICE':<14}{'BUS':<7}{'SIZE':>10}  {'MODEL':<26}{'SERIAL':<22}IN USE",
+                 curses.A_BOLD)
+        first = max(0, self.device_index - rows + 2)
+        for i, dev in enumerate(self.devices[first:first + rows - 1]):
+            index = first + i
+            model = dev.get("model") or "Unknown"
+            if dev.get("system"):
+                model = f"{model} (SYSTEM)"
+            line = (f"{dev['path']:<14}{(dev.get('tran') or 'N/A').upper():<7}"
+                    f"{human_size(int(dev.get('size') or 0)):>10}  {model[:25]:<26}"
+                    f"{(dev.get('serial') or 'N/A')[:21]:<22}{dev.get('in_use', '')}")
+            attr = curses.A_REVERSE if index == self.device_index else 0
+            if dev.get("system"):
+                attr |= curses.A_BOLD
+            self.put(top + 1 + i, 0, line.ljust(width), attr)
+        if not self.devices:
+            self.put(top + 1, 0, "No disks found.")
+
+    def draw_format(self, top, rows, width):
+        task = self.format_task
+        dev = self.selected_device()
+        if task is None:
+            if dev is None:
+                self.put(top, 0, "Select a device on the Devices screen first.")
+                return
+            self.put(top, 0, f"Device:      {dev['path']}  {dev.get('model') or ''}  "
+                             f"{human_size(int(dev.get('size') or 0))}", curses.A_BOLD)
+            self.put(top + 2, 0, f"[k] Quick wipe (first 10 MB): {'on' if self.quick else 'off'}")
+            self.put(top + 3, 0, f"[v] Verify after wipe:        {'on' if self.verify else 'off'}")
+            if dev.get("in_use"):
+                self.put(top + 5, 0, f"In use: {dev['in_use']}", curses.A_BOLD)
+            else:
+                self.put(top + 5, 0, "Press Enter to start. All data on the device will be destroyed.")
+            return
+
+        stats = task.progress
+        state = task.result["state"] if task.result else stats.get("state", "starting")
+        self.put(top, 0, f"Device:      {task.device}", curses.A_BOLD)
+        self.put(top + 1, 0, f"Phase:       {task.phase or ''}   State: {state.upper()}")
+        pct = stats.get("pct", 0.0)
+        self.put(top + 3, 0, f"{progress_bar(pct, width - 10)} {pct:5.1f}%")
+        rate = "Paused" if state == "paused" else f"{human_size(stats.get('rate', 0.0))}/s"
+        if stats.get("stalled"):
+            rate = f"Stalled ({stats.get('io_age') or 0:.0f} s)"
+        self.put(top + 4, 0, f"Position:    {human_size(stats.get('offset', 0))} / "
+                             f"{human_size(stats.get('total', 0))}")
+        self.put(top + 5, 0, f"Speed:       {rate}   Average: {human_size(stats.get('avg_rate', 0.0))}/s"
+                             f"   ETA: {format_eta(stats.get('eta'))}")
+        self.put(top + 6, 0, f"Errors:      medium {stats.get('medium_errors', 0)}, "
+                             f"link {stats.get('link_errors', 0)}")
+        log_top = top + 8
+        lines = list(task.log)[-(rows - 8):] if rows > 8 else []
+        for i, line in enumerate(lines):
+            self.put(log_top + i, 0, line, curses.A_DIM)
+
+    def draw_smart(self, top, rows, width):
+        task = self.smart_task
+        if task is None:
+            self.put(top, 0, "Select a device and press s on the Devices screen.")
+            return
+        self.put(top, 0, f"S.M.A.R.T. data for {task.device}", curses.A_BOLD)
+        if task.error:
+            self.put(top + 2, 0, f"An error occurred: {task.error}")
+            return
+        if task.lines is None:
+            self.put(top + 2, 0, "Reading...")
+            return
+        self.smart_scroll = min(self.smart_scroll, max(len(task.lines) - rows + 2, 0))
+        for i, line in enumerate(task.lines[self.smart_scroll:self.smart_scroll + rows - 2]):
+            self.put(top + 2 + i, 0, line)
+
+    def draw_jobs(self, top, rows, width):
+        jobs = self.scheduler.snapshot()
+        self.job_index = min(self.job_index, max(len(jobs) - 1, 0))
+        self.put(top, 0, f"{'#':>3}  {'DEVICE':<14}{'MODEL':<22}{'STATE':<13}{'PROGRESS':<24}"
+                         f"{'SPEED':>12}  ETA", curses.A_BOLD)
+        for i, job in enumerate(jobs[:rows - 3]):
+            running = job["state"] in ("running", "stalled")
+            speed = f"{human_size(job['rate'])}/s" if running else ""
+            eta = job["eta"] if running else job["predicted"] if job["state"] == "queued" else None
+            line = (f"{job['id']:>3}  {job['device']:<14}{job['label'][:21]:<22}"
+                    f"{job['state'].upper():<13}{progress_bar(job['pct'], 18)} {job['pct']:4.0f}% "
+                    f"{speed:>12}  {format_eta(eta)}")
+            self.put(top + 1 + i, 0, line.ljust(width),
+                     curses.A_REVERSE if i == self.job_index else 0)
+        active = sum(1 for j in jobs if j["state"] not in ("queued",) + FINISHED_STATES)
+        queued = sum(1 for j in jobs if j["state"] == "queued")
+        done = sum(1 for j in jobs if j["state"] == "done")
+        status = (f"Running: {active}   Queued: {queued}   Completed: {done}   "
+                  f"Concurrent: {self.scheduler.max_concurrent}")
+        if active or queued:
+            status += f"   Estimated batch time left: {format_eta(self.scheduler.plan())}"
+        if getattr(self.scheduler, "remote", False):
+            status += f"   (background service, pid {self.scheduler.pid})"
+        self.put(top + rows - 1, 0, status)
+        self._jobs = jobs
+
+    # --- Tuşlar ---
+
+    def handle_key(self, key):
+        if key == ord("q"):
+            if self.format_task is not None and self.format_task.running:
+                if not self.confirm("A format is running. Stop it and quit?"):
+                    return
+                self.format_task.run.stop()
+                self.format_task.thread.join(10)
+            self.running = False
+            return
+        if key in (ord("1"), ord("2"), ord("3"), ord("4")):
+            self.view = VIEWS[key - ord("1")][0]
+            return
+        if key == ord("\t"):
+            keys = [k for k, _ in VIEWS]
+            self.view = keys[(keys.index(self.view) + 1) % len(keys)]
+            return
+        getattr(self, f"key_{self.view}")(key)
+
+    def key_devices(self, key):
+        if key == curses.KEY_UP:
+            self.device_index = max(self.device_index - 1, 0)
+        elif key == curses.KEY_DOWN:
+            self.device_index = min(self.device_index + 1, max(len(self.devices) - 1, 0))
+        elif key == ord("r"):
+            self.refresh_devices()
+        elif key in (curses.KEY_ENTER, 10, 13):
+            if self.format_task is None or not self.format_task.running:
+                self.format_task = None
+            self.view = "format"
+        elif key == ord("s"):
+            dev = self.selected_device()
+            if dev is not None:
+                self.smart_task = SmartTask(dev["path"])
+                self.smart_scroll = 0
+                self.view = "smart"
+        elif key == ord("a"):
+            dev = self.selected_device()
+            if dev is None:
+                return
+            if dev.get("in_use"):
+                self.message = f"{dev['path']} is in use: {dev['in_use']}"
+                return
+            if not self.confirm(f"Add {dev['path']} ({dev.get('model') or 'Unknown'}) to the batch? "
+                                "All data will be destroyed."):
+                return
+            try:
+                job = self.scheduler.submit(dev["path"], quick_wipe=self.quick,
+                                            label=dev.get("model") or "")
+                self.message = f"{dev['path']} queued as job {job.id}."
+            except ValueError as e:
+                self.message = str(e)
+
+    def key_format(self, key):
+        task = self.format_task
+        if task is not None and task.running:
+            if key == ord("p"):
+                if task.run.token.paused:
+                    task.run.resume()
+                else:
+                    task.run.pause()
+            elif key == ord("x") and self.confirm("Stop the format?"):
+                task.run.stop()
+            return
+        if key == ord("k"):
+            self.quick = not self.quick
+        elif key == ord("v"):
+            self.verify = not self.verify
+        elif key in (curses.KEY_ENTER, 10, 13):
+            if task is not None:
+                # Biten işin ekranından yeni bir işe geçiyoruz
+                self.format_task = None
+                return
+            dev = self.selected_device()
+            if dev is None:
+                return
+            if dev.get("system"):
+                self.message = (f"{dev['path']} is used by the system. "
+                                "Formatting the system drive is NOT allowed.")
+                return
+            if not self.confirm(f"Wipe {dev['path']} ({dev.get('model') or 'Unknown'})? "
+                                "This cannot be undone."):
+                return
+            self.format_task = FormatTask(dev["path"], self.quick, self.verify)
+            self.format_task.thread.start()
+
+    def key_smart(self, key):
+        if key == curses.KEY_UP:
+            self.smart_scroll = max(self.smart_scroll - 1, 0)
+        elif key == curses.KEY_DOWN:
+            self.smart_scroll += 1
+        elif key in (curses.KEY_ENTER, 10, 13) and self.smart_task is not None:
+            self.smart_task = SmartTask(self.smart_task.device)
+
+    def key_jobs(self, key):
+        jobs = self._jobs
+        job = jobs[self.job_index] if 0 <= self.job_index < len(jobs) else None
+        if key == curses.KEY_UP:
+            self.job_index = max(self.job_index - 1, 0)
+        elif key == curses.KEY_DOWN:
+            self.job_index = min(self.job_index + 1, max(len(jobs) - 1, 0))
+        elif key == ord("+"):
+            self.scheduler.set_max_concurrent(self.scheduler.max_concurrent + 1)
+        elif key == ord("-"):
+            self.scheduler.set_max_concurrent(max(self.scheduler.max_concurrent - 1, 1))
+        elif key == ord("c"):
+            self.scheduler.clear_finished()
+        elif key == ord("X") and self.confirm("Stop all jobs?"):
+            self.scheduler.stop_all()
+        elif job is not None:
+            if key == ord("p"):
+                self.scheduler.pause(job["id"])
+            elif key == ord("r"):
+                self.scheduler.resume(job["id"])
+            elif key == ord("x") and self.confirm(f"Stop job {job['id']} ({job['device']})?"):
+                self.scheduler.stop(job["id"])
+
+    # --- Ana döngü ---
+
+    def loop(self):
+        curses.curs_set(0)
+        self.screen.keypad(True)
+        self.screen.timeout(1000 // FRAME_RATE)
+        self.refresh_devices()
+        while self.running:
+            self.draw()
+            key = self.screen.getch()
+            if key == curses.KEY_RESIZE or key == -1:
+                continue
+            self.handle_key(key)
+
+
+def attach_scheduler():
+    # Qt arayüzü gibi: arka plan servisine bağlan ya da başlat, olmazsa işler bu süreçte
+    try:
+        return connect_scheduler()
+    except Exception:
+        return JobScheduler(DEFAULT_CONCURRENCY)
+
+
+def main():
+    if os.geteuid() != 0:
+        print("LLF Tool needs root privileges to access disks. Run it with sudo.", file=sys.stderr)
+        return 1
+    # Önceki oturum çöktüyse ayarlı kalan blok kuyruklarını geri al
+    restore_stale()
+    scheduler = attach_scheduler()
+    try:
+        curses.wrapper(lambda screen: TuiApp(screen, scheduler).loop())
+    finally:
+        if getattr(scheduler, "remote", False):
+            # Toplu işler serviste devam ediyor
+            scheduler.close()
+        elif scheduler.busy():
+            print("Stopping batch jobs...", file=sys.stderr)
+            scheduler.stop_all()
+            for job in scheduler.jobs():
+                if job.thread is not None and not job.detached:
+                    job.thread.join(10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
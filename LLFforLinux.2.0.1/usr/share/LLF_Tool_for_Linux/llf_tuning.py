@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Silme süresince hedefin blok kuyruğu ayarları: I/O zamanlayıcı, nr_requests,
+# max_sectors_kb ve read-ahead. Bazı USB köprülerinde varsayılanlar %10-30 hız kaybettiriyor.
+# Eski değerler diske (günlük dosyasına) yazılıyor; iş biter, durdurulur ya da program
+# çökerse bir sonraki açılışta geri yükleniyor.
+
+import os
+import json
+
+from llf_devices import (
+    SYS_BLOCK, block_name, dev_number, device_topology, read_sysfs, usb_version,
+)
+
+JOURNAL_DIR = "/var/lib/llf-tool/tuning"
+NR_REQUESTS = 256
+USB_MAX_SECTORS_KB = 1024    # UAS/BOT köprülerinde 120-240 KiB varsayılanı çok küçük
+READ_AHEAD_KB = 4096         # Doğrulama okumalarında blok boyu kadar önden okuma
+USB2_MBPS = 480
+
+
+def queue_path(name, key):
+    return os.path.join(SYS_BLOCK, name, "queue", key)
+
+
+def current_scheduler(name):
+    # "none [mq-deadline] kyber" -> ("mq-deadline", ["none", "mq-deadline", "kyber"])
+    text = read_sysfs(queue_path(name, "scheduler"))
+    available = [item.strip("[]") for item in text.split()]
+    active = next((item.strip("[]") for item in text.split() if item.startswith("[")), None)
+    return active, available
+
+
+def usb_link_warning(device_path):
+    # USB2'ye düşmüş (ya da USB2 porta takılmış) cihazı yavaş iş başlamadan bildiriyoruz
+    topology = device_topology(device_path)
+    if topology["bus"] != "usb" or not topology.get("usb_port"):
+        return None
+    speed = topology["device_mbps"]
+    if speed is None or speed > USB2_MBPS:
+        return None
+    version = usb_version(topology["usb_port"])
+    if version is not None and version >= 3:
+        return (f"{device_path} supports USB {version:g} but negotiated only {speed:g} Mbit/s. "
+                "Check the cable or use a USB 3 port; the wipe will be much slower.")
+    return (f"{device_path} is connected at {speed:g} Mbit/s (USB 2 or slower); "
+            "expect at most ~40 MB/s.")
+
+
+class QueueTuner:
+
+    def __init__(self, device_path, log=None, journal_dir=JOURNAL_DIR):
+        self.device_path = device_path
+        self.name = block_name(device_path)
+        self.log = log or (lambda message: None)
+        self.journal_dir = journal_dir
+        self.saved = {}
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.journal_dir, f"{self.name}.json")
+
+    def plan(self):
+        # Hedef değerler; sadece bu cihazda gerçekten değişecek olanlar
+        name = self.name
+        targets = {}
+        active, available = current_scheduler(name)
+        rotational = read_sysfs(queue_path(name, "rotational")) == "1"
+        wanted = "mq-deadline" if rotational else "none"
+        if wanted not in available and "mq-deadline" in available:
+            wanted = "mq-deadline"
+        if active and wanted in available and wanted != active:
+            targets["scheduler"] = wanted
+
+        nr_requests = read_sysfs(queue_path(name, "nr_requests"))
+        if nr_requests.isdigit() and int(nr_requests) < NR_REQUESTS:
+            targets["nr_requests"] = str(NR_REQUESTS)
+
+        max_sectors = read_sysfs(queue_path(name, "max_sectors_kb"))
+        max_hw = read_sysfs(queue_path(name, "max_hw_sectors_kb"))
+        if device_topology(self.device_path)["bus"] == "usb" and max_sectors.isdigit() \
+                and max_hw.isdigit():
+            wanted_sectors = min(int(max_hw), USB_MAX_SECTORS_KB)
+            if wanted_sectors > int(max_sectors):
+                targets["max_sectors_kb"] = str(wanted_sectors)
+
+        read_ahead = read_sysfs(queue_path(name, "read_ahead_kb"))
+        if read_ahead.isdigit() and int(read_ahead) < READ_AHEAD_KB:
+            targets["read_ahead_kb"] = str(READ_AHEAD_KB)
+        return targets
+
+    def apply(self):
+        if not os.path.isdir(os.path.join(SYS_BLOCK, self.name, "queue")):
+            return {}
+        targets = self.plan()
+        if not targets:
+            return {}
+        for key in targets:
+            value = read_sysfs(queue_path(self.name, key))
+            self.saved[key] = current_scheduler(self.name)[0] if key == "scheduler" else value
+        # Önce günlüğü yazıyoruz ki değiştirip çökersek geri alabilelim
+        self._write_journal()
+        applied = {}
+        for key, value in targets.items():
+            if self._write(key, value):
+                applied[key] = value
+        if applied:
+            changes = ", ".join(f"{k} {self.saved[k]} -> {v}" for k, v in applied.items())
+            self.log(f"Queue tuning for {self.name}: {changes}.")
+        return applied
+
+    def restore(self):
+        # Cihaz çıkarıldıysa geri yüklenecek bir şey kalmadı
+        if self.saved and os.path.isdir(os.path.join(SYS_BLOCK, self.name, "queue")):
+            for key, value in self.saved.items():
+                self._write(key, value)
+            self.log(f"Queue settings of {self.name} restored.")
+        self.saved = {}
+        try:
+            os.remove(self.journal_path)
+        except OSError:
+            pass
+
+    def _write(self, key, value):
+        try:
+            with open(queue_path(self.name, key), "w") as f:
+                f.write(value)
+            return True
+        except OSError as e:
+            self.log(f"Could not set {key}={value} on {self.name}: {e.strerror or e}")
+            return False
+
+    def _write_journal(self):
+        try:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            with open(self.journal_path, "w") as f:
+                json.dump({"name": self.name, "dev": dev_number(self.name),
+                           "pid": os.getpid(), "saved": self.saved}, f)
+        except OSError:
+            pass
+
+
+def _alive(pid):
+    if not isinstance(pid, int) or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+
+
+def restore_stale(journal_dir=JOURNAL_DIR, log=None):
+    # Önceki oturum çöktüyse değiştirilmiş kuyruk ayarlarını geri yüklüyoruz.
+    # Aynı isim artık başka bir cihaza aitse (dev numarası farklı) dokunmuyoruz.
+    restored = []
+    try:
+        entries = os.listdir(journal_dir)
+    except OSError:
+        return restored
+    for entry in entries:
+        path = os.path.join(journal_dir, entry)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        name = data.get("name", "")
+        # Ayarı yapan süreç (ör. arka plan servisi) hâlâ çalışıyorsa iş sürüyor demektir
+        if _alive(data.get("pid")):
+            continue
+        if name and dev_number(name) == data.get("dev"):
+            tuner = QueueTuner(f"/dev/{name}", log=log, journal_dir=journal_dir)
+            tuner.saved = dict(data.get("saved") or {})
+            tuner.restore()
+            restored.append(name)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return restored